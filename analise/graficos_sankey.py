@@ -251,33 +251,59 @@ def configurar_cores_links(sources, targets, nodes_labels):
     
     return cores_links
 
-def criar_grafico_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo):
-    """Cria o gráfico Sankey com configurações padronizadas."""
+def criar_especificacao_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo):
+    """
+    Monta os dados compactos de um gráfico Sankey: nós (rótulos, cores e
+    posição x), links (origem, destino, valor e cor) e título.
+    
+    É o que a interface web guarda e desenha no navegador; figura_sankey
+    converte para uma figura do Plotly.
+    """
     final_nodes_labels, cores_nos = configurar_nos_e_cores(nodes_labels, sources, targets, values)
     cores_links = configurar_cores_links(sources, targets, nodes_labels)
     
+    return {
+        'titulo': titulo,
+        'nos': {
+            'rotulos': final_nodes_labels,
+            'cores': cores_nos,
+            'x': node_x_positions
+        },
+        'links': {
+            'origem': [int(source) for source in sources],
+            'destino': [int(target) for target in targets],
+            'valor': [round(float(value), 2) for value in values],
+            'cores': cores_links
+        }
+    }
+
+def figura_sankey(especificacao):
+    """Cria o gráfico Sankey com configurações padronizadas a partir dos dados de criar_especificacao_sankey."""
+    nos = especificacao['nos']
+    links = especificacao['links']
+    
     fig = go.Figure(data=[go.Sankey(
         node=dict(
             pad=50,
             thickness=55,
             line=dict(color="rgba(0,0,0,0.8)", width=2),
-            label=final_nodes_labels,
-            color=cores_nos,
-            x=node_x_positions,
+            label=nos['rotulos'],
+            color=nos['cores'],
+            x=nos['x'],
             hovertemplate='%{label}<extra></extra>'
         ),
         link=dict(
-            source=sources,
-            target=targets,
-            value=values,
-            color=cores_links,
+            source=links['origem'],
+            target=links['destino'],
+            value=links['valor'],
+            color=links['cores'],
             hovertemplate='%{source.label} → %{target.label}<br><b>R$ %{value:,.2f}</b><extra></extra>'
         )
     )])
     
     fig.update_layout(
         title={
-            'text': titulo,
+            'text': especificacao['titulo'],
             'x': 0.5,
             'xanchor': 'center',
             'font': {'size': 18, 'color': '#2c3e50'}
@@ -293,8 +319,33 @@ def criar_grafico_sankey(sources, targets, values, nodes_labels, node_x_position
     pio.templates.default = "plotly_white"
     return fig
 
-def gerar_sankey_por_banco(df_banco, nome_banco, output_dir):
-    """Gera gráfico Sankey para um banco específico."""
+def criar_grafico_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo):
+    """Cria o gráfico Sankey com configurações padronizadas."""
+    return figura_sankey(criar_especificacao_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo))
+
+def _titulo_fluxo(df, titulo):
+    """Título com totais de saídas, entradas e saldo."""
+    total_entradas = df[df['Valor'] > 0]['Valor'].sum()
+    total_saidas = abs(df[df['Valor'] < 0]['Valor'].sum())
+    saldo = total_entradas - total_saidas
+    
+    cor_saldo = '#27ae60' if saldo >= 0 else '#e74c3c'
+    simbolo_saldo = '+' if saldo >= 0 else ''
+    
+    return (f"💰 {titulo}<br>"
+            f"<span style='font-size:14px; color:#7f8c8d'>"
+            f"💸 Saídas: R$ {total_saidas:,.2f} | 💵 Entradas: R$ {total_entradas:,.2f} | "
+            f"<span style='color:{cor_saldo}'>💼 Saldo: {simbolo_saldo}R$ {saldo:,.2f}</span></span>")
+
+def montar_sankey_por_banco(df_banco, nome_banco):
+    """
+    Monta os dados do gráfico Sankey de um banco específico.
+    
+    Os fluxos entre o mesmo par de nós são somados em um único link.
+    
+    Returns:
+        Dicionário de criar_especificacao_sankey ou None se não houver fluxos
+    """
     df_banco = filtrar_transacoes_validas(df_banco)
     
     # Configuração de posições das colunas
@@ -305,7 +356,7 @@ def gerar_sankey_por_banco(df_banco, nome_banco, output_dir):
     node_map = {}
     current_node_id = 0
     node_x_positions = []
-    sources, targets, values = [], [], []
+    fluxos = {}
     
     def add_node_with_pos(label, x_pos):
         nonlocal current_node_id
@@ -316,6 +367,9 @@ def gerar_sankey_por_banco(df_banco, nome_banco, output_dir):
             current_node_id += 1
         return node_map[label]
     
+    def add_fluxo(source, target, valor):
+        fluxos[(source, target)] = fluxos.get((source, target), 0) + valor
+    
     # Nós principais
     banco_node_id = add_node_with_pos(f'Banco: {nome_banco}', X_COL1)
     dinheiro_node_id = add_node_with_pos(f'Dinheiro Disponível (no {nome_banco})', X_COL3)
@@ -331,77 +385,62 @@ def gerar_sankey_por_banco(df_banco, nome_banco, output_dir):
     for categoria in df_banco[df_banco['Valor'] < 0]['Categoria_Agrupada'].unique():
         add_node_with_pos(f"Despesa Detalhada: {categoria}", X_COL4)
     
-    # Processar fluxos
-    for _, row in df_banco.iterrows():
-        if abs(row['Valor']) <= 1.0:
-            continue
-        
-        if row['Valor'] > 0:  # Receita
-            receita_label = f"Receita Detalhada: {row['Tipo_Transacao_AltoNivel']}"
-            receita_node_id = node_map[receita_label]
-            
-            # Banco -> Receita Detalhada
-            sources.append(banco_node_id)
-            targets.append(receita_node_id)
-            values.append(row['Valor'])
-            
-            # Tratamento especial para Proventos de Renda Variável
-            if (row['Tipo_Transacao_AltoNivel'] == 'Proventos de Renda Variável' and 
-                row['Tipo_Transacao_Detalhe'] and row['Tipo_Transacao_Detalhe'] != 'nan'):
-                
-                detalhe_label = f"Detalhe Provento: {row['Tipo_Transacao_Detalhe']}"
-                detalhe_node_id = node_map[detalhe_label]
-                
-                # Receita -> Detalhe
-                sources.append(receita_node_id)
-                targets.append(detalhe_node_id)
-                values.append(row['Valor'])
-                
-                # Detalhe -> Dinheiro Disponível
-                sources.append(detalhe_node_id)
-                targets.append(dinheiro_node_id)
-                values.append(row['Valor'])
-            else:
-                # Receita -> Dinheiro Disponível
-                sources.append(receita_node_id)
-                targets.append(dinheiro_node_id)
-                values.append(row['Valor'])
-        
-        else:  # Despesa
-            despesa_label = f"Despesa Detalhada: {row['Categoria_Agrupada']}"
-            despesa_node_id = node_map[despesa_label]
-            
-            # Dinheiro Disponível -> Despesa
-            sources.append(dinheiro_node_id)
-            targets.append(despesa_node_id)
-            values.append(abs(row['Valor']))
+    # Processar fluxos (transações de até R$ 1,00 são ignoradas)
+    df_fluxos = df_banco[df_banco['Valor'].abs() > 1.0]
+    df_receitas = df_fluxos[df_fluxos['Valor'] > 0]
+    df_despesas = df_fluxos[df_fluxos['Valor'] < 0]
     
-    if not sources:
-        return
+    detalhe = df_receitas['Tipo_Transacao_Detalhe'].astype(str)
+    com_detalhe = ((df_receitas['Tipo_Transacao_AltoNivel'] == 'Proventos de Renda Variável')
+                   & (detalhe != '') & (detalhe != 'nan'))
     
-    # Calcular totais
-    total_entradas = df_banco[df_banco['Valor'] > 0]['Valor'].sum()
-    total_saidas = abs(df_banco[df_banco['Valor'] < 0]['Valor'].sum())
-    saldo = total_entradas - total_saidas
+    # Banco -> Receita Detalhada
+    for tipo_receita, valor in df_receitas.groupby('Tipo_Transacao_AltoNivel', sort=False)['Valor'].sum().items():
+        add_fluxo(banco_node_id, node_map[f"Receita Detalhada: {tipo_receita}"], valor)
     
-    cor_saldo = '#27ae60' if saldo >= 0 else '#e74c3c'
-    simbolo_saldo = '+' if saldo >= 0 else ''
+    # Proventos de Renda Variável: Receita -> Detalhe -> Dinheiro Disponível
+    agrupado = df_receitas[com_detalhe].groupby(['Tipo_Transacao_AltoNivel', 'Tipo_Transacao_Detalhe'], sort=False)['Valor'].sum()
+    for (tipo_receita, detalhe_provento), valor in agrupado.items():
+        detalhe_node_id = node_map[f"Detalhe Provento: {detalhe_provento}"]
+        add_fluxo(node_map[f"Receita Detalhada: {tipo_receita}"], detalhe_node_id, valor)
+        add_fluxo(detalhe_node_id, dinheiro_node_id, valor)
+    
+    # Receita -> Dinheiro Disponível
+    for tipo_receita, valor in df_receitas[~com_detalhe].groupby('Tipo_Transacao_AltoNivel', sort=False)['Valor'].sum().items():
+        add_fluxo(node_map[f"Receita Detalhada: {tipo_receita}"], dinheiro_node_id, valor)
     
-    titulo = (f"💰 Fluxo de Receitas e Despesas - {nome_banco}<br>"
-              f"<span style='font-size:14px; color:#7f8c8d'>"
-              f"💸 Saídas: R$ {total_saidas:,.2f} | 💵 Entradas: R$ {total_entradas:,.2f} | "
-              f"<span style='color:{cor_saldo}'>💼 Saldo: {simbolo_saldo}R$ {saldo:,.2f}</span></span>")
+    # Dinheiro Disponível -> Despesa
+    for categoria, valor in df_despesas.groupby('Categoria_Agrupada', sort=False)['Valor'].sum().items():
+        add_fluxo(dinheiro_node_id, node_map[f"Despesa Detalhada: {categoria}"], abs(valor))
     
-    # Criar gráfico
-    fig = criar_grafico_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo)
+    if not fluxos:
+        return None
+    
+    sources = [source for source, _ in fluxos]
+    targets = [target for _, target in fluxos]
+    values = list(fluxos.values())
+    
+    titulo = _titulo_fluxo(df_banco, f"Fluxo de Receitas e Despesas - {nome_banco}")
+    return criar_especificacao_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo)
+
+def gerar_sankey_por_banco(df_banco, nome_banco, output_dir):
+    """Gera gráfico Sankey para um banco específico."""
+    especificacao = montar_sankey_por_banco(df_banco, nome_banco)
+    if especificacao is None:
+        return
     
     # Salvar arquivo
     output_file = Path(output_dir) / f"analise_gastos_sankey_{nome_banco.replace(' ', '_').lower()}.html"
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    fig.write_html(output_file, include_plotlyjs='cdn')
+    figura_sankey(especificacao).write_html(output_file, include_plotlyjs='directory')
 
-def gerar_sankey_geral(df_final, output_dir):
-    """Gera gráfico Sankey geral consolidado."""
+def montar_sankey_geral(df_final):
+    """
+    Monta os dados do gráfico Sankey geral consolidado.
+    
+    Returns:
+        Dicionário de criar_especificacao_sankey ou None se não houver fluxos
+    """
     df_final = filtrar_transacoes_validas(df_final)
     
     # Configuração de posições das colunas
@@ -468,66 +507,127 @@ def gerar_sankey_geral(df_final, output_dir):
         values.append(abs(row['Valor']))
     
     if not sources:
+        return None
+    
+    titulo = _titulo_fluxo(df_final, "Fluxo Geral de Receitas e Despesas")
+    return criar_especificacao_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo)
+
+def gerar_sankey_geral(df_final, output_dir):
+    """Gera gráfico Sankey geral consolidado."""
+    especificacao = montar_sankey_geral(df_final)
+    if especificacao is None:
         return
     
-    # Calcular totais
-    total_entradas = df_final[df_final['Valor'] > 0]['Valor'].sum()
-    total_saidas = abs(df_final[df_final['Valor'] < 0]['Valor'].sum())
-    saldo = total_entradas - total_saidas
+    # Salvar arquivo
+    output_file = Path(output_dir) / "analise_gastos_sankey_geral.html"
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    figura_sankey(especificacao).write_html(output_file, include_plotlyjs='directory')
+
+def preparar_dados_sankey(df):
+    """
+    Converte valores, remove transferências próprias e categoriza receitas e
+    despesas da planilha consolidada para os gráficos Sankey.
     
-    cor_saldo = '#27ae60' if saldo >= 0 else '#e74c3c'
-    simbolo_saldo = '+' if saldo >= 0 else ''
+    Returns:
+        DataFrame pronto para montar_sankey_* (vazio se não houver dados válidos)
+    """
+    df = df.copy()
+    
+    # Conversão de tipos - tratar formato brasileiro de números
+    def converter_valor_brasileiro(valor):
+        """Converte valores em formato brasileiro (vírgula decimal) para float"""
+        if pd.isna(valor):
+            return 0.0
+        if isinstance(valor, (int, float)):
+            return float(valor)
+        # Se for string, substituir vírgula por ponto
+        valor_str = str(valor).replace(',', '.')
+        try:
+            return float(valor_str)
+        except ValueError:
+            return 0.0
+    
+    df['Valor'] = df['Valor'].apply(converter_valor_brasileiro)
+    
+    for col in ['Banco', 'Tipo_Transacao', 'Descricao', 'Categoria_Auto', 'Categoria']:
+        df[col] = df[col].astype(str)
+    
+    # Criar descrição completa
+    df['Descricao_Completa'] = df.apply(criar_descricao_completa, axis=1)
+    
+    # Filtrar transferências próprias usando Categoria_Auto
+    transferencias_proprias = ['TRANSFERENCIA_PROPRIA', 'TRANSFERÊNCIA_PRÓPRIA', 'TRANSFERENCIA PROPRIA', 'TRANSFERÊNCIA PRÓPRIA']
+    mask_transferencia = df['Categoria_Auto'].str.upper().str.contains('|'.join(transferencias_proprias), na=False)
+    df_processado = df[~mask_transferencia].copy()
+    
+    if df_processado.empty:
+        return df_processado
+    
+    # Inicializar colunas de categorização
+    df_processado['Tipo_Transacao_AltoNivel'] = ''
+    df_processado['Tipo_Transacao_Detalhe'] = ''
+    df_processado['Categoria_Agrupada'] = ''
+    
+    # Categorizar receitas
+    receitas_mask = df_processado['Valor'] > 0
+    if receitas_mask.any():
+        df_receitas = df_processado[receitas_mask].copy()
+        categoria_resultado = df_receitas['Descricao_Completa'].apply(categorizar_receitas_por_palavras_chave)
+        df_receitas['Tipo_Transacao_AltoNivel'] = categoria_resultado.apply(lambda x: x[0])
+        df_receitas['Tipo_Transacao_Detalhe'] = categoria_resultado.apply(lambda x: x[1])
+        df_processado.loc[receitas_mask, 'Tipo_Transacao_AltoNivel'] = df_receitas['Tipo_Transacao_AltoNivel']
+        df_processado.loc[receitas_mask, 'Tipo_Transacao_Detalhe'] = df_receitas['Tipo_Transacao_Detalhe']
+    
+    # Categorizar despesas
+    despesas_mask = df_processado['Valor'] < 0
+    if despesas_mask.any():
+        df_despesas = df_processado[despesas_mask].copy()
+        df_despesas['Categoria_Agrupada'] = df_despesas.apply(
+            lambda row: categorizar_despesas_por_palavras_chave(row['Descricao_Completa'], row['Categoria_Auto']), 
+            axis=1
+        )
+        df_processado.loc[despesas_mask, 'Categoria_Agrupada'] = df_despesas['Categoria_Agrupada']
     
-    titulo = (f"💰 Fluxo Geral de Receitas e Despesas<br>"
-              f"<span style='font-size:14px; color:#7f8c8d'>"
-              f"💸 Saídas: R$ {total_saidas:,.2f} | 💵 Entradas: R$ {total_entradas:,.2f} | "
-              f"<span style='color:{cor_saldo}'>💼 Saldo: {simbolo_saldo}R$ {saldo:,.2f}</span></span>")
+    return df_processado
+
+def montar_graficos_sankey(df):
+    """
+    Monta os dados de todos os gráficos Sankey da planilha consolidada.
     
-    # Criar gráfico
-    fig = criar_grafico_sankey(sources, targets, values, nodes_labels, node_x_positions, titulo)
+    Returns:
+        {'geral': dados ou None, 'bancos': {nome_banco: dados}}
+    """
+    graficos = {'geral': None, 'bancos': {}}
     
-    # Salvar arquivo
-    output_file = Path(output_dir) / "analise_gastos_sankey_geral.html"
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    fig.write_html(output_file, include_plotlyjs='cdn')
+    df_processado = preparar_dados_sankey(df)
+    if df_processado.empty:
+        return graficos
+    
+    for banco in df_processado['Banco'].unique():
+        df_banco = df_processado[df_processado['Banco'] == banco]
+        if not df_banco.empty:
+            especificacao = montar_sankey_por_banco(df_banco, banco)
+            if especificacao is not None:
+                graficos['bancos'][banco] = especificacao
+    
+    graficos['geral'] = montar_sankey_geral(df_processado)
+    return graficos
 
-def analisar_gastos_sankey_proventos_detalhados(nome_arquivo_excel="controle_gastos.xlsx", output_dir="output"):
+def analisar_gastos_sankey_proventos_detalhados(nome_arquivo_excel="controle_gastos.xlsx", output_dir="output", df=None):
     """
     Função principal que processa dados e gera gráficos Sankey.
     
+    Usa o DataFrame consolidado df, se informado (ex.: retorno de
+    consolidar_extratos do core), em vez de ler nome_arquivo_excel.
+    
     Gera:
     - Um gráfico para cada banco
     - Um gráfico geral consolidado
     """
     try:
-        df = pd.read_excel(nome_arquivo_excel)
-        
-        # Conversão de tipos - tratar formato brasileiro de números
-        def converter_valor_brasileiro(valor):
-            """Converte valores em formato brasileiro (vírgula decimal) para float"""
-            if pd.isna(valor):
-                return 0.0
-            if isinstance(valor, (int, float)):
-                return float(valor)
-            # Se for string, substituir vírgula por ponto
-            valor_str = str(valor).replace(',', '.')
-            try:
-                return float(valor_str)
-            except ValueError:
-                return 0.0
-        
-        df['Valor'] = df['Valor'].apply(converter_valor_brasileiro)
-        
-        for col in ['Banco', 'Tipo_Transacao', 'Descricao', 'Categoria_Auto', 'Categoria']:
-            df[col] = df[col].astype(str)
-        
-        # Criar descrição completa
-        df['Descricao_Completa'] = df.apply(criar_descricao_completa, axis=1)
-        
-        # Filtrar transferências próprias usando Categoria_Auto
-        transferencias_proprias = ['TRANSFERENCIA_PROPRIA', 'TRANSFERÊNCIA_PRÓPRIA', 'TRANSFERENCIA PROPRIA', 'TRANSFERÊNCIA PRÓPRIA']
-        mask_transferencia = df['Categoria_Auto'].str.upper().str.contains('|'.join(transferencias_proprias), na=False)
-        df_processado = df[~mask_transferencia].copy()
+        if df is None:
+            df = pd.read_excel(nome_arquivo_excel)
+        df_processado = preparar_dados_sankey(df)
         
         if df_processado.empty:
             Path(output_dir).mkdir(parents=True, exist_ok=True)
@@ -535,35 +635,6 @@ def analisar_gastos_sankey_proventos_detalhados(nome_arquivo_excel="controle_gas
                 f.write("<html><body><h1>Nenhum dado válido encontrado.</h1></body></html>")
             return
         
-        # Inicializar colunas de categorização
-        df_processado['Tipo_Transacao_AltoNivel'] = ''
-        df_processado['Tipo_Transacao_Detalhe'] = ''
-        df_processado['Categoria_Agrupada'] = ''
-        
-        # Categorizar receitas
-        receitas_mask = df_processado['Valor'] > 0
-        if receitas_mask.any():
-            df_receitas = df_processado[receitas_mask].copy()
-            categoria_resultado = df_receitas['Descricao_Completa'].apply(categorizar_receitas_por_palavras_chave)
-            df_receitas['Tipo_Transacao_AltoNivel'] = categoria_resultado.apply(lambda x: x[0])
-            df_receitas['Tipo_Transacao_Detalhe'] = categoria_resultado.apply(lambda x: x[1])
-            df_processado.loc[receitas_mask, 'Tipo_Transacao_AltoNivel'] = df_receitas['Tipo_Transacao_AltoNivel']
-            df_processado.loc[receitas_mask, 'Tipo_Transacao_Detalhe'] = df_receitas['Tipo_Transacao_Detalhe']
-        
-        # Categorizar despesas
-        despesas_mask = df_processado['Valor'] < 0
-        if despesas_mask.any():
-            df_despesas = df_processado[despesas_mask].copy()
-            df_despesas['Categoria_Agrupada'] = df_despesas.apply(
-                lambda row: categorizar_despesas_por_palavras_chave(row['Descricao_Completa'], row['Categoria_Auto']), 
-                axis=1
-            )
-            df_processado.loc[despesas_mask, 'Categoria_Agrupada'] = df_despesas['Categoria_Agrupada']
-        
-        # Validar dados finais
-        if df_processado.empty:
-            return
-        
         # Obter bancos únicos
         bancos_unicos = df_processado['Banco'].unique()
         if len(bancos_unicos) == 0:
@@ -207,7 +207,7 @@ def gerar_sankey_por_banco(df_banco, nome_banco, output_dir):
 
     output_file_html = Path(output_dir) / f"analise_gastos_sankey_{nome_banco.replace(' ', '_').lower()}.html"
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    fig.write_html(output_file_html, include_plotlyjs='cdn')
+    fig.write_html(output_file_html, include_plotlyjs='directory')
 
     print(f"Gráfico Sankey para '{nome_banco}' gerado com sucesso")
 
@@ -377,7 +377,7 @@ def gerar_sankey_geral(df_final, output_dir):
 
     output_file_html = Path(output_dir) / "analise_gastos_sankey_geral.html"
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    fig.write_html(output_file_html, include_plotlyjs='cdn')
+    fig.write_html(output_file_html, include_plotlyjs='directory')
 
     print(f"Gráfico Sankey Geral gerado com sucesso")
 
@@ -1,15 +1,21 @@
 """
 Módulo de processadores de bancos.
-Cada banco tem seu próprio arquivo com a lógica específica de processamento.
+Cada banco tem seu próprio arquivo com a lógica específica de processamento,
+ou uma especificação declarativa em especificacoes/ compilada por especificacao.py.
 """
 
-from .c6 import processar as processar_c6
+from .especificacao import carregar_especificacao, compilar_especificacao
 from .c6_cartao import processar as processar_c6_cartao
-from .bradesco import processar as processar_bradesco  
 from .bb import processar as processar_bb
+from .bb import processar_lotes as processar_lotes_bb
 from .bb_cartao import processar as processar_bb_cartao
 from .itau import processar as processar_itau
 
+# Bancos descritos por especificação declarativa (os processadores escritos
+# à mão que eles substituíram estão em scripts/benchmark_especificacoes.py)
+processar_bradesco, processar_lotes_bradesco = compilar_especificacao(carregar_especificacao('bradesco'))
+processar_c6, processar_lotes_c6 = compilar_especificacao(carregar_especificacao('c6'))
+
 # Mapeamento dos processadores
 PROCESSADORES = {
     'c6': processar_c6,
@@ -20,6 +26,15 @@ PROCESSADORES = {
     'itau': processar_itau
 }
 
+# Processadores que também leem o extrato em lotes de tamanho fixo.
+# Cada um recebe (config, tamanho_lote) e gera DataFrames padronizados,
+# que processador.consumir_lotes junta antes da consolidação.
+PROCESSADORES_LOTES = {
+    'c6': processar_lotes_c6,
+    'bradesco': processar_lotes_bradesco,
+    'bb': processar_lotes_bb
+}
+
 # Mapeamento de chaves de arquivos no config
 MAPEAMENTO_ARQUIVOS = {
     'c6': 'c6_bank',
@@ -9,6 +9,7 @@ Gera uma tabela padronizada com informações de investimentos.
 """
 
 import pandas as pd
+from utils import ler_planilha, listar_abas
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -53,31 +54,21 @@ def processar(config: dict) -> pd.DataFrame:
         arquivo_b3 = config['arquivos'].get('b3', 'extratos/relatorio-consolidado-mensal-2025-junho.xlsx')
         mes_referencia = config['processamento'].get('mes_b3', 'junho/2025')
         
-        # Ler arquivo Excel
-        excel_file = pd.ExcelFile(arquivo_b3)
+        motor = config['processamento'].get('motor_planilha')
         
-        # Processar cada aba
-        resultados = []
+        # Cada aba de posição e o seu processador
+        processadores_abas = {
+            'Posição - Ações': _processar_acoes,
+            'Posição - Fundos': _processar_fundos,
+            'Posição - Renda Fixa': _processar_renda_fixa,
+            'Posição - Tesouro Direto': _processar_tesouro_direto
+        }
         
-        # Ações
-        if 'Posição - Ações' in excel_file.sheet_names:
-            df_acoes = _processar_acoes(pd.read_excel(arquivo_b3, sheet_name='Posição - Ações'), mes_referencia)
-            resultados.append(df_acoes)
+        # Ler de uma vez só as abas presentes, em vez de reabrir o arquivo por aba
+        abas_presentes = [aba for aba in processadores_abas if aba in listar_abas(arquivo_b3, motor)]
+        planilhas = ler_planilha(arquivo_b3, sheet_name=abas_presentes, motor=motor) if abas_presentes else {}
         
-        # Fundos
-        if 'Posição - Fundos' in excel_file.sheet_names:
-            df_fundos = _processar_fundos(pd.read_excel(arquivo_b3, sheet_name='Posição - Fundos'), mes_referencia)
-            resultados.append(df_fundos)
-        
-        # Renda Fixa
-        if 'Posição - Renda Fixa' in excel_file.sheet_names:
-            df_renda_fixa = _processar_renda_fixa(pd.read_excel(arquivo_b3, sheet_name='Posição - Renda Fixa'), mes_referencia)
-            resultados.append(df_renda_fixa)
-        
-        # Tesouro Direto
-        if 'Posição - Tesouro Direto' in excel_file.sheet_names:
-            df_tesouro = _processar_tesouro_direto(pd.read_excel(arquivo_b3, sheet_name='Posição - Tesouro Direto'), mes_referencia)
-            resultados.append(df_tesouro)
+        resultados = [processadores_abas[aba](planilhas[aba], mes_referencia) for aba in abas_presentes]
         
         # Combinar todos os resultados
         if resultados:
@@ -5,7 +5,11 @@ Processador de extratos do Banco do Brasil.
 import pandas as pd
 import re
 from pathlib import Path
-from utils import categorizar_transacao_auto, criar_dataframe_padronizado, extrair_agencia_conta
+from typing import Iterator
+from utils import (
+    categorizar_transacao_auto, criar_dataframe_padronizado, extrair_agencia_conta, TAMANHO_LOTE_PADRAO,
+    listar_arquivos, arquivo_disponivel, nome_arquivo, fonte_leitura
+)
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,79 +18,134 @@ logger = get_logger(__name__)
 def processar(config: dict) -> pd.DataFrame:
     logger.info("📊 Processando Banco do Brasil...")
     try:
-        arquivos_bb = config['arquivos']['bb']
-        if isinstance(arquivos_bb, str):
-            arquivos_bb = [arquivos_bb]
-        arquivos_ordenados = _ordenar_arquivos_por_data(arquivos_bb)
+        arquivos_ordenados = _listar_arquivos(config)
         agencia_conta = None
         dfs = []
         saldo_inicial_detectado = False
         for idx, arquivo_path in enumerate(arquivos_ordenados):
-            if not Path(arquivo_path).exists():
+            if not arquivo_disponivel(arquivo_path):
                 continue
             if agencia_conta is None:
-                from utils import extrair_agencia_conta
                 agencia_conta = extrair_agencia_conta(arquivo_path, 'Banco do Brasil')
-            import pandas as pd
-            df = pd.read_csv(
-                arquivo_path,
-                encoding='latin1',
-                skiprows=config['processamento']['skip_rows_bb']
-            )
+            df = pd.read_csv(fonte_leitura(arquivo_path), **_opcoes_leitura(config))
             if not saldo_inicial_detectado:
                 _extrair_saldo_anterior(df, config)
                 saldo_inicial_detectado = True
-            filtros_exclusao = ['Saldo Anterior', 'Saldo do dia', 'S A L D O', 'BB Rende Fácil']
-            for filtro in filtros_exclusao:
-                df = df[~df['Lançamento'].str.contains(filtro, na=False)]
+            df = _calcular_valores(df)
             if not df.empty:
-                df['valor_num'] = df['Valor'].astype(str).str.replace('.', '').str.replace(',', '.').astype(float)
-                df['valor_final'] = df.apply(_aplicar_sinal_correto, axis=1)
-                df[['entrada', 'saida']] = df.apply(
-                    lambda row: pd.Series(_calcular_valores_entrada_saida(row)), axis=1
-                )
                 dfs.append(df)
         if not dfs:
             logger.warning("Nenhum arquivo válido encontrado")
             return pd.DataFrame()
         df_final = pd.concat(dfs, ignore_index=True)
-        # Remove transações de pagamento de cartão de crédito para evitar duplicidade
-        df_final = df_final[~df_final['Lançamento'].str.upper().str.contains('PAGTO CARTÃO', na=False)]
-        data_dict = {
-            'Data': pd.to_datetime(df_final['Data'], dayfirst=True, errors='coerce'),
-            'Data_Contabil': pd.to_datetime(df_final['Data'], dayfirst=True, errors='coerce'),
-            'Banco': 'Banco do Brasil',
-            'Agencia_Conta': agencia_conta,
-            'Tipo_Transacao': df_final['Lançamento'],
-            'Descricao': df_final['Detalhes'],
-            'Valor': df_final['valor_final'],
-            'Valor_Entrada': df_final['entrada'],
-            'Valor_Saida': df_final['saida']
-        }
-        resultado = criar_dataframe_padronizado(data_dict)
-        resultado['Categoria_Auto'] = resultado.apply(
-            lambda row: categorizar_transacao_auto(
-                row['Tipo_Transacao'],
-                row['Descricao'],
-                row['Valor'],
-                config['categorias']
-            ), axis=1
-        )
+        resultado = _padronizar(df_final, agencia_conta, config)
         logger.info(f"✅ Transações processadas de arquivo(s)")
         return resultado
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro: {e}")
         return pd.DataFrame()
 
 
-def _ordenar_arquivos_por_data(arquivos: list) -> list:
+def processar_lotes(config: dict, tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> Iterator[pd.DataFrame]:
+    """
+    Versão em lotes de processar(): lê cada CSV em blocos de até tamanho_lote
+    linhas e gera um DataFrame padronizado (já categorizado) por bloco.
+    Erros são propagados para quem consome o gerador.
+    """
+    logger.info("📊 Processando Banco do Brasil em lotes...")
+    agencia_conta = None
+    primeiro_arquivo = True
+    saldo_extraido = False
+    for arquivo_path in _listar_arquivos(config):
+        if not arquivo_disponivel(arquivo_path):
+            continue
+        if agencia_conta is None:
+            agencia_conta = extrair_agencia_conta(arquivo_path, 'Banco do Brasil')
+        with pd.read_csv(fonte_leitura(arquivo_path), chunksize=tamanho_lote, **_opcoes_leitura(config)) as leitor:
+            for bloco in leitor:
+                # O saldo anterior vem do primeiro arquivo, como em processar()
+                if primeiro_arquivo and not saldo_extraido:
+                    saldo_extraido = _extrair_saldo_anterior(bloco, config)
+                df = _calcular_valores(bloco)
+                if not df.empty:
+                    resultado = _padronizar(df, agencia_conta, config)
+                    if not resultado.empty:
+                        yield resultado
+        primeiro_arquivo = False
+
+
+def _listar_arquivos(config: dict) -> list:
+    return _ordenar_arquivos_por_data(listar_arquivos(config['arquivos']['bb']), config.get('nomes_originais'))
+
+
+def _opcoes_leitura(config: dict) -> dict:
+    return {
+        'encoding': 'latin1',
+        'skiprows': config['processamento']['skip_rows_bb']
+    }
+
+
+def _calcular_valores(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove linhas de saldo e calcula valor com sinal, entrada e saída"""
+    filtros_exclusao = ['Saldo Anterior', 'Saldo do dia', 'S A L D O', 'BB Rende Fácil']
+    for filtro in filtros_exclusao:
+        df = df[~df['Lançamento'].str.contains(filtro, na=False)]
+    if df.empty:
+        return df
+    df = df.copy()
+    df['valor_num'] = df['Valor'].astype(str).str.replace('.', '').str.replace(',', '.').astype(float)
+    df['valor_final'] = df.apply(_aplicar_sinal_correto, axis=1)
+    df[['entrada', 'saida']] = df.apply(
+        lambda row: pd.Series(_calcular_valores_entrada_saida(row)), axis=1
+    )
+    return df
+
+
+def _padronizar(df_final: pd.DataFrame, agencia_conta: str, config: dict) -> pd.DataFrame:
+    # Remove transações de pagamento de cartão de crédito para evitar duplicidade
+    df_final = df_final[~df_final['Lançamento'].str.upper().str.contains('PAGTO CARTÃO', na=False)]
+    data_dict = {
+        'Data': pd.to_datetime(df_final['Data'], dayfirst=True, errors='coerce'),
+        'Data_Contabil': pd.to_datetime(df_final['Data'], dayfirst=True, errors='coerce'),
+        'Banco': 'Banco do Brasil',
+        'Agencia_Conta': agencia_conta,
+        'Tipo_Transacao': df_final['Lançamento'],
+        'Descricao': df_final['Detalhes'],
+        'Valor': df_final['valor_final'],
+        'Valor_Entrada': df_final['entrada'],
+        'Valor_Saida': df_final['saida']
+    }
+    resultado = criar_dataframe_padronizado(data_dict)
+    if resultado.empty:
+        return resultado
+    resultado['Categoria_Auto'] = resultado.apply(
+        lambda row: categorizar_transacao_auto(
+            row['Tipo_Transacao'],
+            row['Descricao'],
+            row['Valor'],
+            config['categorias']
+        ), axis=1
+    )
+    return resultado
+
+
+def _ordenar_arquivos_por_data(arquivos: list, nomes_originais: dict = None) -> list:
+    """
+    Ordena os extratos pelo mês/ano no nome do arquivo. nomes_originais
+    (arquivo -> nome enviado) substitui o nome em disco quando este não é o
+    original, como nos uploads da interface web, gravados pelo conteúdo.
+    """
+    nomes_originais = nomes_originais or {}
+
     def extrair_data_nome(arquivo):
-        nome = Path(arquivo).name
-        match = re.search(r'(\\d{2})(\\d{4})', nome)
+        nome = Path(nomes_originais.get(arquivo) or nome_arquivo(arquivo)).name
+        match = re.search(r'(\d{2})(\d{4})', nome)
         if match:
             mes, ano = match.groups()
             return f"{ano}-{mes.zfill(2)}"
-        match = re.search(r'(\\d{1,2})-(\\d{4})', nome)
+        match = re.search(r'(\d{1,2})-(\d{4})', nome)
         if match:
             mes, ano = match.groups()
             return f"{ano}-{mes.zfill(2)}"
@@ -97,7 +156,7 @@ def _ordenar_arquivos_por_data(arquivos: list) -> list:
         return arquivos
 
 
-def _extrair_saldo_anterior(df: pd.DataFrame, config: dict) -> None:
+def _extrair_saldo_anterior(df: pd.DataFrame, config: dict) -> bool:
     try:
         saldo_anterior_linhas = df[df['Lançamento'].str.contains('Saldo Anterior', na=False)]
         if not saldo_anterior_linhas.empty:
@@ -105,8 +164,10 @@ def _extrair_saldo_anterior(df: pd.DataFrame, config: dict) -> None:
             valor_str = str(primeira_linha['Valor']).replace('.', '').replace(',', '.')
             saldo_anterior = float(valor_str)
             config['saldos_iniciais']['bb'] = saldo_anterior
+            return True
     except Exception as e:
         pass
+    return False
 
 
 def _aplicar_sinal_correto(row):
@@ -6,7 +6,7 @@ import pandas as pd
 import re
 from pathlib import Path
 from datetime import datetime
-from utils import criar_dataframe_padronizado
+from utils import criar_dataframe_padronizado, listar_arquivos, arquivo_disponivel, fonte_leitura
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,9 +15,7 @@ logger = get_logger(__name__)
 def processar(config: dict) -> pd.DataFrame:
     logger.info("📊 Processando fatura do cartão BB...")
     try:
-        arquivos_bb_cartao = config['arquivos']['bb_cartao']
-        if isinstance(arquivos_bb_cartao, str):
-            arquivos_bb_cartao = [arquivos_bb_cartao]
+        arquivos_bb_cartao = listar_arquivos(config['arquivos']['bb_cartao'])
         senha_pdf = config['usuario']['cpf'][:5]
         import warnings, logging
         warnings.filterwarnings("ignore")
@@ -28,14 +26,14 @@ def processar(config: dict) -> pd.DataFrame:
         from pathlib import Path
         from datetime import datetime
         for pdf_path in arquivos_bb_cartao:
-            if not Path(pdf_path).exists():
+            if not arquivo_disponivel(pdf_path):
                 logger.warning(f"Arquivo não encontrado")
                 continue
             transacoes = []
             ano_fatura = str(datetime.now().year)
             import pdfplumber
             try:
-                with pdfplumber.open(pdf_path, password=senha_pdf) as pdf:
+                with pdfplumber.open(fonte_leitura(pdf_path), password=senha_pdf) as pdf:
                     all_text = ""
                     for page in pdf.pages:
                         page_text = page.extract_text()
@@ -46,7 +44,7 @@ def processar(config: dict) -> pd.DataFrame:
                     transacoes = _extrair_transacoes(all_text, ano_fatura)
             except Exception:
                 try:
-                    with pdfplumber.open(pdf_path) as pdf:
+                    with pdfplumber.open(fonte_leitura(pdf_path)) as pdf:
                         all_text = ""
                         for page in pdf.pages:
                             page_text = page.extract_text()
@@ -55,6 +53,8 @@ def processar(config: dict) -> pd.DataFrame:
                         nome_cartao = _extrair_nome_cartao(all_text)
                         ano_fatura = _extrair_ano_fatura(all_text)
                         transacoes = _extrair_transacoes(all_text, ano_fatura)
+                except MemoryError:
+                    raise
                 except Exception as e_sem_senha:
                     logger.error(f"Erro ao processar arquivo: {e_sem_senha}")
                     continue
@@ -79,6 +79,8 @@ def processar(config: dict) -> pd.DataFrame:
         resultado['Categoria_Auto'] = 'Cartão Crédito'
         logger.info(f"✅ Transações processadas de arquivo(s)")
         return resultado
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar PDF: {e}")
         import traceback
@@ -3,7 +3,7 @@ Processador de fatura do cartão de crédito do C6 Bank.
 """
 
 import pandas as pd
-from utils import categorizar_transacao_auto, criar_dataframe_padronizado
+from utils import categorizar_transacao_auto, criar_dataframe_padronizado, listar_arquivos, nome_arquivo, fonte_leitura
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,11 +13,8 @@ def processar(config: dict) -> pd.DataFrame:
     logger.info("📊 Processando fatura do cartão C6...")
     
     try:
-        arquivos_c6_cartao = config['arquivos']['c6_cartao']
-        
-        # Suportar tanto string (arquivo único) quanto lista (múltiplos arquivos)
-        if isinstance(arquivos_c6_cartao, str):
-            arquivos_c6_cartao = [arquivos_c6_cartao]
+        # Suportar tanto arquivo único quanto lista (múltiplos arquivos)
+        arquivos_c6_cartao = listar_arquivos(config['arquivos']['c6_cartao'])
         
         todas_transacoes = []
         
@@ -28,7 +25,7 @@ def processar(config: dict) -> pd.DataFrame:
             try:
                 # Ler o CSV da fatura do C6
                 df = pd.read_csv(
-                    arquivo_path,
+                    fonte_leitura(arquivo_path),
                     encoding='utf-8',
                     sep=';',  # Arquivo usa ponto e vírgula como separador
                     header=0
@@ -37,7 +34,7 @@ def processar(config: dict) -> pd.DataFrame:
                 df = df.dropna(how='all', axis=1).dropna(how='all', axis=0)
                 
                 if df.empty:
-                    logger.warning(f"Arquivo vazio: {arquivo_path}")
+                    logger.warning(f"Arquivo vazio: {nome_arquivo(arquivo_path)}")
                     continue
                 
                 # Processar cada transação
@@ -95,14 +92,18 @@ def processar(config: dict) -> pd.DataFrame:
                         
                         todas_transacoes.append(transacao)
                         
+                    except MemoryError:
+                        raise
                     except Exception as e:
                         logger.warning(f"Erro ao processar linha: {e}")
                         continue
                 
-                logger.info(f"✅ Transações processadas do arquivo: {arquivo_path}")
+                logger.info(f"✅ Transações processadas do arquivo: {nome_arquivo(arquivo_path)}")
                 
+            except MemoryError:
+                raise
             except Exception as e:
-                logger.error(f"Erro ao processar arquivo {arquivo_path}: {e}")
+                logger.error(f"Erro ao processar arquivo {nome_arquivo(arquivo_path)}: {e}")
                 continue
         
         if not todas_transacoes:
@@ -132,6 +133,8 @@ def processar(config: dict) -> pd.DataFrame:
         logger.info(f"✅ {len(resultado)} transações processadas do cartão C6")
         return resultado
         
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar cartão C6: {e}")
         import traceback
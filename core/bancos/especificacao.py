@@ -0,0 +1,298 @@
+"""
+Compilador de especificações declarativas de formatos de extrato.
+
+Cada banco com extrato em CSV pode ser descrito por um arquivo JSON em
+bancos/especificacoes/ (encoding, separador, linhas a pular, regex do
+cabeçalho, mapeamento de colunas, regras de sinal, formato de data...).
+compilar_especificacao() transforma a especificação em um processador
+vetorizado com a mesma interface dos módulos escritos à mão.
+
+Chaves suportadas:
+    banco, chave_arquivo          nome exibido e chave em config['arquivos']
+    leitura                       encoding, separador, skip_rows (int ou chave
+                                  em config['processamento']),
+                                  ignorar_linhas_invalidas, remover_linhas_vazias
+    cabecalho                     regex com grupos para agência/conta, lido das
+                                  primeiras 'linhas' ou 'caracteres' do arquivo,
+                                  e 'formato' usando os grupos ({0}, {1}, ...)
+    linha_valida                  {coluna, regex}: mantém só as linhas que casam
+    saldo_inicial                 metodo 'linha' (valor de uma linha marcadora) ou
+                                  'saldo_do_dia' (saldo do dia mais antigo menos
+                                  as transações daquele dia)
+    remover_linhas                lista de {coluna, regex} a descartar
+    colunas                       Data, Data_Contabil, Tipo_Transacao, Descricao
+    formato_data                  formato strftime; sem ele usa dayfirst
+    valores                       formato 'br' (1.234,56) ou 'decimal' e as
+                                  colunas 'entrada'/'saida' ou uma coluna 'valor'
+                                  com sinal
+    regras_sinal                  lista de {coluna, contem, acao}; acao
+                                  'saida_como_entrada' trata a saída como entrada
+    remover_sem_data              descarta linhas sem data válida
+    categorias_fixas              lista de {contem, categoria} com prioridade
+                                  sobre a categorização automática
+"""
+
+import json
+import os
+import re
+import pandas as pd
+from typing import Callable, Iterator, Tuple
+from utils import (
+    categorizar_transacoes, converter_valor_br, converter_valores_br, criar_dataframe_padronizado, TAMANHO_LOTE_PADRAO,
+    abrir_texto, fonte_leitura
+)
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+DIRETORIO_ESPECIFICACOES = os.path.join(os.path.dirname(__file__), 'especificacoes')
+
+ACOES_SINAL = ('saida_como_entrada',)
+METODOS_SALDO = ('linha', 'saldo_do_dia')
+
+
+def carregar_especificacao(nome: str) -> dict:
+    """Carrega bancos/especificacoes/<nome>.json"""
+    caminho = os.path.join(DIRETORIO_ESPECIFICACOES, f'{nome}.json')
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compilar_especificacao(espec: dict) -> Tuple[Callable, Callable]:
+    """
+    Valida a especificação e retorna (processar, processar_lotes), com as
+    mesmas assinaturas de processar(config) e processar_lotes(config, tamanho_lote).
+    """
+    _validar(espec)
+
+    banco = espec['banco']
+    leitura = espec['leitura']
+
+    def opcoes_leitura(config: dict) -> dict:
+        skip_rows = leitura.get('skip_rows', 0)
+        if isinstance(skip_rows, str):
+            skip_rows = config['processamento'][skip_rows]
+        opcoes = {
+            'encoding': leitura.get('encoding', 'utf-8'),
+            'sep': leitura.get('separador', ','),
+            'skiprows': skip_rows
+        }
+        if leitura.get('ignorar_linhas_invalidas'):
+            opcoes['on_bad_lines'] = 'skip'
+        return opcoes
+
+    def processar(config: dict) -> pd.DataFrame:
+        logger.info(f"📊 Processando {banco}...")
+
+        try:
+            arquivo_path = config['arquivos'][espec['chave_arquivo']]
+            agencia_conta = _extrair_agencia_conta(arquivo_path, espec)
+
+            df = _preparar(pd.read_csv(fonte_leitura(arquivo_path), **opcoes_leitura(config)), espec)
+
+            if df.empty:
+                logger.warning("Arquivo vazio")
+                return pd.DataFrame()
+
+            _atualizar_saldo_inicial(df, espec, config, {})
+            resultado = _padronizar(df, espec, agencia_conta, config)
+
+            logger.info(f"✅ Transações processadas")
+            return resultado
+
+        except MemoryError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro: {e}")
+            return pd.DataFrame()
+
+    def processar_lotes(config: dict, tamanho_lote: int = TAMANHO_LOTE_PADRAO) -> Iterator[pd.DataFrame]:
+        logger.info(f"📊 Processando {banco} em lotes...")
+
+        arquivo_path = config['arquivos'][espec['chave_arquivo']]
+        agencia_conta = _extrair_agencia_conta(arquivo_path, espec)
+        estado_saldo = {}
+
+        with pd.read_csv(fonte_leitura(arquivo_path), chunksize=tamanho_lote, **opcoes_leitura(config)) as leitor:
+            for bloco in leitor:
+                df = _preparar(bloco, espec)
+                if df.empty:
+                    continue
+                _atualizar_saldo_inicial(df, espec, config, estado_saldo)
+                resultado = _padronizar(df, espec, agencia_conta, config)
+                if not resultado.empty:
+                    yield resultado
+
+    processar.__doc__ = f"Processa extrato do {banco} (compilado da especificação declarativa)"
+    processar_lotes.__doc__ = f"Versão em lotes do processador do {banco} (compilado da especificação declarativa)"
+    return processar, processar_lotes
+
+
+def _validar(espec: dict) -> None:
+    """Falha cedo, ao importar bancos/, se a especificação estiver incompleta"""
+    for chave in ['banco', 'chave_arquivo', 'leitura', 'colunas', 'valores']:
+        if chave not in espec:
+            raise ValueError(f"Especificação sem a chave obrigatória '{chave}'")
+
+    for coluna in ['Data', 'Tipo_Transacao', 'Descricao']:
+        if coluna not in espec['colunas']:
+            raise ValueError(f"Especificação de {espec['banco']} sem a coluna '{coluna}'")
+
+    valores = espec['valores']
+    if 'valor' not in valores and not ('entrada' in valores and 'saida' in valores):
+        raise ValueError(f"Especificação de {espec['banco']} precisa de 'valor' ou 'entrada' e 'saida'")
+    if valores.get('formato', 'decimal') not in ('br', 'decimal'):
+        raise ValueError(f"Formato de valores desconhecido: {valores['formato']}")
+
+    for regra in espec.get('regras_sinal', []):
+        if regra.get('acao') not in ACOES_SINAL:
+            raise ValueError(f"Regra de sinal desconhecida: {regra.get('acao')}")
+
+    saldo = espec.get('saldo_inicial')
+    if saldo and saldo.get('metodo') not in METODOS_SALDO:
+        raise ValueError(f"Método de saldo inicial desconhecido: {saldo.get('metodo')}")
+
+
+def _extrair_agencia_conta(arquivo_path: str, espec: dict) -> str:
+    """Procura a agência/conta no início do arquivo usando a regex do cabeçalho"""
+    cabecalho = espec.get('cabecalho')
+    if not cabecalho:
+        return espec['banco']
+
+    try:
+        with abrir_texto(arquivo_path, encoding=cabecalho.get('encoding', 'utf-8')) as f:
+            if 'linhas' in cabecalho:
+                texto = ''.join(f.readline() for _ in range(cabecalho['linhas']))
+            else:
+                texto = f.read(cabecalho.get('caracteres', 500))
+
+        match = re.search(cabecalho['regex'], texto)
+        if match:
+            return cabecalho['formato'].format(*match.groups())
+    except Exception:
+        pass
+
+    return espec['banco']
+
+
+def _preparar(df: pd.DataFrame, espec: dict) -> pd.DataFrame:
+    """Remove linhas vazias e mantém apenas as linhas válidas de transação"""
+    if espec['leitura'].get('remover_linhas_vazias'):
+        df = df.dropna(how='all')
+
+    linha_valida = espec.get('linha_valida')
+    if linha_valida:
+        coluna = df[linha_valida['coluna']]
+        df = df[coluna.notna() & coluna.astype(str).str.contains(linha_valida['regex'], na=False)]
+
+    return df
+
+
+def _converter_data(serie: pd.Series, espec: dict) -> pd.Series:
+    formato = espec.get('formato_data')
+    if formato:
+        return pd.to_datetime(serie, format=formato, errors='coerce')
+    return pd.to_datetime(serie, dayfirst=True, errors='coerce')
+
+
+def _converter_valores(serie: pd.Series, formato: str) -> pd.Series:
+    if formato == 'br':
+        return converter_valores_br(serie).fillna(0)
+    return pd.to_numeric(serie.fillna(0), errors='coerce')
+
+
+def _atualizar_saldo_inicial(df: pd.DataFrame, espec: dict, config: dict, estado: dict) -> None:
+    """
+    Atualiza config['saldos_iniciais'] a partir do bloco atual. O dicionário
+    estado guarda o que já foi visto nos blocos anteriores, de modo que ler o
+    arquivo inteiro ou em lotes produz o mesmo saldo.
+    """
+    regra = espec.get('saldo_inicial')
+    if not regra:
+        return
+
+    try:
+        if regra['metodo'] == 'linha':
+            if estado.get('encontrado'):
+                return
+            linhas = df[df[regra['coluna']].astype(str).str.contains(regra['regex'], na=False, regex=True)]
+            if not linhas.empty:
+                config['saldos_iniciais'][regra['chave']] = converter_valor_br(linhas.iloc[0][regra['coluna_valor']]) or 0
+                estado['encontrado'] = True
+
+        elif regra['metodo'] == 'saldo_do_dia':
+            # Saldo inicial = Saldo do Dia do dia mais antigo - transações daquele dia
+            datas = _converter_data(df[regra['coluna_data']], espec)
+            dia_mais_antigo = datas.min()
+            if pd.isna(dia_mais_antigo):
+                estado.setdefault('saldo', 0.0)
+            else:
+                do_dia = df[datas == dia_mais_antigo]
+                entradas = pd.to_numeric(do_dia[espec['valores']['entrada']].fillna(0), errors='coerce').sum()
+                saidas = pd.to_numeric(do_dia[espec['valores']['saida']].fillna(0), errors='coerce').sum()
+
+                if 'dia' not in estado or dia_mais_antigo < estado['dia']:
+                    estado['dia'] = dia_mais_antigo
+                    estado['saldo_do_dia'] = pd.to_numeric(do_dia[regra['coluna_saldo']].iloc[0], errors='coerce')
+                    estado['total'] = entradas - saidas
+                elif dia_mais_antigo == estado['dia']:
+                    estado['total'] += entradas - saidas
+                estado['saldo'] = estado['saldo_do_dia'] - estado['total']
+
+            config['saldos_iniciais'][regra['chave']] = estado['saldo']
+    except Exception:
+        pass
+
+
+def _padronizar(df: pd.DataFrame, espec: dict, agencia_conta: str, config: dict) -> pd.DataFrame:
+    """Aplica filtros, valores, regras de sinal e categorização de uma vez por coluna"""
+    for regra in espec.get('remover_linhas', []):
+        df = df[~df[regra['coluna']].astype(str).str.contains(regra['regex'], na=False, regex=True)]
+
+    colunas = espec['colunas']
+    valores = espec['valores']
+    formato = valores.get('formato', 'decimal')
+
+    if 'valor' in valores:
+        valor = _converter_valores(df[valores['valor']], formato)
+        entrada = valor.clip(lower=0)
+        saida = (-valor).clip(lower=0)
+    else:
+        entrada = _converter_valores(df[valores['entrada']], formato)
+        saida = _converter_valores(df[valores['saida']], formato)
+        valor = entrada - saida
+
+    for regra in espec.get('regras_sinal', []):
+        mascara = df[regra['coluna']].astype(str).str.contains(regra['contem'], na=False, case=False, regex=False)
+        if regra['acao'] == 'saida_como_entrada':
+            entrada = entrada.mask(mascara, saida)
+            saida = saida.mask(mascara, 0.0)
+            valor = valor.mask(mascara, entrada)
+
+    data = _converter_data(df[colunas['Data']], espec)
+    data_dict = {
+        'Data': data,
+        'Data_Contabil': _converter_data(df[colunas['Data_Contabil']], espec) if 'Data_Contabil' in colunas else data,
+        'Banco': espec['banco'],
+        'Agencia_Conta': agencia_conta,
+        'Tipo_Transacao': df[colunas['Tipo_Transacao']],
+        'Descricao': df[colunas['Descricao']],
+        'Valor': valor,
+        'Valor_Entrada': entrada,
+        'Valor_Saida': saida
+    }
+
+    resultado = criar_dataframe_padronizado(data_dict)
+
+    if espec.get('remover_sem_data'):
+        resultado = resultado.dropna(subset=['Data'])
+
+    resultado['Categoria_Auto'] = categorizar_transacoes(
+        resultado['Tipo_Transacao'],
+        resultado['Descricao'],
+        resultado['Valor'],
+        config['categorias'],
+        categorias_fixas=espec.get('categorias_fixas')
+    )
+
+    return resultado
@@ -3,7 +3,7 @@ Processador de extratos do Itaú.
 """
 
 import pandas as pd
-from utils import categorizar_transacao_auto, criar_dataframe_padronizado, extrair_agencia_conta
+from utils import categorizar_transacao_auto, criar_dataframe_padronizado, extrair_agencia_conta, ler_planilha, nome_arquivo
 from logger import get_logger
 import re
 
@@ -17,8 +17,8 @@ def processar(config: dict) -> pd.DataFrame:
     try:
         arquivos_itau = config['arquivos']['itau']
         
-        # Suportar tanto string (arquivo único) quanto lista (múltiplos arquivos)
-        if isinstance(arquivos_itau, str):
+        # Suportar tanto arquivo único (caminho ou objeto de arquivo) quanto lista (múltiplos arquivos)
+        if not isinstance(arquivos_itau, (list, tuple)):
             if not arquivos_itau:
                 logger.warning("Caminho do arquivo Itaú não configurado")
                 return pd.DataFrame()
@@ -32,9 +32,9 @@ def processar(config: dict) -> pd.DataFrame:
             if not arquivo_path:
                 continue
                 
-            if arquivo_path.endswith('.xls'):
+            if nome_arquivo(arquivo_path).endswith('.xls'):
                 df = _processar_conta_corrente(arquivo_path, config)
-            elif arquivo_path.endswith('.xlsx'):
+            elif nome_arquivo(arquivo_path).endswith('.xlsx'):
                 df = _processar_cartao_credito(arquivo_path, config)
             else:
                 continue
@@ -49,6 +49,8 @@ def processar(config: dict) -> pd.DataFrame:
         else:
             return pd.DataFrame()
             
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro: {e}")
         return pd.DataFrame()
@@ -56,13 +58,14 @@ def processar(config: dict) -> pd.DataFrame:
 
 def _processar_conta_corrente(arquivo_path: str, config: dict) -> pd.DataFrame:
     try:
-        agencia_conta = extrair_agencia_conta(arquivo_path, 'Itaú')
+        motor = config['processamento'].get('motor_planilha')
+        agencia_conta = extrair_agencia_conta(arquivo_path, 'Itaú', motor)
         
-        df = pd.read_excel(
+        df = ler_planilha(
             arquivo_path,
-            engine='xlrd',
             header=None,
-            skiprows=config['processamento']['skip_rows_itau']
+            skiprows=config['processamento']['skip_rows_itau'],
+            motor=motor
         )
         
         df = df.dropna(how='all', axis=1).dropna(how='all', axis=0)
@@ -111,6 +114,8 @@ def _processar_conta_corrente(arquivo_path: str, config: dict) -> pd.DataFrame:
         logger.info(f"✅ Transações processadas")
         return resultado
         
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar conta corrente: {e}")
         return pd.DataFrame()
@@ -118,7 +123,8 @@ def _processar_conta_corrente(arquivo_path: str, config: dict) -> pd.DataFrame:
 
 def _processar_cartao_credito(arquivo_path: str, config: dict) -> pd.DataFrame:
     try:
-        df = pd.read_excel(arquivo_path, sheet_name='Lançamentos', header=None)
+        df = ler_planilha(arquivo_path, sheet_name='Lançamentos', header=None,
+                          motor=config['processamento'].get('motor_planilha'))
         
         if df.empty:
             logger.warning("Arquivo vazio")
@@ -227,6 +233,8 @@ def _processar_cartao_credito(arquivo_path: str, config: dict) -> pd.DataFrame:
         logger.info(f"✅ Transações processadas")
         return resultado
         
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar cartão de crédito: {e}")
         import traceback
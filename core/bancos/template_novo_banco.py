@@ -1,7 +1,13 @@
 """
 Template para criar processador de novo banco.
 
-Para adicionar um novo banco ao sistema:
+Se o extrato do banco for um CSV com uma linha por transação, prefira
+descrevê-lo em bancos/especificacoes/<banco>.json (veja bradesco.json, c6.json
+e as chaves documentadas em bancos/especificacao.py) e registrá-lo em
+bancos/__init__.py com compilar_especificacao(). O processador compilado já
+é vetorizado e suporta processamento em lotes.
+
+Para formatos que não cabem numa especificação:
 
 1. Copie este arquivo e renomeie para 'nome_do_banco.py'
 2. Implemente a função processar() com a lógica específica do banco
@@ -86,6 +92,9 @@ def processar(config: dict) -> pd.DataFrame:
         logger.info(f"✅ Transações processadas")
         return resultado
         
+    except MemoryError:
+        # Não engolir o estouro do limite de memória (ver processador.processar_bancos)
+        raise
     except Exception as e:
         logger.error(f"Erro: {e}")
         return pd.DataFrame()
@@ -46,6 +46,7 @@ Exemplos de uso:
   python3 main.py --c6 --c6-cartao         # C6 Bank conta + cartão
   python3 main.py --bb --bb-cartao         # BB conta corrente + cartão
   python3 main.py --itau --c6              # Itaú + C6 Bank
+  python3 main.py --pasta extratos/        # Detectar bancos dos arquivos da pasta
   python3 main.py --help                   # Mostrar esta ajuda
         """
     )
@@ -82,6 +83,10 @@ Exemplos de uso:
                        action='store_true',
                        help='Processar relatório da B3 (investimentos)')
     
+    parser.add_argument('--pasta',
+                       type=str,
+                       help='Pasta com extratos misturados: banco e formato de cada arquivo são detectados automaticamente')
+    
     parser.add_argument('--output', 
                        type=str,
                        help='Nome do arquivo de saída (padrão do config.json)')
@@ -90,6 +95,11 @@ Exemplos de uso:
 
 
 def validar_argumentos(args):
+    if getattr(args, 'pasta', None):
+        if not Path(args.pasta).is_dir():
+            logger.error(f"Erro: pasta não encontrada: {args.pasta}")
+            return False
+        return True
     if not args.all and not any([args.c6, args.c6_cartao, args.bradesco, args.bb, args.bb_cartao, args.itau, args.b3]):
         logger.error("Erro: Você deve especificar --all ou pelo menos um banco específico")
         logger.info("💡 Use --help para ver os exemplos de uso")
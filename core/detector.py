@@ -0,0 +1,205 @@
+"""
+Detecção automática do banco e do formato de arquivos de extrato.
+
+Lê apenas o início de cada arquivo (linhas de cabeçalho do CSV, nomes das
+abas e primeiras linhas da planilha, texto da primeira página do PDF) para
+descobrir o banco, o tipo de extrato e quantas linhas pular até o cabeçalho,
+sem precisar tentar processar o arquivo inteiro.
+"""
+
+import re
+import pandas as pd
+from pathlib import Path
+from bancos import MAPEAMENTO_ARQUIVOS
+from utils import ler_planilha, listar_abas
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes lidos do início de cada arquivo
+TAMANHO_AMOSTRA = 8192
+
+# Linhas das planilhas inspecionadas em busca do cabeçalho
+LINHAS_PLANILHA = 30
+
+ASSINATURA_OLE = b'\xd0\xcf\x11\xe0'  # .xls
+ASSINATURA_ZIP = b'PK\x03\x04'  # .xlsx
+ASSINATURA_PDF = b'%PDF'
+
+# (banco, tipo de extrato, regex da linha de cabeçalho, chave de skip_rows no config)
+ASSINATURAS_CSV = [
+    ('bradesco', 'conta_corrente', r'^Data;Histórico;Docto\.;Crédito \(R\$\);Débito \(R\$\)', 'skip_rows_bradesco'),
+    ('c6', 'conta_corrente', r'^Data Lançamento,Data Contábil,Título,Descrição', 'skip_rows_c6'),
+    ('c6_cartao', 'cartao_credito', r'^Data de Compra;Nome no Cartão;Final do Cartão', None),
+    ('bb', 'conta_corrente', r'^"?Data"?,"?Lançamento"?,"?Detalhes"?', 'skip_rows_bb'),
+]
+
+ABAS_B3 = ['Posição - Ações', 'Posição - Fundos', 'Posição - Renda Fixa', 'Posição - Tesouro Direto']
+
+MARCADORES_PDF_BB = ['OUROCARD', 'BANCO DO BRASIL']
+
+
+def detectar_formato(arquivo_path: str, senha_pdf: str = None) -> dict:
+    """
+    Identifica o formato de um arquivo de extrato.
+
+    Args:
+        arquivo_path: Caminho do arquivo
+        senha_pdf: Senha usada para abrir PDFs protegidos (opcional)
+
+    Returns:
+        Dicionário com 'banco' (chave de PROCESSADORES ou 'b3'), 'tipo' e
+        'skip_rows' (None quando o processador não usa), ou None se o formato
+        não for reconhecido
+    """
+    try:
+        with open(arquivo_path, 'rb') as f:
+            amostra = f.read(TAMANHO_AMOSTRA)
+    except OSError as e:
+        logger.warning(f"Não foi possível ler {Path(arquivo_path).name}: {e}")
+        return None
+
+    try:
+        if amostra.startswith(ASSINATURA_PDF):
+            return _detectar_pdf(arquivo_path, senha_pdf)
+        if amostra.startswith(ASSINATURA_OLE):
+            return _detectar_xls(arquivo_path)
+        if amostra.startswith(ASSINATURA_ZIP):
+            return _detectar_xlsx(arquivo_path)
+        return _detectar_csv(amostra)
+    except Exception as e:
+        logger.debug(f"Falha ao detectar formato de {Path(arquivo_path).name}: {e}")
+        return None
+
+
+def mapear_pasta(pasta: str, config: dict) -> list:
+    """
+    Detecta o formato de todos os arquivos de uma pasta e preenche
+    config['arquivos'] e os skip_rows_* de config['processamento'].
+
+    Returns:
+        Lista com as chaves dos bancos encontrados (na ordem de PROCESSADORES, mais 'b3')
+    """
+    senha_pdf = config.get('usuario', {}).get('cpf', '')[:5] or None
+    encontrados = {}
+
+    for arquivo in sorted(Path(pasta).iterdir()):
+        if not arquivo.is_file() or arquivo.name.startswith('.'):
+            continue
+
+        formato = detectar_formato(str(arquivo), senha_pdf)
+        if formato is None:
+            logger.warning(f"Formato não reconhecido: {arquivo.name}")
+            continue
+
+        logger.info(f"🔎 {arquivo.name}: {formato['banco']} ({formato['tipo']})")
+        encontrados.setdefault(formato['banco'], []).append((str(arquivo), formato))
+
+    arquivos = {'output': config.get('arquivos', {}).get('output', 'output/controle_gastos.xlsx')}
+    processamento = config.setdefault('processamento', {})
+
+    for banco, itens in encontrados.items():
+        chave = MAPEAMENTO_ARQUIVOS.get(banco, banco)
+        caminhos = [caminho for caminho, _ in itens]
+
+        # Bradesco, C6 e B3 aceitam um único arquivo
+        if banco in ('bradesco', 'c6', 'b3'):
+            if len(caminhos) > 1:
+                logger.warning(f"{banco.upper()}: {len(caminhos)} arquivos encontrados, usando apenas {Path(caminhos[0]).name}")
+            arquivos[chave] = caminhos[0]
+        else:
+            arquivos[chave] = caminhos
+
+        chave_skip = _chave_skip_rows(banco)
+        offsets = [formato['skip_rows'] for _, formato in itens if formato['skip_rows'] is not None]
+        if chave_skip and offsets:
+            if len(set(offsets)) > 1:
+                logger.warning(f"{banco.upper()}: arquivos com cabeçalhos em linhas diferentes, usando o do primeiro")
+            processamento[chave_skip] = offsets[0]
+
+    if not encontrados:
+        logger.error(f"Nenhum extrato reconhecido em {pasta}")
+
+    config['arquivos'] = arquivos
+    return [banco for banco in list(MAPEAMENTO_ARQUIVOS) + ['b3'] if banco in encontrados]
+
+
+def _chave_skip_rows(banco: str) -> str:
+    if banco == 'itau':
+        return 'skip_rows_itau'
+    for banco_csv, _, _, chave_skip in ASSINATURAS_CSV:
+        if banco_csv == banco:
+            return chave_skip
+    return None
+
+
+def _decodificar(amostra: bytes) -> str:
+    # Descartar a última linha, que pode ter sido cortada no meio de um caractere
+    if len(amostra) == TAMANHO_AMOSTRA and b'\n' in amostra:
+        amostra = amostra[:amostra.rindex(b'\n')]
+    try:
+        return amostra.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return amostra.decode('latin1')
+
+
+def _detectar_csv(amostra: bytes) -> dict:
+    for indice, linha in enumerate(_decodificar(amostra).splitlines()):
+        for banco, tipo, regex, _ in ASSINATURAS_CSV:
+            if re.match(regex, linha.strip()):
+                return {'banco': banco, 'tipo': tipo, 'skip_rows': indice}
+    return None
+
+
+def _detectar_xls(arquivo_path: str) -> dict:
+    """Itaú conta corrente: procura a linha 'data | lançamento' na primeira aba"""
+    df = ler_planilha(arquivo_path, header=None, nrows=LINHAS_PLANILHA)
+    for indice, linha in enumerate(df.itertuples(index=False)):
+        celulas = [str(valor).strip().lower() for valor in linha[:2]]
+        if celulas == ['data', 'lançamento']:
+            # O processador lê sem cabeçalho, então a própria linha também é pulada
+            return {'banco': 'itau', 'tipo': 'conta_corrente', 'skip_rows': indice + 1}
+    return None
+
+
+def _detectar_xlsx(arquivo_path: str) -> dict:
+    """B3 pelas abas de posição; fatura Itaú pela aba 'Lançamentos' com '- final'"""
+    abas = listar_abas(arquivo_path)
+    if any(aba in abas for aba in ABAS_B3):
+        return {'banco': 'b3', 'tipo': 'investimentos', 'skip_rows': None}
+
+    if 'Lançamentos' in abas:
+        df = ler_planilha(arquivo_path, sheet_name='Lançamentos', header=None, nrows=LINHAS_PLANILHA)
+        for linha in df.itertuples(index=False):
+            texto = ' '.join(str(valor) for valor in linha if pd.notna(valor))
+            if '- final' in texto:
+                return {'banco': 'itau', 'tipo': 'cartao_credito', 'skip_rows': None}
+    return None
+
+
+def _detectar_pdf(arquivo_path: str, senha_pdf: str = None) -> dict:
+    """Fatura do cartão BB: texto da primeira página"""
+    resultado = {'banco': 'bb_cartao', 'tipo': 'cartao_credito', 'skip_rows': None}
+
+    try:
+        import pdfplumber
+
+        for senha in [senha_pdf, None]:
+            try:
+                with pdfplumber.open(arquivo_path, password=senha or '') as pdf:
+                    texto = (pdf.pages[0].extract_text() or '').upper() if pdf.pages else ''
+                break
+            except Exception:
+                continue
+        else:
+            texto = ''
+    except ImportError:
+        texto = ''
+
+    if not texto:
+        # Sem camada de texto legível; a fatura do BB é o único PDF suportado
+        return resultado
+
+    if any(marcador in texto for marcador in MARCADORES_PDF_BB):
+        return resultado
+    return None
@@ -9,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config_manager import carregar_configuracao, configurar_argumentos, validar_argumentos
 from processador import processar_extratos
+from detector import mapear_pasta
 
 
 def main():
@@ -23,9 +24,23 @@ def main():
     if config is None:
         sys.exit(1)
     
+    if args.pasta:
+        selecionar_bancos_da_pasta(args, config)
+    
     sucesso = processar_extratos(args, config)
     sys.exit(0 if sucesso else 1)
 
 
+def selecionar_bancos_da_pasta(args, config):
+    """Mapeia os arquivos da pasta no config e liga as flags dos bancos detectados"""
+    bancos = mapear_pasta(args.pasta, config)
+    if not bancos:
+        sys.exit(1)
+    
+    args.all = False
+    for banco in bancos:
+        setattr(args, banco, True)
+
+
 if __name__ == "__main__":
     main()
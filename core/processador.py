@@ -5,8 +5,11 @@ Processador principal de extratos bancários - orquestração do processamento.
 import pandas as pd
 import warnings
 from pathlib import Path
-from bancos import PROCESSADORES, MAPEAMENTO_ARQUIVOS, NOMES_BANCOS
-from utils import calcular_saldos, detectar_transferencias_proprias, gerar_relatorio, gerar_nome_arquivo_timestamped
+from bancos import PROCESSADORES, PROCESSADORES_LOTES, MAPEAMENTO_ARQUIVOS, NOMES_BANCOS
+from utils import (
+    calcular_saldos, detectar_transferencias_proprias, gerar_relatorio, gerar_nome_arquivo_timestamped, ordenar_por_data,
+    listar_arquivos, arquivo_disponivel, nome_arquivo
+)
 from config_manager import COLUNAS_PADRONIZADAS
 from logger import get_logger
 
@@ -29,22 +32,17 @@ def verificar_e_filtrar_bancos(bancos_para_processar, config):
             avisos.append(f"{banco.upper()}: Configuração não encontrada para '{arquivo_key}'")
             continue
             
-        arquivos = config['arquivos'][arquivo_key]
+        # Caminhos ou objetos de arquivo (ver utils.listar_arquivos)
+        arquivos = listar_arquivos(config['arquivos'][arquivo_key])
         
         banco_tem_arquivos = False
         arquivos_faltando_banco = []
         
-        if isinstance(arquivos, str):
-            if arquivos and Path(arquivos).exists():
+        for arquivo in arquivos:
+            if arquivo_disponivel(arquivo):
                 banco_tem_arquivos = True
-            elif arquivos:
-                arquivos_faltando_banco.append(arquivos)
-        elif isinstance(arquivos, list):
-            for arquivo in arquivos:
-                if arquivo and Path(arquivo).exists():
-                    banco_tem_arquivos = True
-                elif arquivo:
-                    arquivos_faltando_banco.append(arquivo)
+            elif arquivo:
+                arquivos_faltando_banco.append(nome_arquivo(arquivo))
         
         if banco_tem_arquivos:
             bancos_validos.append(banco)
@@ -84,10 +82,30 @@ def determinar_bancos_processar(args):
     return bancos_para_processar
 
 
-def processar_bancos(bancos_para_processar, config):
+def notificar_progresso(progresso, evento, **dados):
+    """
+    Repassa um evento de andamento para o callback opcional de progresso.
+    
+    Eventos emitidos por processar_extratos: 'bancos' (bancos), 'banco'
+    (banco, linhas), 'consolidacao' (linhas), 'transferencias' (quantidade),
+    'saldos' (linhas) e 'exportacao' (arquivo). Falhas do callback não
+    interrompem o processamento.
+    """
+    if progresso is None:
+        return
+    try:
+        progresso(evento, **dados)
+    except Exception as e:
+        logger.warning(f"Falha ao reportar progresso ({evento}): {e}")
+
+
+def processar_bancos(bancos_para_processar, config, progresso=None):
     logger.info(f"Processando extratos dos bancos selecionados...")
     dfs = []
     
+    # Leitura em lotes é opcional: ativada com processamento.tamanho_lote > 0
+    tamanho_lote = config.get('processamento', {}).get('tamanho_lote') or 0
+    
     for banco in bancos_para_processar:
         arquivo_key = MAPEAMENTO_ARQUIVOS[banco]
         
@@ -96,46 +114,80 @@ def processar_bancos(bancos_para_processar, config):
             logger.warning(f"{banco.upper()}: Configuração não encontrada para '{arquivo_key}' - ignorando")
             continue
             
-        arquivos = config['arquivos'][arquivo_key]
-        
-        tem_arquivos = False
-        if isinstance(arquivos, str):
-            tem_arquivos = arquivos and Path(arquivos).exists()
-        elif isinstance(arquivos, list):
-            tem_arquivos = any(arquivo and Path(arquivo).exists() for arquivo in arquivos)
+        arquivos = listar_arquivos(config['arquivos'][arquivo_key])
+        tem_arquivos = any(arquivo_disponivel(arquivo) for arquivo in arquivos)
         
         if tem_arquivos:
+            linhas = 0
             try:
-                df_resultado = PROCESSADORES[banco](config)
+                if tamanho_lote > 0 and banco in PROCESSADORES_LOTES:
+                    df_resultado = consumir_lotes(PROCESSADORES_LOTES[banco](config, tamanho_lote))
+                else:
+                    df_resultado = PROCESSADORES[banco](config)
                 if not df_resultado.empty:
                     dfs.append(df_resultado)
+                    linhas = len(df_resultado)
                     logger.info(f"✅ {banco.upper()}: Processado com sucesso")
                 else:
                     logger.warning(f"{banco.upper()}: Nenhum dado encontrado")
+            except MemoryError:
+                # Estouro do limite de memória (interface web): o banco não
+                # pode sumir do resultado como se estivesse vazio
+                raise
             except Exception as e:
                 logger.error(f"{banco.upper()}: Erro ao processar - {str(e)}")
+            notificar_progresso(progresso, 'banco', banco=banco, linhas=linhas)
         else:
             logger.warning(f"{banco.upper()}: Arquivos não encontrados - ignorando")
     
     return dfs
 
 
+def consumir_lotes(lotes):
+    """
+    Junta num DataFrame os lotes gerados por um processador em lotes.
+    
+    Os lotes limitam só a leitura: o CSV bruto nunca fica inteiro em memória e
+    as transações com valor zerado são descartadas a cada lote. A consolidação,
+    a detecção de transferências, os saldos e a exportação continuam sobre o
+    DataFrame completo, então o pico de memória ainda cresce com o histórico.
+    Se o gerador falhar no meio, a exceção é propagada e os lotes já lidos são
+    descartados.
+    """
+    partes = []
+    for lote in lotes:
+        lote = lote[lote['Valor'] != 0]
+        if not lote.empty:
+            partes.append(lote)
+    
+    if not partes:
+        return pd.DataFrame()
+    
+    return pd.concat(partes, ignore_index=True)
+
+
 def consolidar_dados(dfs):
     if not dfs:
         logger.error("Nenhum extrato foi processado com sucesso!")
         return None
     
     logger.info(f"🔗 Consolidando dados...")
-    df_consolidado = pd.concat(dfs, ignore_index=True)
     
-    transacoes_antes = len(df_consolidado)
-    df_consolidado = df_consolidado[df_consolidado['Valor'] != 0]
-    transacoes_removidas = transacoes_antes - len(df_consolidado)
+    # Descartar valores zerados antes de concatenar, copiando só os extratos que têm algum
+    partes = []
+    transacoes_removidas = 0
+    for df in dfs:
+        mascara = df['Valor'] != 0
+        if not mascara.all():
+            transacoes_removidas += len(df) - mascara.sum()
+            df = df[mascara]
+        partes.append(df)
     
     if transacoes_removidas > 0:
         logger.info(f"Removidas transação(ões) com valor zerado")
     
-    df_consolidado = df_consolidado.sort_values('Data').reset_index(drop=True)
+    # Uma única ordenação estável, já na chave usada pelo cálculo de saldos
+    df_consolidado = ordenar_por_data(pd.concat(partes, ignore_index=True))
     
     df_consolidado['Categoria'] = ''
     df_consolidado['Descricao_Manual'] = ''
@@ -165,26 +217,27 @@ def exportar_excel(df_consolidado, arquivo_output):
         df_formatado.to_excel(arquivo_output, index=False)
         logger.info(f"✅ Arquivo criado com sucesso!")
         return True
+    except MemoryError:
+        raise
     except Exception as e:
         logger.error(f"Erro ao salvar Excel: {e}")
         return False
 
 
-def processar_extratos(args, config):
-    # Verificar se é processamento apenas da B3
-    if args.b3 and not any([args.c6, args.c6_cartao, args.bradesco, args.bb, args.bb_cartao, args.itau, args.all]):
-        logger.info("🏦 PROCESSANDO APENAS B3 (INVESTIMENTOS)")
-        df_b3 = processar_b3(config)
-        if df_b3 is not None and not df_b3.empty:
-            arquivo_output = args.output if args.output else gerar_nome_arquivo_timestamped(config['arquivos']['output'])
-            exportar_b3_excel(df_b3, arquivo_output.replace('.xlsx', '_b3.xlsx'))
-            logger.info("✅ PROCESSAMENTO B3 CONCLUÍDO COM SUCESSO!")
-            return True
-        else:
-            logger.error("❌ Falha ao processar B3")
-            return False
+def consolidar_extratos(args, config, progresso=None):
+    """
+    Lê os extratos dos bancos selecionados em args e monta o DataFrame
+    consolidado, com transferências próprias identificadas e saldos calculados.
     
-    # Processamento normal dos bancos
+    Args:
+        args: Argumentos da linha de comando (bancos selecionados)
+        config: Configurações do sistema
+        progresso: Callback opcional chamado como progresso(evento, **dados)
+            a cada etapa (ver notificar_progresso)
+    
+    Returns:
+        DataFrame nas COLUNAS_PADRONIZADAS (vazio se nenhum extrato foi lido)
+    """
     bancos_para_processar = determinar_bancos_processar(args)
     
     logger.info("🏦 PROCESSADOR DE EXTRATOS BANCÁRIOS")
@@ -203,28 +256,69 @@ def processar_extratos(args, config):
     if not bancos_validos:
         logger.error("Nenhum banco tem arquivos válidos para processar!")
         logger.info("💡 Verifique se os caminhos dos arquivos estão corretos no config.json")
-        return False
+        return pd.DataFrame()
     
     # Mostrar bancos que serão processados
     bancos_validos_nomes = [NOMES_BANCOS[b] for b in bancos_validos]
     logger.info(f"✅ Processando bancos: {', '.join(bancos_validos_nomes)}")
     
-    dfs = processar_bancos(bancos_validos, config)
+    notificar_progresso(progresso, 'bancos', bancos=bancos_validos)
+    dfs = processar_bancos(bancos_validos, config, progresso)
     
     df_consolidado = consolidar_dados(dfs)
     if df_consolidado is None:
-        return False
+        return pd.DataFrame()
+    notificar_progresso(progresso, 'consolidacao', linhas=len(df_consolidado))
     
     # Detectar transferências próprias antes de calcular saldos
-    detectar_transferencias_proprias(df_consolidado, config)
+    transferencias = detectar_transferencias_proprias(df_consolidado, config)
+    notificar_progresso(progresso, 'transferencias', quantidade=transferencias)
     
     logger.info(f"🧮 Calculando saldos...")
     df_consolidado = calcular_saldos(df_consolidado, config)
+    notificar_progresso(progresso, 'saldos', linhas=len(df_consolidado))
+    
+    # As colunas já saem na ordem padronizada; só seleciona (e copia) se não saírem
+    if list(df_consolidado.columns) != COLUNAS_PADRONIZADAS:
+        df_consolidado = df_consolidado[COLUNAS_PADRONIZADAS]
+    
+    return df_consolidado
+
+
+def processar_extratos(args, config, progresso=None):
+    """
+    Processa os extratos selecionados em args e gera a planilha consolidada.
+    
+    Args:
+        args: Argumentos da linha de comando (bancos selecionados e output)
+        config: Configurações do sistema
+        progresso: Callback opcional chamado como progresso(evento, **dados)
+            a cada etapa (ver notificar_progresso)
+    
+    Returns:
+        True se a planilha foi gerada
+    """
+    # Verificar se é processamento apenas da B3
+    if args.b3 and not any([args.c6, args.c6_cartao, args.bradesco, args.bb, args.bb_cartao, args.itau, args.all]):
+        logger.info("🏦 PROCESSANDO APENAS B3 (INVESTIMENTOS)")
+        df_b3 = processar_b3(config)
+        if df_b3 is not None and not df_b3.empty:
+            arquivo_output = args.output if args.output else gerar_nome_arquivo_timestamped(config['arquivos']['output'])
+            exportar_b3_excel(df_b3, arquivo_output.replace('.xlsx', '_b3.xlsx'))
+            logger.info("✅ PROCESSAMENTO B3 CONCLUÍDO COM SUCESSO!")
+            return True
+        else:
+            logger.error("❌ Falha ao processar B3")
+            return False
     
-    df_consolidado = df_consolidado[COLUNAS_PADRONIZADAS]
+    # Processamento normal dos bancos
+    df_consolidado = consolidar_extratos(args, config, progresso)
+    if df_consolidado.empty:
+        return False
     
     arquivo_output = args.output if args.output else gerar_nome_arquivo_timestamped(config['arquivos']['output'])
     exportar_excel(df_consolidado, arquivo_output)
+    notificar_progresso(progresso, 'exportacao', arquivo=arquivo_output)
     
     # Processar B3 separadamente se solicitado
     if args.b3 or args.all:
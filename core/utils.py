@@ -2,25 +2,160 @@
 Utilitários compartilhados para processamento de extratos bancários.
 """
 
+import io
+import numpy as np
 import pandas as pd
 import re
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+# Número padrão de linhas por lote na leitura em lotes (processamento.tamanho_lote)
+TAMANHO_LOTE_PADRAO = 50_000
 
-def extrair_agencia_conta(arquivo_path: str, banco: str) -> str:
+# Bytes lidos do início de um objeto de arquivo para procurar o cabeçalho
+TAMANHO_CABECALHO = 64 * 1024
+
+# Motores de leitura de planilhas aceitos em processamento.motor_planilha.
+# 'auto' usa o calamine (python-calamine, em Rust) quando instalado e, sem
+# ele, o xlrd para .xls e o openpyxl em modo read_only para .xlsx.
+MOTORES_PLANILHA = ('auto', 'calamine', 'openpyxl', 'xlrd')
+
+
+def eh_objeto_arquivo(arquivo) -> bool:
+    """Indica se o arquivo é um objeto de arquivo aberto (BytesIO, UploadedFile...) e não um caminho"""
+    return hasattr(arquivo, 'read')
+
+
+def listar_arquivos(arquivos) -> list:
+    """
+    Normaliza a entrada de config['arquivos'] em lista. Cada item pode ser
+    um caminho ou um objeto de arquivo binário com read() e seek().
+    """
+    if isinstance(arquivos, (list, tuple)):
+        return list(arquivos)
+    return [arquivos] if arquivos else []
+
+
+def arquivo_disponivel(arquivo) -> bool:
+    """Objeto de arquivo ou caminho existente"""
+    if eh_objeto_arquivo(arquivo):
+        return True
+    return bool(arquivo) and Path(arquivo).exists()
+
+
+def nome_arquivo(arquivo) -> str:
+    """Caminho do arquivo ou, para objetos de arquivo, o atributo name (usado para a extensão)"""
+    if eh_objeto_arquivo(arquivo):
+        return str(getattr(arquivo, 'name', None) or '')
+    return str(arquivo)
+
+
+def fonte_leitura(arquivo):
+    """Caminho ou objeto de arquivo voltado para o início, pronto para o pandas ler"""
+    if not eh_objeto_arquivo(arquivo):
+        return arquivo
+    # Invólucros como o File do Django expõem o arquivo real em .file; o
+    # pandas precisa dele para saber que o conteúdo é binário
+    interno = getattr(arquivo, 'file', None)
+    if isinstance(interno, io.IOBase):
+        arquivo = interno
+    if hasattr(arquivo, 'seek'):
+        arquivo.seek(0)
+    return arquivo
+
+
+@contextmanager
+def abrir_texto(arquivo, encoding: str = 'utf-8'):
+    """
+    Abre o início do arquivo como texto para ler o cabeçalho. Objetos de
+    arquivo não são fechados; só os primeiros TAMANHO_CABECALHO bytes são lidos.
+    """
+    if not eh_objeto_arquivo(arquivo):
+        with open(arquivo, 'r', encoding=encoding) as f:
+            yield f
+        return
+    
+    inicio = fonte_leitura(arquivo).read(TAMANHO_CABECALHO)
+    if isinstance(inicio, bytes):
+        inicio = inicio.decode(encoding, errors='ignore')
+    yield io.StringIO(inicio)
+
+
+def calamine_disponivel() -> bool:
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def escolher_motor_planilha(arquivo_path: str, motor: str = None) -> str:
+    """Resolve o motor de leitura para um arquivo (.xls ou .xlsx)"""
+    motor = motor or 'auto'
+    if motor not in MOTORES_PLANILHA:
+        raise ValueError(f"Motor de planilha desconhecido: {motor} (use {', '.join(MOTORES_PLANILHA)})")
+    
+    legado = nome_arquivo(arquivo_path).lower().endswith('.xls')
+    
+    if motor == 'calamine' and not calamine_disponivel():
+        logger.warning("python-calamine não instalado, usando leitor padrão")
+        motor = 'auto'
+    if motor == 'auto':
+        if calamine_disponivel():
+            return 'calamine'
+        return 'xlrd' if legado else 'openpyxl'
+    
+    # xlrd só lê .xls e openpyxl só lê .xlsx
+    if motor == 'xlrd' and not legado:
+        return 'openpyxl'
+    if motor == 'openpyxl' and legado:
+        return 'xlrd'
+    return motor
+
+
+def ler_planilha(arquivo_path: str, sheet_name=0, header=0, skiprows=None, nrows: int = None,
+                 motor: str = None) -> pd.DataFrame:
+    """
+    Lê uma aba de planilha com o motor escolhido (veja MOTORES_PLANILHA).
+    nrows limita as linhas lidas, o que evita percorrer a aba inteira quando
+    só o cabeçalho interessa.
+    """
+    # O calamine sempre carrega a aba inteira; para ler só o início de um
+    # .xlsx o openpyxl em read_only, que para de ler após nrows, é mais rápido
+    if nrows is not None and (motor or 'auto') == 'auto' and not nome_arquivo(arquivo_path).lower().endswith('.xls'):
+        motor = 'openpyxl'
+    
+    return pd.read_excel(
+        fonte_leitura(arquivo_path),
+        sheet_name=sheet_name,
+        header=header,
+        skiprows=skiprows,
+        nrows=nrows,
+        engine=escolher_motor_planilha(arquivo_path, motor)
+    )
+
+
+def listar_abas(arquivo_path: str, motor: str = None) -> list:
+    """Nomes das abas de uma planilha, sem ler o conteúdo delas"""
+    with pd.ExcelFile(fonte_leitura(arquivo_path), engine=escolher_motor_planilha(arquivo_path, motor)) as planilha:
+        return planilha.sheet_names
+
+
+def extrair_agencia_conta(arquivo_path: str, banco: str, motor_planilha: str = None) -> str:
     try:
         if banco == 'C6 Bank':
-            with open(arquivo_path, 'r', encoding='utf-8') as f:
+            with abrir_texto(arquivo_path, encoding='utf-8') as f:
                 primeiras_linhas = f.read(500)
                 match = re.search(r'Agência:\s*(\d+)\s*/\s*Conta:\s*(\d+)', primeiras_linhas)
                 if match:
                     return f"Ag: {match.group(1)} / Conta: {match.group(2)}"
                 
         elif banco == 'Bradesco':
-            with open(arquivo_path, 'r', encoding='utf-8') as f:
+            with abrir_texto(arquivo_path, encoding='utf-8') as f:
                 primeira_linha = f.readline()
                 match = re.search(r'Ag:\s*(\d+)\s*\|\s*Conta:\s*([\d-]+)', primeira_linha)
                 if match:
@@ -33,9 +168,10 @@ def extrair_agencia_conta(arquivo_path: str, banco: str) -> str:
             return "BB Cartão de Crédito"
             
         elif banco == 'Itaú':
-            if arquivo_path.endswith('.xls') or arquivo_path.endswith('.xlsx'):
+            nome = nome_arquivo(arquivo_path)
+            if nome.endswith('.xls') or nome.endswith('.xlsx'):
                 try:
-                    df = pd.read_excel(arquivo_path, engine='xlrd' if arquivo_path.endswith('.xls') else None, header=None)
+                    df = ler_planilha(arquivo_path, header=None, nrows=15, motor=motor_planilha)
                     
                     agencia = None
                     conta = None
@@ -68,7 +204,7 @@ def extrair_agencia_conta(arquivo_path: str, banco: str) -> str:
                         return f"Itaú {nome_cartao}"
                     
                     # Fallback baseado no nome do arquivo
-                    if 'cartao' in arquivo_path.lower() or arquivo_path.endswith('.xlsx'):
+                    if 'cartao' in nome.lower() or nome.endswith('.xlsx'):
                         return "Itaú Cartão de Crédito"
                     else:
                         return "Itaú Conta Corrente"
@@ -147,11 +283,85 @@ def categorizar_transacao_auto(tipo: str, descricao: str, valor: float, categori
     return 'Outros'
 
 
+# Rótulos das categorias simples usadas por categorizar_transacao_auto
+ROTULOS_CATEGORIAS = {
+    'investimentos': 'Investimentos',
+    'rendimentos': 'Rendimentos',
+    'cartao_credito': 'Cartão Crédito',
+    'cartao_debito': 'Cartão Débito',
+    'debito_automatico': 'Débito Automático',
+    'tarifas': 'Tarifas',
+    'saques': 'Saques',
+    'depositos': 'Depósitos'
+}
+
+
+def _contem_alguma(texto: pd.Series, palavras: list) -> np.ndarray:
+    """Máscara das linhas de texto que contêm alguma das palavras (equivale a any(p in texto))"""
+    if not palavras:
+        return np.zeros(len(texto), dtype=bool)
+    padrao = '|'.join(re.escape(palavra) for palavra in palavras)
+    return texto.str.contains(padrao, regex=True, na=False).to_numpy()
+
+
+def categorizar_transacoes(tipos: pd.Series, descricoes: pd.Series, valores: pd.Series,
+                           categorias: dict, agencias_conta: pd.Series = None,
+                           categorias_fixas: list = None) -> pd.Series:
+    """
+    Versão vetorizada de categorizar_transacao_auto para colunas inteiras.
+    Mantém a mesma ordem de prioridade: cartão pela agência/conta, estornos e
+    depois as categorias na ordem em que aparecem no config.
+    
+    categorias_fixas é uma lista opcional de {'contem': [...], 'categoria': ...}
+    específica do banco, verificada antes de todas as outras regras.
+    """
+    texto = tipos.astype(str).str.upper() + ' ' + descricoes.astype(str).str.upper()
+    valores = pd.to_numeric(valores, errors='coerce').to_numpy()
+    
+    condicoes = []
+    escolhas = []
+    
+    for regra in categorias_fixas or []:
+        condicoes.append(_contem_alguma(texto, regra['contem']))
+        escolhas.append(regra['categoria'])
+    
+    if agencias_conta is not None:
+        condicoes.append(agencias_conta.astype(str).str.match(r'\d+ - ', na=False).to_numpy())
+        escolhas.append('Cartão Crédito')
+    
+    # Estornos têm prioridade e herdam a categoria do que foi estornado
+    eh_estorno = _contem_alguma(texto, categorias['estornos'])
+    for chave in ['investimentos', 'cartao_credito', 'cartao_debito', 'debito_automatico']:
+        condicoes.append(eh_estorno & _contem_alguma(texto, categorias.get(chave, [])))
+        escolhas.append(ROTULOS_CATEGORIAS[chave])
+    condicoes.append(eh_estorno)
+    escolhas.append('Estornos')
+    
+    for categoria, palavras in categorias.items():
+        if categoria == 'pix_transferencia':
+            eh_pix = _contem_alguma(texto, palavras)
+            condicoes.append(eh_pix & (valores > 0))
+            escolhas.append('PIX Recebido')
+            condicoes.append(eh_pix)
+            escolhas.append('PIX Enviado')
+        elif categoria in ROTULOS_CATEGORIAS:
+            condicoes.append(_contem_alguma(texto, palavras))
+            escolhas.append(ROTULOS_CATEGORIAS[categoria])
+    
+    return pd.Series(np.select(condicoes, escolhas, default='Outros'), index=tipos.index, dtype=object)
+
+
 def converter_valor_br(valor):
     """Converte valores brasileiros (1.234,56 → 1234.56)"""
     return pd.to_numeric(str(valor).replace('.', '').replace(',', '.'), errors='coerce')
 
 
+def converter_valores_br(serie: pd.Series) -> pd.Series:
+    """Versão vetorizada de converter_valor_br para uma coluna inteira"""
+    texto = serie.astype(str).str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(texto, errors='coerce')
+
+
 def criar_dataframe_padronizado(data_dict: dict) -> pd.DataFrame:
     """Cria um DataFrame com a estrutura padronizada"""
     return pd.DataFrame({
@@ -167,58 +377,87 @@ def criar_dataframe_padronizado(data_dict: dict) -> pd.DataFrame:
     })
 
 
+# Chave de ordenação do consolidado: data contábil e, no empate, data do lançamento
+CHAVE_ORDENACAO = ['Data_Contabil', 'Data']
+
+
+def ordenar_por_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ordena pela CHAVE_ORDENACAO de forma estável, mantendo a ordem original nos empates.
+    
+    Os extratos de cada banco já vêm em ordem de data, então a concatenação é uma
+    sequência de trechos ordenados que a ordenação estável do numpy intercala como
+    um merge de k vias. Sempre devolve um DataFrame novo com índice 0..n-1, mesmo
+    quando a entrada já está ordenada.
+    """
+    if len(df) < 2:
+        return df.reset_index(drop=True)
+    
+    if not all(pd.api.types.is_datetime64_dtype(df[coluna]) for coluna in CHAVE_ORDENACAO):
+        return df.sort_values(CHAVE_ORDENACAO, kind='stable', ignore_index=True)
+    
+    # Datas vazias vão para o fim, como no sort_values
+    principal, secundaria = [
+        np.where(df[coluna].isna().to_numpy(), np.iinfo(np.int64).max, df[coluna].to_numpy().view(np.int64))
+        for coluna in CHAVE_ORDENACAO
+    ]
+    
+    ja_ordenado = np.all(
+        (principal[1:] > principal[:-1]) |
+        ((principal[1:] == principal[:-1]) & (secundaria[1:] >= secundaria[:-1]))
+    )
+    if ja_ordenado:
+        return df.reset_index(drop=True)
+    
+    # np.lexsort usa a última chave como principal
+    resultado = df.take(np.lexsort((secundaria, principal)))
+    resultado.index = pd.RangeIndex(len(resultado))
+    return resultado
+
+
+def _acumular(saldo_inicial: float, parcelas: np.ndarray) -> np.ndarray:
+    """Soma acumulada a partir do saldo inicial, na mesma ordem de uma soma linha a linha"""
+    return np.cumsum(np.concatenate(([saldo_inicial], parcelas)))[1:]
+
+
 def calcular_saldos(df: pd.DataFrame, config: dict) -> pd.DataFrame:
     """Calcula as colunas Saldo_Real e Saldo_no_Banco"""
     if df.empty:
         return df
     
-    # Ordenar por data para cálculo sequencial
-    df = df.sort_values(['Data_Contabil', 'Data']).reset_index(drop=True)
+    # O consolidado já chega ordenado; só reordena se vier fora de ordem
+    df = ordenar_por_data(df)
     
     # Inicializar saldos
     saldos_iniciais = config['saldos_iniciais']
-    saldo_bb = saldos_iniciais['bb']
-    saldo_bradesco = saldos_iniciais['bradesco']
-    saldo_c6 = saldos_iniciais['c6_bank']
-    saldo_itau = saldos_iniciais.get('itau', 0.0)
-    
-    # Saldo real inicial é a soma dos saldos iniciais dos bancos
-    saldo_real = saldo_bb + saldo_bradesco + saldo_c6 + saldo_itau
-    
-    # Listas para armazenar os saldos
-    saldos_no_banco = []
-    saldos_reais = []
-    
-    for _, transacao in df.iterrows():
-        banco = transacao['Banco']
-        valor = transacao['Valor']
-        categoria = transacao['Categoria_Auto']
-        
-        eh_cartao_credito = categoria == 'Cartão Crédito'
-        eh_transferencia_propria = categoria == 'Transferência Própria'
-        
-        # Não alterar saldos para transferências próprias
-        if not eh_cartao_credito and not eh_transferencia_propria:
-            if banco == 'Banco do Brasil':
-                saldo_bb += valor
-            elif banco == 'Bradesco':
-                saldo_bradesco += valor
-            elif banco == 'C6 Bank':
-                saldo_c6 += valor
-            elif banco == 'Itaú':
-                saldo_itau += valor
-        
-        saldo_no_banco_atual = saldo_bb + saldo_bradesco + saldo_c6 + saldo_itau
-        saldos_no_banco.append(saldo_no_banco_atual)
-        
-        # Saldo real: considera TODAS as transações (incluindo cartão de crédito), exceto transferências próprias
-        if not eh_transferencia_propria:
-            saldo_real += valor
-        saldos_reais.append(saldo_real)
+    saldos_bancos = [
+        ('Banco do Brasil', saldos_iniciais['bb']),
+        ('Bradesco', saldos_iniciais['bradesco']),
+        ('C6 Bank', saldos_iniciais['c6_bank']),
+        ('Itaú', saldos_iniciais.get('itau', 0.0))
+    ]
+    
+    valores = df['Valor'].to_numpy(dtype=float)
+    bancos = df['Banco'].to_numpy()
+    categorias = df['Categoria_Auto'].to_numpy()
+    
+    eh_transferencia_propria = categorias == 'Transferência Própria'
+    
+    # Não alterar saldos dos bancos para cartão de crédito e transferências próprias
+    altera_saldo_banco = ~eh_transferencia_propria & (categorias != 'Cartão Crédito')
+    
+    saldo_no_banco = None
+    for banco, saldo_inicial in saldos_bancos:
+        saldo_banco = _acumular(saldo_inicial, np.where(altera_saldo_banco & (bancos == banco), valores, 0.0))
+        saldo_no_banco = saldo_banco if saldo_no_banco is None else saldo_no_banco + saldo_banco
+    
+    # Saldo real: considera TODAS as transações (incluindo cartão de crédito), exceto transferências próprias
+    saldo_real_inicial = saldos_bancos[0][1] + saldos_bancos[1][1] + saldos_bancos[2][1] + saldos_bancos[3][1]
+    saldo_real = _acumular(saldo_real_inicial, np.where(eh_transferencia_propria, 0.0, valores))
     
     # Adicionar as colunas ao DataFrame
-    df['Saldo_no_Banco'] = saldos_no_banco
-    df['Saldo_Real'] = saldos_reais
+    df['Saldo_no_Banco'] = saldo_no_banco
+    df['Saldo_Real'] = saldo_real
     
     return df
 
@@ -242,7 +481,10 @@ def detectar_transferencias_proprias(df: pd.DataFrame, config: dict) -> int:
     tolerancia_valor = processamento_config['tolerancia_valor']
     janela_dias = processamento_config['janela_transferencias_dias']
     
-    pix_todos = df[df['Categoria_Auto'].isin(['PIX Enviado', 'PIX Recebido', 'Transferência Própria'])].copy()
+    # O consolidado vem ordenado por CHAVE_ORDENACAO; o pareamento percorre os
+    # PIX na ordem de Data (estável), que decide o par quando há mais de um candidato
+    pix_todos = df[df['Categoria_Auto'].isin(['PIX Enviado', 'PIX Recebido', 'Transferência Própria'])]
+    pix_todos = pix_todos.sort_values('Data', kind='stable')
     
     pix_enviados = pix_todos[pix_todos['Valor'] < 0].copy()
     pix_recebidos = pix_todos[pix_todos['Valor'] > 0].copy()
@@ -312,7 +554,7 @@ def detectar_transferencias_proprias(df: pd.DataFrame, config: dict) -> int:
                 pares_detectados += 1
                 break
     
-    transferencias_proprias = df[df['Categoria_Auto'] == 'Transferência Própria'].copy()
+    transferencias_proprias = df[df['Categoria_Auto'] == 'Transferência Própria'].sort_values('Data', kind='stable')
     recategorizadas = 0
     
     if not transferencias_proprias.empty:
@@ -43,6 +43,9 @@ def main():
             logger.info("Verificando migrações...")
             try:
                 execute_from_command_line([manage_py, 'migrate', '--verbosity=0'])
+                execute_from_command_line([manage_py, 'createcachetable'])
+                # Plotly e demais estáticos com hash no nome (servidos pelo WhiteNoise)
+                execute_from_command_line([manage_py, 'collectstatic', '--noinput', '--verbosity=0'])
             except Exception as e:
                 logger.warning(f"Erro ao executar migrações: {e}")
             
@@ -0,0 +1,145 @@
+"""
+Mede as consultas mais frequentes sobre ProcessamentoExtrato, ArquivoExtrato
+e EventoProcessamento numa tabela grande, antes e depois dos índices da
+migração 0014_indices_consultas, e compara a leitura da linha inteira com
+only() nas páginas de resultado e de download.
+
+O banco é um SQLite descartável: as tabelas são criadas até a migração 0013,
+preenchidas e medidas; depois a 0014 é aplicada e as mesmas consultas são
+medidas de novo.
+
+Uso:
+    python scripts/benchmark_consultas.py [processamentos]
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'web_interface'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_extratos.settings')
+
+TMP = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP, 'benchmark.sqlite3')}"
+
+import django
+
+django.setup()
+
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from extratos_app.models import ProcessamentoExtrato, ArquivoExtrato, EventoProcessamento
+from extratos_app.tarefas import _reivindicaveis
+from extratos_app.views import CAMPOS_DOWNLOAD, CAMPOS_RESULTADO
+
+LOTE = 10_000
+REPETICOES = 20
+USER_AGENT = ('Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/126.0.0.0 Safari/537.36')
+
+
+def preencher(quantidade):
+    """
+    Processamentos concluídos com um arquivo e um evento cada; os últimos 50
+    ficam na fila. data_criacao (auto_now_add) cresce na ordem de gravação.
+    """
+    agora = timezone.now()
+    hashes = {f"blobs/ab/cd/{'0' * 64}.{n}": 'f' * 64 for n in range(4)}
+
+    for inicio in range(0, quantidade, LOTE):
+        processamentos = []
+        for n in range(inicio, min(inicio + LOTE, quantidade)):
+            pendente = n >= quantidade - 50
+            processamentos.append(ProcessamentoExtrato(
+                id=uuid.uuid4(),
+                nome_usuario=f'Usuário {n}',
+                status=ProcessamentoExtrato.STATUS_PENDENTE if pendente else ProcessamentoExtrato.STATUS_CONCLUIDO,
+                processado=not pendente,
+                arquivo_resultado=f"blobs/{n % 256:02x}/00/{n:064x}.xlsx",
+                hash_resultado=f"{n:064x}",
+                hashes_upload=hashes,
+                cpf_usuario_encrypted='g' * 140,
+                user_agent=USER_AGENT,
+                data_expiracao=agora + timedelta(hours=1),
+            ))
+        with transaction.atomic():
+            ProcessamentoExtrato.objects.bulk_create(processamentos)
+            ArquivoExtrato.objects.bulk_create(
+                ArquivoExtrato(processamento=p, banco='itau', arquivo=f"blobs/00/00/{p.id.hex}.xls")
+                for p in processamentos
+            )
+            EventoProcessamento.objects.bulk_create(
+                EventoProcessamento(processamento=p, etapa='Concluído', progresso=100)
+                for p in processamentos
+            )
+
+
+def medir(consulta):
+    """Mediana em milissegundos"""
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        consulta()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def consultas(alvo):
+    return {
+        'Listagem (20 mais recentes)': lambda: list(ProcessamentoExtrato.objects.only('id')[:20]),
+        'Fila (mais antigo disponível)': lambda: _reivindicaveis(timezone.now()).order_by('data_criacao')
+        .values_list('pk', flat=True).first(),
+        'Arquivos do processamento': lambda: list(alvo.arquivos.all()),
+        'Eventos novos (SSE)': lambda: list(EventoProcessamento.objects.filter(
+            processamento_id=alvo.pk, id__gt=0).values('id', 'etapa', 'mensagem', 'progresso')),
+    }
+
+
+def linhas_inteiras(alvo):
+    filtro = ProcessamentoExtrato.objects.filter(pk=alvo.pk)
+    return {
+        'Resultado': (lambda: filtro.get(), lambda: filtro.only(*CAMPOS_RESULTADO).get()),
+        'Download': (lambda: filtro.get(), lambda: filtro.only(*CAMPOS_DOWNLOAD).get()),
+        '1.000 processamentos': (lambda: list(ProcessamentoExtrato.objects.all()[:1000]),
+                                 lambda: list(ProcessamentoExtrato.objects.only(*CAMPOS_RESULTADO)[:1000])),
+    }
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    call_command('migrate', 'extratos_app', '0013', verbosity=0)
+    inicio = time.perf_counter()
+    preencher(quantidade)
+    print(f"{quantidade:,} processamentos gravados em {time.perf_counter() - inicio:.0f}s")
+
+    alvo = ProcessamentoExtrato.objects.only('id').order_by('hash_resultado')[quantidade // 2]
+    sem_indices = {nome: medir(consulta) for nome, consulta in consultas(alvo).items()}
+
+    inicio = time.perf_counter()
+    call_command('migrate', 'extratos_app', verbosity=0)
+    print(f"Índices da 0014 criados em {time.perf_counter() - inicio:.1f}s\n")
+    com_indices = {nome: medir(consulta) for nome, consulta in consultas(alvo).items()}
+
+    print(f"{'Consulta':<32} {'Sem índices (ms)':>17} {'Com índices (ms)':>17}")
+    for nome in sem_indices:
+        print(f"{nome:<32} {sem_indices[nome]:>17.3f} {com_indices[nome]:>17.3f}")
+
+    print(f"\n{'Leitura':<32} {'Linha inteira (ms)':>19} {'only() (ms)':>12}")
+    for nome, (inteira, enxuta) in linhas_inteiras(alvo).items():
+        print(f"{nome:<32} {medir(inteira):>19.3f} {medir(enxuta):>12.3f}")
+
+    # Com 1 milhão de processamentos o banco passa de 3GB
+    shutil.rmtree(TMP, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
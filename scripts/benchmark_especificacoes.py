@@ -0,0 +1,204 @@
+"""
+Compara os processadores do Bradesco e do C6 Bank escritos à mão (congelados
+abaixo, como eram antes das especificações) com os compilados das
+especificações declarativas em core/bancos/especificacoes/.
+
+Gera extratos sintéticos, confere que os dois processadores produzem o mesmo
+resultado e imprime o melhor tempo de cada um.
+
+Uso:
+    python scripts/benchmark_especificacoes.py [linhas ...]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'core'))
+
+import pandas as pd
+
+from bancos.especificacao import carregar_especificacao, compilar_especificacao
+from utils import categorizar_transacao_auto, converter_valor_br, criar_dataframe_padronizado, extrair_agencia_conta
+
+HISTORICOS = [
+    'PIX ENVIADO FULANO', 'PIX RECEBIDO CICLANO', 'TARIFA BANCARIA', 'COMPRA CARTAO DEBITO MERCADO',
+    'SALARIO', 'APLICACAO CDB', 'RESGATE CDB', 'SAQUE 24H', 'ESTORNO CDB', 'PGTO FAT CARTAO'
+]
+REPETICOES = 3
+
+
+# Processadores escritos à mão, só como referência de resultado e de tempo.
+# Os registrados em PROCESSADORES são os compilados das especificações.
+
+FILTRO_SALDO_BRADESCO = r'SALDO ANTERIOR|COD\. LANC\. 0'
+
+
+def bradesco_manual(config: dict) -> pd.DataFrame:
+    arquivo_path = config['arquivos']['bradesco']
+    agencia_conta = extrair_agencia_conta(arquivo_path, 'Bradesco')
+
+    df = pd.read_csv(arquivo_path, encoding='utf-8-sig', sep=';',
+                     skiprows=config['processamento']['skip_rows_bradesco'], on_bad_lines='skip')
+    df = df.dropna(subset=['Data'])
+    df = df[df['Data'].astype(str).str.contains(r'\d{2}/\d{2}/\d{4}', na=False)]
+
+    saldo_anterior = df[df['Histórico'].astype(str).str.contains(FILTRO_SALDO_BRADESCO, na=False, regex=True)]
+    if not saldo_anterior.empty:
+        config['saldos_iniciais']['bradesco'] = converter_valor_br(saldo_anterior.iloc[0]['Saldo (R$)']) or 0
+
+    df = df[~df['Histórico'].astype(str).str.contains(FILTRO_SALDO_BRADESCO, na=False, regex=True)]
+    credito = df['Crédito (R$)'].apply(converter_valor_br).fillna(0)
+    debito = df['Débito (R$)'].apply(converter_valor_br).fillna(0)
+
+    resultado = criar_dataframe_padronizado({
+        'Data': pd.to_datetime(df['Data'], dayfirst=True, errors='coerce'),
+        'Data_Contabil': pd.to_datetime(df['Data'], dayfirst=True, errors='coerce'),
+        'Banco': 'Bradesco',
+        'Agencia_Conta': agencia_conta,
+        'Tipo_Transacao': df['Histórico'],
+        'Descricao': df['Histórico'],
+        'Valor': credito - debito,
+        'Valor_Entrada': credito,
+        'Valor_Saida': debito
+    })
+    resultado['Categoria_Auto'] = resultado.apply(
+        lambda row: categorizar_transacao_auto(row['Tipo_Transacao'], row['Descricao'], row['Valor'],
+                                               config['categorias']), axis=1
+    )
+    return resultado
+
+
+def _saldo_inicial_c6(df: pd.DataFrame) -> float:
+    """Saldo do Dia do dia mais antigo menos as transações desse dia"""
+    df['Data Lançamento'] = pd.to_datetime(df['Data Lançamento'], dayfirst=True, errors='coerce')
+    dia_antigo = df[df['Data Lançamento'] == df['Data Lançamento'].min()]
+    if dia_antigo.empty:
+        return 0.0
+    saldo_do_dia = pd.to_numeric(dia_antigo['Saldo do Dia(R$)'].iloc[0], errors='coerce')
+    entradas = pd.to_numeric(dia_antigo['Entrada(R$)'].fillna(0), errors='coerce').sum()
+    saidas = pd.to_numeric(dia_antigo['Saída(R$)'].fillna(0), errors='coerce').sum()
+    return saldo_do_dia - (entradas - saidas)
+
+
+def _categorizar_c6(tipo, descricao, valor, categorias) -> str:
+    texto = f"{str(tipo).upper()} {str(descricao).upper()}"
+    if 'PGTO FAT CARTAO' in texto or 'FATURA DE CARTAO' in texto:
+        return 'Cartão Crédito'
+    return categorizar_transacao_auto(tipo, descricao, valor, categorias)
+
+
+def c6_manual(config: dict) -> pd.DataFrame:
+    arquivo_path = config['arquivos']['c6_bank']
+    agencia_conta = extrair_agencia_conta(arquivo_path, 'C6 Bank')
+
+    df = pd.read_csv(arquivo_path, encoding='utf-8', sep=',', skiprows=config['processamento']['skip_rows_c6'])
+    df = df.dropna(how='all', axis=1).dropna(how='all', axis=0)
+    if df.empty:
+        return pd.DataFrame()
+    config['saldos_iniciais']['c6_bank'] = _saldo_inicial_c6(df)
+
+    df['entrada_num'] = pd.to_numeric(df['Entrada(R$)'].fillna(0), errors='coerce')
+    df['saida_num'] = pd.to_numeric(df['Saída(R$)'].fillna(0), errors='coerce')
+    df['valor'] = df['entrada_num'] - df['saida_num']
+
+    # Pagamentos de fatura do cartão entram como crédito
+    fatura = df['Título'].astype(str).str.contains('PGTO FAT CARTAO', na=False, case=False)
+    df.loc[fatura, 'entrada_num'] = df.loc[fatura, 'saida_num']
+    df.loc[fatura, 'saida_num'] = 0.0
+    df.loc[fatura, 'valor'] = df.loc[fatura, 'entrada_num']
+
+    resultado = criar_dataframe_padronizado({
+        'Data': pd.to_datetime(df['Data Lançamento'], dayfirst=True, errors='coerce'),
+        'Data_Contabil': pd.to_datetime(df['Data Contábil'], dayfirst=True, errors='coerce'),
+        'Banco': 'C6 Bank',
+        'Agencia_Conta': agencia_conta,
+        'Tipo_Transacao': df['Título'],
+        'Descricao': df['Descrição'],
+        'Valor': df['valor'],
+        'Valor_Entrada': df['entrada_num'],
+        'Valor_Saida': df['saida_num']
+    })
+    resultado = resultado.dropna(subset=['Data'])
+    resultado['Categoria_Auto'] = resultado.apply(
+        lambda row: _categorizar_c6(row['Tipo_Transacao'], row['Descricao'], row['Valor'], config['categorias']),
+        axis=1
+    )
+    return resultado
+
+
+def _valor_br(valor: float) -> str:
+    return f"{valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+
+def gerar_bradesco(caminho: str, linhas: int) -> None:
+    inicio = date(2025, 1, 1)
+    with open(caminho, 'w', encoding='utf-8-sig') as f:
+        f.write('Extrato de: Ag: 1234 | Conta: 56789-0 | Movimentação entre: 01/01/2025 e 31/12/2025\n')
+        f.write('Data;Histórico;Docto.;Crédito (R$);Débito (R$);Saldo (R$);\n')
+        f.write('01/01/2025;SALDO ANTERIOR;;;;1.000,00;\n')
+        for i in range(linhas):
+            dia = inicio + timedelta(days=i * 365 // linhas)
+            valor = _valor_br(random.uniform(1, 3000))
+            credito, debito = (valor, '') if random.random() < 0.4 else ('', valor)
+            f.write(f"{dia:%d/%m/%Y};{random.choice(HISTORICOS)};{i};{credito};{debito};0,00;\n")
+        f.write('Total;;;;;\n')
+
+
+def gerar_c6(caminho: str, linhas: int) -> None:
+    inicio = date(2025, 1, 1)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write('EXTRATO DE CONTA CORRENTE C6 BANK\nAgência: 1 / Conta: 123456789\n\n\n\n\n\n\n')
+        f.write('Data Lançamento,Data Contábil,Título,Descrição,Entrada(R$),Saída(R$),Saldo do Dia(R$)\n')
+        for i in range(linhas):
+            dia = inicio + timedelta(days=i * 365 // linhas)
+            valor = round(random.uniform(1, 3000), 2)
+            entrada, saida = (valor, '') if random.random() < 0.4 else ('', valor)
+            f.write(f"{dia:%d/%m/%Y},{dia:%d/%m/%Y},{random.choice(HISTORICOS)},desc {i},{entrada},{saida},{1000 + i}\n")
+
+
+def medir(processar, config: dict) -> tuple:
+    melhor = float('inf')
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resultado = processar(json.loads(json.dumps(config)))
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    tamanhos = [int(n) for n in sys.argv[1:]] or [10_000, 100_000]
+    random.seed(42)
+
+    with open(os.path.join(RAIZ, 'config-exemplo.json'), 'r', encoding='utf-8') as f:
+        config_base = json.load(f)
+
+    casos = [
+        ('Bradesco', 'bradesco', 'bradesco.csv', gerar_bradesco, bradesco_manual),
+        ('C6 Bank', 'c6_bank', 'c6.csv', gerar_c6, c6_manual),
+    ]
+
+    print(f"{'Banco':<10} {'Linhas':>8} {'À mão (s)':>10} {'Especificação (s)':>18} {'Ganho':>7}  Iguais")
+    with tempfile.TemporaryDirectory() as tmp:
+        for nome, chave, arquivo, gerar, processar_manual in casos:
+            processar_compilado, _ = compilar_especificacao(carregar_especificacao(chave.split('_')[0]))
+            for linhas in tamanhos:
+                caminho = os.path.join(tmp, arquivo)
+                gerar(caminho, linhas)
+                config = dict(config_base, arquivos={chave: caminho})
+
+                tempo_manual, esperado = medir(processar_manual, config)
+                tempo_compilado, obtido = medir(processar_compilado, config)
+
+                iguais = esperado.reset_index(drop=True).equals(obtido.reset_index(drop=True))
+                print(f"{nome:<10} {linhas:>8} {tempo_manual:>10.3f} {tempo_compilado:>18.3f} "
+                      f"{tempo_manual / tempo_compilado:>6.1f}x  {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == '__main__':
+    main()
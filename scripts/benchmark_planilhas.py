@@ -0,0 +1,137 @@
+"""
+Compara os motores de leitura de planilhas de core/utils.py (calamine,
+openpyxl e xlrd) em planilhas grandes no formato do Itaú e da B3.
+
+Para cada arquivo e motor mede a leitura da aba inteira, a leitura só do
+cabeçalho (como em extrair_agencia_conta) e o processador do banco completo.
+O .xls do Itaú só é gerado se o xlwt estiver instalado; o calamine só entra
+na tabela se o python-calamine estiver instalado.
+
+Uso:
+    python scripts/benchmark_planilhas.py [linhas]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'core'))
+
+from openpyxl import Workbook
+from bancos import b3, itau
+from utils import ler_planilha, calamine_disponivel
+
+HISTORICOS = ['PIX ENVIADO FULANO', 'TARIFA BANCARIA', 'SALARIO', 'APLICACAO CDB', 'SAQUE 24H']
+REPETICOES = 3
+
+
+def gerar_itau_cartao(caminho: str, linhas: int) -> None:
+    livro = Workbook(write_only=True)
+    aba = livro.create_sheet('Lançamentos')
+    aba.append(['Fatura Itaú cartão'])
+    aba.append(['FULANO - final 9876 (titular)'])
+    inicio = date(2025, 1, 1)
+    for i in range(linhas):
+        dia = inicio + timedelta(days=i * 365 // linhas)
+        aba.append([f"{dia:%d/%m/%Y}", f"COMPRA {i}", None, round(random.uniform(-50, 500), 2)])
+    livro.save(caminho)
+
+
+def gerar_itau_conta(caminho: str, linhas: int) -> bool:
+    try:
+        import xlwt
+    except ImportError:
+        return False
+
+    livro = xlwt.Workbook()
+    aba = livro.add_sheet('Lançamentos')
+    aba.write(2, 0, 'Agência: 1500')
+    aba.write(3, 0, 'Conta: 12345-6')
+    for coluna, titulo in enumerate(['data', 'lançamento', 'valor (R$)', 'saldo (R$)']):
+        aba.write(9, coluna, titulo)
+    inicio = date(2025, 1, 1)
+    # O formato .xls tem limite de 65536 linhas por aba
+    linhas = min(linhas, 65_000)
+    for i in range(linhas):
+        dia = inicio + timedelta(days=i * 365 // linhas)
+        aba.write(10 + i, 0, f"{dia:%d/%m/%Y}")
+        aba.write(10 + i, 1, random.choice(HISTORICOS))
+        aba.write(10 + i, 2, round(random.uniform(-3000, 3000), 2))
+    livro.save(caminho)
+    return True
+
+
+def gerar_b3(caminho: str, linhas: int) -> None:
+    livro = Workbook(write_only=True)
+    colunas = ['Produto', 'Instituição', 'Código de Negociação', 'Quantidade Disponível',
+               'Preço de Fechamento', 'Valor Atualizado']
+    for nome in ['Posição - Ações', 'Posição - Fundos']:
+        aba = livro.create_sheet(nome)
+        aba.append(colunas)
+        for i in range(linhas // 2):
+            aba.append([f'ATIVO {i}', 'CORRETORA', f'ATV{i % 1000}', random.randint(1, 500),
+                        round(random.uniform(1, 100), 2), round(random.uniform(100, 50_000), 2)])
+    livro.save(caminho)
+
+
+def cronometrar(funcao) -> float:
+    melhor = float('inf')
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 60_000
+    random.seed(42)
+
+    with open(os.path.join(RAIZ, 'config-exemplo.json'), 'r', encoding='utf-8') as f:
+        config_base = json.load(f)
+
+    motores = (['calamine'] if calamine_disponivel() else []) + ['openpyxl', 'xlrd']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        casos = []
+
+        caminho = os.path.join(tmp, 'itau_conta.xls')
+        if gerar_itau_conta(caminho, linhas):
+            casos.append(('Itaú .xls', caminho, 'itau', itau.processar, 0))
+        else:
+            print("xlwt não instalado: pulando o .xls do Itaú")
+
+        caminho = os.path.join(tmp, 'itau_cartao.xlsx')
+        gerar_itau_cartao(caminho, linhas)
+        casos.append(('Itaú .xlsx', caminho, 'itau', itau.processar, 'Lançamentos'))
+
+        caminho = os.path.join(tmp, 'b3.xlsx')
+        gerar_b3(caminho, linhas)
+        casos.append(('B3 .xlsx', caminho, 'b3', b3.processar, 'Posição - Ações'))
+
+        print(f"{'Arquivo':<11} {'Motor':<9} {'Aba inteira (s)':>16} {'Cabeçalho (s)':>14} {'Processador (s)':>16}")
+        for nome, caminho, chave, processar, aba in casos:
+            legado = caminho.endswith('.xls')
+            for motor in motores:
+                # xlrd só lê .xls e openpyxl só lê .xlsx
+                if (motor == 'xlrd' and not legado) or (motor == 'openpyxl' and legado):
+                    continue
+
+                config = json.loads(json.dumps(config_base))
+                config['arquivos'] = {chave: caminho}
+                config['processamento']['motor_planilha'] = motor
+
+                aba_inteira = cronometrar(lambda: ler_planilha(caminho, sheet_name=aba, header=None, motor=motor))
+                cabecalho = cronometrar(lambda: ler_planilha(caminho, sheet_name=aba, header=None, nrows=15, motor=motor))
+                processador = cronometrar(lambda: processar(json.loads(json.dumps(config))))
+
+                print(f"{nome:<11} {motor:<9} {aba_inteira:>16.3f} {cabecalho:>14.3f} {processador:>16.3f}")
+
+
+if __name__ == '__main__':
+    main()
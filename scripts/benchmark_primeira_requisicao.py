@@ -0,0 +1,127 @@
+"""
+Mede a latência da primeira requisição e da primeira tarefa de processamento
+com e sem o aquecimento (extratos_app/aquecimento.py).
+
+Requisições: o gunicorn é iniciado com um worker, sem configuração e com o
+web_interface/gunicorn.conf.py (preload_app + aquecimento antes do fork), e
+a página inicial é pedida três vezes logo que ele aceita conexões.
+
+Processamento: num processo novo, a primeira execução do pipeline sobre a
+amostra do aquecimento numa thread (PROCESSAMENTO_MODO='thread') é comparada
+com a mesma execução no pool de processos (PROCESSAMENTO_MODO='processo'),
+cujos processos nascem do forkserver já aquecido.
+
+Uso:
+    python scripts/benchmark_primeira_requisicao.py [porta]
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB = os.path.join(RAIZ, 'web_interface')
+sys.path.insert(0, WEB)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_extratos.settings')
+
+CONFIGURACOES = {
+    'sem configuração': os.devnull,
+    'gunicorn.conf.py': os.path.join(WEB, 'gunicorn.conf.py'),
+}
+
+
+def medir_gunicorn(configuracao, porta):
+    """
+    Segundos até aceitar conexões e até a primeira resposta, e milissegundos
+    das três primeiras requisições
+    """
+    url = f'http://127.0.0.1:{porta}'
+    partida = time.perf_counter()
+    servidor = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', configuracao, '--bind', f'127.0.0.1:{porta}',
+         '--workers', '1', 'web_extratos.wsgi'],
+        cwd=WEB, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        # Só a conexão TCP: uma requisição aqui já aqueceria o worker
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', porta), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        pronto = time.perf_counter() - partida
+
+        tempos = []
+        for _ in range(3):
+            inicio = time.perf_counter()
+            with urllib.request.urlopen(f'{url}/', timeout=30) as resposta:
+                resposta.read()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+            if len(tempos) == 1:
+                primeira_resposta = time.perf_counter() - partida
+        return pronto, primeira_resposta, tempos
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def medir_processamento():
+    """Executado num processo filho novo, com PROCESSAMENTO_MODO já definido"""
+    import django
+
+    django.setup()
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from extratos_app import tarefas
+    from extratos_app.aquecimento import _aquecer_pipeline
+
+    if tarefas._configuracao('PROCESSAMENTO_MODO', 'thread') == 'processo':
+        # Como no post_fork do gunicorn: o pool sobe antes da primeira tarefa
+        tarefas.iniciar_pool_processos()
+        executor = tarefas._obter_executor()
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    tempos = []
+    for _ in range(2):
+        inicio = time.perf_counter()
+        executor.submit(_aquecer_pipeline).result()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    executor.shutdown()
+    print(' '.join(f'{t:.1f}' for t in tempos))
+
+
+def main():
+    if os.environ.get('BENCHMARK_PRIMEIRA_FILHO'):
+        medir_processamento()
+        return
+
+    porta = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+
+    print(f"{'gunicorn (1 worker)':<22} {'Porta (s)':>10} {'Resposta (s)':>13} "
+          f"{'1ª (ms)':>9} {'2ª (ms)':>9} {'3ª (ms)':>9}")
+    for nome, configuracao in CONFIGURACOES.items():
+        pronto, primeira_resposta, tempos = medir_gunicorn(configuracao, porta)
+        print(f"{nome:<22} {pronto:>10.2f} {primeira_resposta:>13.2f} " + ' '.join(f'{t:>9.1f}' for t in tempos))
+
+    print(f"\n{'Processamento':<22} {'1ª tarefa (ms)':>15} {'2ª tarefa (ms)':>15}")
+    for modo in ('thread', 'processo'):
+        env = {**os.environ, 'PROCESSAMENTO_MODO': modo, 'BENCHMARK_PRIMEIRA_FILHO': '1',
+               'PYTHONPATH': os.pathsep.join(filter(None, [WEB, os.environ.get('PYTHONPATH')]))}
+        saida = subprocess.run([sys.executable, os.path.abspath(__file__)], env=env,
+                               capture_output=True, text=True, cwd=WEB)
+        if saida.returncode != 0:
+            erro = saida.stderr.strip().splitlines()[-1] if saida.stderr.strip() else 'erro'
+            print(f"{modo:<22} {erro}")
+            continue
+        primeira, segunda = saida.stdout.split()[-2:]
+        print(f"{modo:<22} {float(primeira):>15.1f} {float(segunda):>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
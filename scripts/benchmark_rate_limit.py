@@ -0,0 +1,93 @@
+"""
+Mede o custo por requisição do rate limit do SecurityMiddleware
+(extratos_app/middleware/security_middleware.py) em diferentes backends de
+cache, comparando a janela deslizante com dois contadores com a lista de
+horários por IP usada antes.
+
+Cada caso envia, de um mesmo IP, tantas requisições quanto o limite permite;
+com a lista, cada requisição relê e regrava todos os horários da janela.
+
+Uso:
+    python scripts/benchmark_rate_limit.py [limite ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'web_interface'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_extratos.settings')
+
+TMP = tempfile.mkdtemp()
+# Banco descartável para o cache em tabela
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP, 'benchmark.sqlite3')}"
+
+import django
+
+django.setup()
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from extratos_app.middleware import security_middleware
+from extratos_app.models import ContadorRequisicoes
+from extratos_app.middleware.security_middleware import RATE_LIMITS, SecurityMiddleware
+
+BACKENDS = {
+    'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'banco': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_extratos'},
+    'arquivo': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(TMP, 'cache')},
+}
+JANELA = 300
+
+
+def limitado_por_lista(request, limite):
+    """Implementação anterior: lista com o horário de cada requisição do IP"""
+    cache_key = f"rate_limit_{request.META['REMOTE_ADDR']}"
+    request_times = cache.get(cache_key, [])
+    now = time.time()
+    request_times = [t for t in request_times if t > now - JANELA]
+    if len(request_times) >= limite:
+        return True
+    request_times.append(now)
+    cache.set(cache_key, request_times, JANELA)
+    return False
+
+
+def medir(limitado, limite):
+    request = RequestFactory().get('/resultado/', REMOTE_ADDR='10.0.0.1')
+    cache.clear()
+    ContadorRequisicoes.objects.all().delete()
+    inicio = time.perf_counter()
+    for _ in range(limite):
+        assert not limitado(request)
+    duracao = time.perf_counter() - inicio
+    # A requisição seguinte já passa do limite
+    assert limitado(request)
+    return duracao / limite * 1_000_000
+
+
+def main():
+    limites = [int(arg) for arg in sys.argv[1:]] or [100, 1000]
+    call_command('migrate', verbosity=0)
+    middleware = SecurityMiddleware(lambda request: None)
+
+    print(f"{'Backend':<8} {'Limite':>7} {'Lista (µs/req)':>15} {'Janela (µs/req)':>16}")
+    for nome, backend in BACKENDS.items():
+        with override_settings(CACHES={'default': backend}):
+            # A tabela do cache em banco é opcional e não vem das migrations
+            call_command('createcachetable', verbosity=0)
+            for limite in limites:
+                security_middleware.RATE_LIMITS = {**RATE_LIMITS, 'default': {'requests': limite, 'window': JANELA}}
+                lista = medir(lambda request: limitado_por_lista(request, limite), limite)
+                janela = medir(middleware._is_rate_limited, limite)
+                print(f"{nome:<8} {limite:>7} {lista:>15.1f} {janela:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
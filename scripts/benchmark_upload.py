@@ -0,0 +1,108 @@
+"""
+Mede a memória de pico do processo web ao receber um upload, comparando os
+handlers padrão do Django (até FILE_UPLOAD_MAX_MEMORY_SIZE o arquivo inteiro
+fica em memória) com o UploadVerificadoHandler de extratos_app/uploads.py.
+
+Cada caso monta um POST multipart com um PDF sintético gravado em disco,
+interpreta o corpo como o Django faria numa requisição real e obtém o
+SHA-256 do arquivo: com os handlers padrão lendo o arquivo recebido (como a
+chave do cache fazia), com o handler do projeto usando o hash calculado
+durante o recebimento. A memória é medida com tracemalloc.
+
+Uso:
+    python scripts/benchmark_upload.py [megabytes]
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'web_interface'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_extratos.settings')
+
+import django
+
+django.setup()
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.test.utils import override_settings
+
+FRONTEIRA = 'limite-benchmark'
+HANDLERS_PADRAO = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+HANDLERS_PROJETO = ['extratos_app.uploads.UploadVerificadoHandler']
+
+
+def gerar_corpo(caminho: str, megabytes: int) -> int:
+    """Grava em disco o corpo multipart com um PDF de `megabytes` MB"""
+    bloco = os.urandom(1024 * 1024)
+    with open(caminho, 'wb') as f:
+        f.write(f'--{FRONTEIRA}\r\n'.encode())
+        f.write(b'Content-Disposition: form-data; name="arquivos_bb_cartao_0"; filename="fatura.pdf"\r\n')
+        f.write(b'Content-Type: application/pdf\r\n\r\n')
+        f.write(b'%PDF-1.7\n')
+        for _ in range(megabytes):
+            f.write(bloco)
+        f.write(f'\r\n--{FRONTEIRA}--\r\n'.encode())
+    return os.path.getsize(caminho)
+
+
+def receber(caminho: str, tamanho: int) -> str:
+    with open(caminho, 'rb') as corpo:
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/processar/',
+            'CONTENT_TYPE': f'multipart/form-data; boundary={FRONTEIRA}',
+            'CONTENT_LENGTH': str(tamanho),
+            'wsgi.input': corpo,
+            'wsgi.url_scheme': 'http',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+        })
+        arquivo = request.FILES['arquivos_bb_cartao_0']
+
+        sha256 = getattr(arquivo, 'sha256', '')
+        if not sha256:
+            arquivo.seek(0)
+            sha256 = hashlib.sha256(arquivo.read()).hexdigest()
+        arquivo.close()
+        return sha256
+
+
+def medir(handlers, caminho: str, tamanho: int):
+    with override_settings(FILE_UPLOAD_HANDLERS=handlers):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        sha256 = receber(caminho, tamanho)
+        duracao = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return sha256, duracao, pico
+
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = os.path.join(tmp, 'corpo.bin')
+        tamanho = gerar_corpo(caminho, megabytes)
+
+        print(f"Upload de {megabytes}MB")
+        print(f"{'Handlers':<10} {'Pico de memória (MB)':>21} {'Tempo (s)':>10}")
+        resultados = []
+        for nome, handlers in (('padrão', HANDLERS_PADRAO), ('projeto', HANDLERS_PROJETO)):
+            sha256, duracao, pico = medir(handlers, caminho, tamanho)
+            resultados.append(sha256)
+            print(f"{nome:<10} {pico / (1024 * 1024):>21.2f} {duracao:>10.3f}")
+
+        print(f"Mesmo SHA-256: {len(set(resultados)) == 1}")
+
+
+if __name__ == '__main__':
+    main()
@@ -118,6 +118,7 @@ echo -e "${GREEN}🗄️  Executando migrações...${NC}"
 cd web_interface
 python3 manage.py makemigrations
 python3 manage.py migrate
+python3 manage.py createcachetable
 cd ..
 
 # Coletar arquivos estáticos
@@ -0,0 +1,116 @@
+"""
+Aquecimento do processo antes de atender requisições ou processar extratos.
+
+O URLconf só é importado na primeira requisição, e com ele as views, o
+pipeline (core e analise) e pandas, openpyxl, pyarrow, pdfplumber e plotly:
+alguns segundos pagos pelo primeiro usuário de cada worker. aquecer() faz
+essas importações, compila os templates e roda as etapas do pipeline sobre
+uma amostra de três transações, para que compilações feitas na primeira
+chamada (expressões das categorias, motores de Excel e Parquet) já estejam
+no processo.
+
+Chamada pelo gunicorn.conf.py no processo principal, antes dos forks
+(preload_app), e pelo forkserver do pool de processos (ver tarefas.py).
+Não abre conexão com o banco.
+"""
+import io
+import time
+import logging
+import importlib
+
+logger = logging.getLogger(__name__)
+
+# Importados de forma preguiçosa pelo pipeline (ex.: só na primeira planilha ou PDF)
+MODULOS_PESADOS = [
+    'pandas', 'numpy', 'openpyxl', 'xlrd', 'pyarrow.parquet', 'pdfplumber', 'plotly.graph_objects',
+    'python_calamine',
+]
+TEMPLATES = [
+    'extratos_app/index.html', 'extratos_app/processando.html', 'extratos_app/resultado.html',
+]
+
+
+def _importar_modulos():
+    for nome in MODULOS_PESADOS:
+        try:
+            importlib.import_module(nome)
+        except ImportError:
+            # Dependência opcional (ex.: python-calamine)
+            pass
+
+
+def _importar_urls():
+    """Carrega URLconf e views, que importam o pipeline (processamento, core e analise)"""
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+
+def _carregar_templates():
+    """Compila as páginas no cache do loader de templates"""
+    from django.template.loader import get_template
+
+    for nome in TEMPLATES:
+        get_template(nome)
+
+
+def _amostra():
+    """Planilha consolidada mínima, com as colunas padronizadas do core"""
+    import pandas as pd
+
+    return pd.DataFrame({
+        'Data': pd.to_datetime(['2024-01-05', '2024-01-06', '2024-01-07']),
+        'Data_Contabil': pd.to_datetime(['2024-01-05', '2024-01-06', '2024-01-07']),
+        'Banco': ['Bradesco', 'Bradesco', 'C6 Bank'],
+        'Agencia_Conta': ['1234 / 56789', '1234 / 56789', '1 / 2345678'],
+        'Tipo_Transacao': ['PIX', 'COMPRA CARTAO DEBITO', 'SALARIO'],
+        'Descricao': ['PIX RECEBIDO FULANO', 'MERCADO', 'FOLHA DE PAGAMENTO'],
+        'Valor': [150.0, -80.5, 3000.0],
+        'Valor_Entrada': [150.0, 0.0, 3000.0],
+        'Valor_Saida': [0.0, 80.5, 0.0],
+        'Categoria_Auto': ['', '', ''],
+        'Categoria': ['', '', ''],
+        'Descricao_Manual': ['', '', ''],
+        'Saldo_no_Banco': [150.0, 69.5, 3000.0],
+        'Saldo_Real': [150.0, 69.5, 3069.5],
+    })
+
+
+def _aquecer_pipeline():
+    """Categorização, planilha, Parquet e gráficos Sankey sobre a amostra"""
+    from .processamento import _get_default_categories, exportar_excel, montar_graficos_sankey
+    from .tabela import ler_planilha_resultado, gerar_parquet
+    # Módulo do core (no sys.path desde a importação de processamento)
+    from utils import categorizar_transacoes
+
+    df = _amostra()
+    df['Categoria_Auto'] = categorizar_transacoes(
+        df['Tipo_Transacao'], df['Descricao'], df['Valor'], _get_default_categories(), df['Agencia_Conta']
+    )
+    df['Categoria'] = df['Categoria_Auto']
+
+    planilha = io.BytesIO()
+    if exportar_excel(df, planilha):
+        planilha.seek(0)
+        ler_planilha_resultado(planilha)
+    gerar_parquet(df)
+    montar_graficos_sankey(df)
+
+
+def aquecer():
+    """
+    Importa e exercita o pipeline no processo atual. Falhas só são
+    registradas: o processo continua, apenas sem o aquecimento.
+
+    Returns:
+        Segundos gastos
+    """
+    inicio = time.perf_counter()
+    for etapa in (_importar_modulos, _importar_urls, _carregar_templates, _aquecer_pipeline):
+        try:
+            etapa()
+        except Exception as e:
+            logger.error(f"Erro: {e}")
+
+    duracao = time.perf_counter() - inicio
+    logger.info(f"🔥 Pipeline aquecido em {duracao:.1f}s")
+    return duracao
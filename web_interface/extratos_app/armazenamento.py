@@ -0,0 +1,108 @@
+"""
+Armazenamento por conteúdo dos extratos enviados e dos resultados.
+
+Cada arquivo é gravado uma única vez, em MEDIA_ROOT/blobs/ab/cd/<sha256><ext>
+(as duas primeiras partes do hash distribuem os arquivos em pastas), e
+BlobArmazenado conta quantos campos apontam para ele. Salvar um conteúdo que
+já existe só incrementa a contagem; apagar decrementa, e o arquivo só sai do
+disco quando a última referência é liberada.
+
+Nomes gravados antes deste esquema (extratos/<id>/..., resultados/<id>/...)
+não têm contagem e continuam sendo apagados diretamente.
+
+O storage é registrado em settings.STORAGES com o alias ARMAZENAMENTO_ALIAS,
+onde location e demais OPTIONS podem ser configurados.
+"""
+import hashlib
+import logging
+import os
+
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+PASTA_BLOBS = 'blobs'
+ARMAZENAMENTO_ALIAS = 'extratos'
+
+
+def caminho_blob(sha256, extensao):
+    """Nome do arquivo no storage para um conteúdo (ex.: blobs/ab/cd/abcd....xlsx)"""
+    return f"{PASTA_BLOBS}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extensao}"
+
+
+def _hash_conteudo(content):
+    # UploadVerificadoHandler já calculou o hash durante o recebimento
+    sha256 = getattr(content, 'sha256', '')
+    if sha256:
+        return sha256
+
+    sha = hashlib.sha256()
+    for bloco in content.chunks():
+        sha.update(bloco)
+    return sha.hexdigest()
+
+
+class ArmazenamentoConteudo(FileSystemStorage):
+    """FileSystemStorage que endereça os arquivos pelo SHA-256 e conta referências"""
+
+    def _save(self, name, content):
+        from .models import BlobArmazenado
+
+        nome = caminho_blob(_hash_conteudo(content), os.path.splitext(name)[1].lower())
+        if self.referenciar(nome):
+            return nome
+
+        # Arquivo que sobrou no disco sem registro (remoção interrompida) é reaproveitado
+        if not super().exists(nome):
+            nome = super()._save(nome, content)
+
+        try:
+            BlobArmazenado.objects.create(nome=nome, tamanho=content.size or 0)
+        except IntegrityError:
+            # Outro processo gravou o mesmo conteúdo ao mesmo tempo
+            self.referenciar(nome)
+            return nome
+
+        # O create esperou uma remoção concorrente do mesmo conteúdo, que já apagou o arquivo
+        if not super().exists(nome):
+            super()._save(nome, content)
+        return nome
+
+    def referenciar(self, name):
+        """
+        Acrescenta uma referência a um arquivo já armazenado.
+
+        Returns:
+            True se o arquivo tem contagem de referências (False para nomes antigos)
+        """
+        from .models import BlobArmazenado
+
+        return bool(BlobArmazenado.objects.filter(nome=name).update(referencias=F('referencias') + 1))
+
+    def delete(self, name):
+        """Libera uma referência; o arquivo só é apagado com a última"""
+        from .models import BlobArmazenado
+
+        if not name:
+            return
+
+        with transaction.atomic():
+            # Decremento e remoção condicionais no próprio UPDATE/DELETE, sem
+            # depender de select_for_update (ignorado pelo SQLite)
+            liberada = BlobArmazenado.objects.filter(nome=name, referencias__gt=0).update(
+                referencias=F('referencias') - 1
+            )
+            apagado, _ = BlobArmazenado.objects.filter(nome=name, referencias=0).delete()
+            if not apagado and (liberada or name.startswith(f"{PASTA_BLOBS}/")):
+                # Ainda referenciado, ou o registro já foi apagado por outra remoção
+                return
+
+            # Dentro da transação: um _save concorrente espera o lock e grava de novo
+            super().delete(name)
+
+
+def armazenamento_conteudo():
+    """Storage dos FileFields de extratos e resultados (callable para as migrações)"""
+    return storages[ARMAZENAMENTO_ALIAS]
@@ -3,7 +3,8 @@ import json
 import bleach
 import os
 from .models import ProcessamentoExtrato
-from .utils.validators import validate_cpf, validate_json_content, sanitize_filename
+from .uploads import validar_upload
+from .utils.validators import validate_cpf, validate_json_data, sanitize_filename
 import logging
 
 logger = logging.getLogger(__name__)
@@ -131,21 +132,34 @@ class ProcessamentoExtratoForm(forms.ModelForm):
         """Validar arquivo de configuração"""
         config_file = self.cleaned_data.get('arquivo_config')
         if config_file:
+            validar_upload(config_file)
+            
+            # Lido uma única vez; clean() reaproveita o conteúdo
+            self._config_data = self._ler_config_arquivo(config_file)
+            
             # Validar conteúdo JSON
-            validate_json_content(config_file)
+            validate_json_data(self._config_data)
             
             # Validar estrutura específica do arquivo
-            self._validar_config_arquivo(config_file)
+            self._validar_config_arquivo(self._config_data)
         
         return config_file
 
-    def _validar_config_arquivo(self, config_file):
-        """Validar arquivo de configuração JSON"""
+    def _ler_config_arquivo(self, config_file):
+        """Ler o JSON do arquivo de configuração (limitado pelo handler de upload)"""
         try:
             config_file.seek(0)
-            config_content = config_file.read().decode('utf-8')
-            config_data = json.loads(config_content)
-            
+            config_data = json.loads(config_file.read().decode('utf-8'))
+            config_file.seek(0)
+            return config_data
+        except json.JSONDecodeError:
+            raise forms.ValidationError('Arquivo de configuração não é um JSON válido.')
+        except UnicodeDecodeError:
+            raise forms.ValidationError('Encoding do arquivo de configuração inválido.')
+
+    def _validar_config_arquivo(self, config_data):
+        """Validar estrutura do arquivo de configuração JSON"""
+        try:
             # Validar estrutura básica do JSON
             required_sections = ['usuario', 'arquivos']
             missing_sections = [section for section in required_sections if section not in config_data]
@@ -188,13 +202,6 @@ class ProcessamentoExtratoForm(forms.ModelForm):
                     'Arquivo de configuração deve ter pelo menos um banco configurado na seção "arquivos".'
                 )
             
-            # Resetar o ponteiro do arquivo
-            config_file.seek(0)
-            
-        except json.JSONDecodeError:
-            raise forms.ValidationError('Arquivo de configuração não é um JSON válido.')
-        except UnicodeDecodeError:
-            raise forms.ValidationError('Encoding do arquivo de configuração inválido.')
         except Exception as e:
             logger.error(f"Erro na validação do arquivo de configuração: {e}")
             raise forms.ValidationError('Erro ao processar arquivo de configuração.')
@@ -298,14 +305,9 @@ class ProcessamentoExtratoForm(forms.ModelForm):
     def _processar_arquivo_config(self, cleaned_data):
         """Processar arquivo de configuração JSON e definir bancos automaticamente"""
         try:
-            config_file = cleaned_data.get('arquivo_config')
-            if not config_file:
+            config_data = getattr(self, '_config_data', None)
+            if not config_data:
                 return
-                
-            # Ler e processar o arquivo JSON
-            config_file.seek(0)
-            config_content = config_file.read().decode('utf-8')
-            config_data = json.loads(config_content)
             
             # Mapear bancos do JSON para campos do formulário
             banco_mapping = {
@@ -346,9 +348,6 @@ class ProcessamentoExtratoForm(forms.ModelForm):
                 if banco_json in saldos:
                     cleaned_data[campo_saldo] = saldos[banco_json]
             
-            # Resetar o ponteiro do arquivo
-            config_file.seek(0)
-            
             logger.info(f"Configuração JSON processada com sucesso. Bancos configurados: {bancos_configurados}")
             
         except Exception as e:
@@ -359,6 +358,8 @@ class ProcessamentoExtratoForm(forms.ModelForm):
         """Validar arquivo do C6 Bank"""
         arquivo = self.cleaned_data.get('arquivo_c6')
         if arquivo:
+            validar_upload(arquivo)
+            
             # Validar extensão do arquivo
             ext = os.path.splitext(arquivo.name)[1].lower()
             if ext not in VALID_FILE_EXTENSIONS['c6']:
@@ -374,6 +375,8 @@ class ProcessamentoExtratoForm(forms.ModelForm):
         """Validar arquivo do Bradesco"""
         arquivo = self.cleaned_data.get('arquivo_bradesco')
         if arquivo:
+            validar_upload(arquivo)
+            
             # Validar extensão do arquivo
             ext = os.path.splitext(arquivo.name)[1].lower()
             if ext not in VALID_FILE_EXTENSIONS['bradesco']:
@@ -385,10 +388,20 @@ class ProcessamentoExtratoForm(forms.ModelForm):
         
         return arquivo
 
+    def clean_arquivo_c6_cartao(self):
+        """Validar arquivo do cartão C6"""
+        arquivo = self.cleaned_data.get('arquivo_c6_cartao')
+        if arquivo:
+            validar_upload(arquivo)
+        
+        return arquivo
+
     def _validar_arquivo_extension_e_tamanho(self, arquivo, banco_key, nome_banco):
         """Validar extensão e tamanho do arquivo para um banco específico"""
         if not arquivo:
             return
+        
+        validar_upload(arquivo)
             
         # Validar extensão
         ext = os.path.splitext(arquivo.name)[1].lower()
@@ -0,0 +1,24 @@
+"""
+Remove os processamentos expirados (data_expiracao vencida) e seus arquivos.
+
+As threads do pool e os workers já fazem isso a cada
+PROCESSAMENTO_LIMPEZA_INTERVALO segundos; o comando serve para agendar a
+limpeza pelo cron quando nenhum deles estiver rodando:
+
+    python manage.py limpar_expirados
+"""
+from django.core.management.base import BaseCommand
+
+from extratos_app.tarefas import EXPIRADOS_POR_LOTE, limpar_expirados
+
+
+class Command(BaseCommand):
+    help = 'Remove os processamentos expirados e seus arquivos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=EXPIRADOS_POR_LOTE,
+                            help=f'Processamentos removidos por lote (padrão: {EXPIRADOS_POR_LOTE})')
+
+    def handle(self, *args, **options):
+        removidos = limpar_expirados(lote=options['lote'])
+        self.stdout.write(f"🧹 {removidos} processamento(s) expirado(s) removido(s)")
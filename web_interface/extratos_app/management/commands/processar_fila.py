@@ -0,0 +1,77 @@
+"""
+Worker da fila de processamento.
+
+Reivindica ProcessamentoExtrato pendentes (ou abandonados por outro worker) e
+os processa um por vez. Vários workers podem rodar ao mesmo tempo, na mesma
+máquina ou em máquinas diferentes, apontando para o mesmo banco:
+
+    PROCESSAMENTO_MODO=fila python manage.py processar_fila
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from extratos_app.tarefas import (
+    identificador_worker, reivindicar_processamento, executar_processamento, encerrar_esgotados,
+    limpar_expirados_periodicamente
+)
+
+
+class Command(BaseCommand):
+    help = 'Processa os extratos enfileirados pela interface web'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos entre consultas quando a fila está vazia (padrão: 1)')
+        parser.add_argument('--intervalo-maximo', type=float, default=10.0,
+                            help='Limite do recuo entre consultas com a fila vazia (padrão: 10)')
+        parser.add_argument('--max-processamentos', type=int, default=0,
+                            help='Encerrar depois de N processamentos (padrão: sem limite)')
+        parser.add_argument('--sair-quando-vazia', action='store_true',
+                            help='Encerrar assim que não houver nada para processar')
+
+    def handle(self, *args, **options):
+        worker = identificador_worker()
+        parar = threading.Event()
+
+        def _sinal(signum, frame):
+            # Termina o processamento atual antes de sair
+            self.stdout.write(f"Sinal {signum} recebido, encerrando após o processamento atual")
+            parar.set()
+
+        signal.signal(signal.SIGTERM, _sinal)
+        signal.signal(signal.SIGINT, _sinal)
+
+        self.stdout.write(f"🚀 Worker {worker} aguardando processamentos")
+        intervalo = options['intervalo']
+        processados = 0
+
+        while not parar.is_set():
+            close_old_connections()
+            try:
+                encerrar_esgotados()
+                limpar_expirados_periodicamente()
+                processamento = reivindicar_processamento(worker)
+            except Exception as e:
+                self.stderr.write(f"Erro: {e}")
+                processamento = None
+
+            if processamento is None:
+                if options['sair_quando_vazia']:
+                    break
+                # Recuo exponencial enquanto a fila estiver vazia
+                parar.wait(intervalo)
+                intervalo = min(intervalo * 2, options['intervalo_maximo'])
+                continue
+
+            intervalo = options['intervalo']
+            executar_processamento(processamento, worker)
+            processados += 1
+
+            if options['max_processamentos'] and processados >= options['max_processamentos']:
+                break
+
+        close_old_connections()
+        self.stdout.write(f"Worker {worker} encerrado ({processados} processamento(s))")
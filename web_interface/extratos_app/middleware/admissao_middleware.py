@@ -0,0 +1,38 @@
+"""
+Controle de admissão dos envios de extratos.
+
+Com a fila de processamento cheia (ver tarefas.verificar_admissao), o POST
+em /processar/ é respondido com 503 e Retry-After. A verificação roda em
+process_request, antes que o CsrfViewMiddleware leia request.POST: os
+arquivos do envio recusado nem chegam a ser recebidos.
+"""
+from django.contrib import messages
+from django.shortcuts import render
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.deprecation import MiddlewareMixin
+
+from ..forms import ProcessamentoExtratoForm
+from ..tarefas import verificar_admissao
+
+MENSAGEM_FILA_CHEIA = 'Muitos extratos em processamento no momento. Tente novamente em alguns instantes.'
+
+
+class AdmissaoMiddleware(MiddlewareMixin):
+    """Recusa novos envios enquanto a fila estiver cheia"""
+
+    def process_request(self, request):
+        if request.method != 'POST' or request.path != reverse('extratos:processar'):
+            return None
+
+        espera = verificar_admissao()
+        if espera is None:
+            return None
+
+        if 'application/json' in request.headers.get('Accept', ''):
+            response = JsonResponse({'erro': MENSAGEM_FILA_CHEIA, 'tentar_em': espera}, status=503)
+        else:
+            messages.error(request, MENSAGEM_FILA_CHEIA)
+            response = render(request, 'extratos_app/index.html', {'form': ProcessamentoExtratoForm()}, status=503)
+        response['Retry-After'] = str(espera)
+        return response
@@ -0,0 +1,78 @@
+"""
+Compressão das respostas HTML e JSON.
+
+Usa brotli quando o pacote `brotli` está instalado e o navegador aceita
+'br'; caso contrário, o gzip do GZipMiddleware do Django. Arquivos estáticos
+já saem comprimidos pelo WhiteNoise, e downloads (a planilha já é um zip),
+intervalos de bytes e os eventos (SSE, respostas curtas) passam sem
+compressão.
+"""
+import logging
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+TIPOS_COMPRIMIVEIS = ('text/html', 'application/json', 'text/plain')
+
+# Respostas menores que isso não compensam o cabeçalho extra
+TAMANHO_MINIMO = 200
+
+# Qualidade 11 (padrão) é lenta demais para conteúdo gerado a cada requisição
+QUALIDADE_BROTLI = 5
+
+
+def aceita_codificacao(request, codificacao):
+    """
+    Se o Accept-Encoding da requisição aceita a codificação: listada (ou
+    coberta por '*') com q maior que zero. 'deflate;q=0' é uma recusa.
+    """
+    pesos = {}
+    for parte in request.headers.get('Accept-Encoding', '').split(','):
+        nome, *parametros = [item.strip() for item in parte.split(';')]
+        peso = 1.0
+        for parametro in parametros:
+            chave, _, valor = parametro.partition('=')
+            if chave.strip().lower() == 'q':
+                try:
+                    peso = float(valor)
+                except ValueError:
+                    peso = 0.0
+        if nome:
+            pesos[nome.lower()] = peso
+    return pesos.get(codificacao, pesos.get('*', 0.0)) > 0
+
+
+class CompressaoMiddleware(GZipMiddleware):
+    """GZipMiddleware restrito a HTML/JSON e com brotli quando disponível"""
+
+    def process_response(self, request, response):
+        tipo = response.get('Content-Type', '').split(';')[0].strip()
+        if tipo not in TIPOS_COMPRIMIVEIS or response.streaming or response.status_code == 206:
+            return response
+
+        if brotli is None or not aceita_codificacao(request, 'br'):
+            return super().process_response(request, response)
+
+        if response.has_header('Content-Encoding') or len(response.content) < TAMANHO_MINIMO:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        comprimido = brotli.compress(response.content, quality=QUALIDADE_BROTLI)
+        if len(comprimido) >= len(response.content):
+            return response
+
+        response.content = comprimido
+        response.headers['Content-Length'] = str(len(comprimido))
+        response.headers['Content-Encoding'] = 'br'
+        # O conteúdo enviado mudou: o ETag deixa de ser forte
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
@@ -4,13 +4,103 @@ Middleware de segurança personalizado
 import time
 import logging
 from django.http import HttpResponseForbidden
+from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
-from django.core.cache import cache
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.crypto import salted_hmac
 from datetime import timedelta
 
+from ..models import ContadorRequisicoes
+
 logger = logging.getLogger(__name__)
 
+# Limites por endpoint
+RATE_LIMITS = {
+    '/processar/': {'requests': 10, 'window': 600},  # 10 requests por 10 minutos
+    '/': {'requests': 50, 'window': 300},  # 50 requests por 5 minutos
+    'default': {'requests': 100, 'window': 300}  # 100 requests por 5 minutos
+}
+
+
+def _incremento_atomico():
+    """
+    Cache compartilhado entre os processos com incr atômico (Redis, Memcached).
+    O locmem também tem incr próprio, mas cada worker do gunicorn teria o seu
+    """
+    backend = type(caches['default'])
+    return backend.incr is not BaseCache.incr and not issubclass(backend, LocMemCache)
+
+
+def _ler_contagens(chaves):
+    if _incremento_atomico():
+        return cache.get_many(chaves)
+    return dict(ContadorRequisicoes.objects.filter(
+        chave__in=chaves, expiracao__gt=timezone.now()
+    ).values_list('chave', 'contagem'))
+
+
+def _incrementar(chave, validade):
+    """
+    Soma uma requisição ao contador. Sem um cache compartilhado com incr
+    atômico (locmem, o padrão, banco e arquivo), o contador fica numa tabela e
+    o incremento é um UPDATE ... SET contagem = contagem + 1, atômico no
+    SQLite e no PostgreSQL
+    """
+    if _incremento_atomico():
+        cache.add(chave, 0, validade)
+        try:
+            cache.incr(chave)
+        except ValueError:
+            # Expirou entre a criação e o incremento
+            cache.add(chave, 1, validade)
+        return
+    
+    contadores = ContadorRequisicoes.objects.filter(chave=chave)
+    if contadores.update(contagem=F('contagem') + 1):
+        return
+    
+    agora = timezone.now()
+    try:
+        with transaction.atomic():
+            ContadorRequisicoes.objects.create(
+                chave=chave, contagem=1, expiracao=agora + timedelta(seconds=validade)
+            )
+    except IntegrityError:
+        # Criado por outra requisição ao mesmo tempo
+        contadores.update(contagem=F('contagem') + 1)
+        return
+    
+    # Um contador novo por cliente e janela: hora de apagar os vencidos
+    ContadorRequisicoes.objects.filter(expiracao__lte=agora).delete()
+
+
+def _ip_do_cliente(request):
+    """
+    REMOTE_ADDR ou, atrás de RATELIMIT_PROXIES proxies confiáveis, o endereço
+    que o mais externo deles acrescentou ao X-Forwarded-For; os anteriores
+    vêm do cliente e podem ser forjados
+    """
+    proxies = getattr(settings, 'RATELIMIT_PROXIES', 0)
+    if proxies:
+        enderecos = [e.strip() for e in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if e.strip()]
+        if len(enderecos) >= proxies:
+            return enderecos[-proxies]
+    return request.META.get('REMOTE_ADDR')
+
+
+def _identificador_cliente(request):
+    """
+    HMAC (com a SECRET_KEY) do IP do cliente, usado nas chaves dos contadores
+    e nos logs: nem a tabela de contadores nem os logs guardam o endereço
+    """
+    return salted_hmac('extratos_app.rate_limit', _ip_do_cliente(request) or '').hexdigest()[:16]
+
+
 class SecurityMiddleware(MiddlewareMixin):
     """Middleware para aplicar controles de segurança"""
     
@@ -24,61 +114,54 @@ class SecurityMiddleware(MiddlewareMixin):
         # Rate limiting básico por IP
         if hasattr(settings, 'RATELIMIT_ENABLE') and settings.RATELIMIT_ENABLE:
             if self._is_rate_limited(request):
-                logger.warning(f"Rate limit excedido para IP: {self._get_client_ip(request)}")
+                logger.warning(f"Rate limit excedido em {request.path} (cliente {_identificador_cliente(request)})")
                 return HttpResponseForbidden("Rate limit excedido. Tente novamente em alguns minutos.")
         
-        # Registrar informações da requisição
-        self._log_request_info(request)
-        
         return None
     
     def _is_rate_limited(self, request):
-        """Verifica se o IP está com rate limit"""
-        client_ip = self._get_client_ip(request)
-        cache_key = f"rate_limit_{client_ip}"
+        """
+        Verifica se o IP está com rate limit (janela deslizante aproximada).
         
-        # Limites por endpoint
-        limits = {
-            '/processar/': {'requests': 10, 'window': 600},  # 10 requests por 10 minutos
-            '/': {'requests': 50, 'window': 300},  # 50 requests por 5 minutos
-            'default': {'requests': 100, 'window': 300}  # 100 requests por 5 minutos
-        }
+        Cada cliente e limite usam só dois contadores, o da janela atual e
+        o da anterior; a contagem estimada é a atual mais a anterior ponderada
+        pelo quanto dela ainda cabe na janela deslizante. O custo é fixo, seja
+        qual for o limite, e o incremento é atômico: no cache com Redis ou
+        Memcached (ver CACHES em settings.py) ou numa tabela do banco.
+        """
+        cliente = _identificador_cliente(request)
         
         # Determinar limite baseado no path
         path = request.path
-        limit_config = limits.get(path, limits['default'])
-        
-        # Verificar cache
-        request_times = cache.get(cache_key, [])
-        now = time.time()
-        
-        # Remover requests antigas
-        window_start = now - limit_config['window']
-        request_times = [t for t in request_times if t > window_start]
-        
-        # Verificar se excedeu o limite
-        if len(request_times) >= limit_config['requests']:
-            return True
-        
-        # Adicionar nova requisição
-        request_times.append(now)
-        cache.set(cache_key, request_times, limit_config['window'])
+        escopo = path if path in RATE_LIMITS else 'default'
+        limite = RATE_LIMITS[escopo]
+        janela = limite['window']
+        
+        agora = time.time()
+        indice = int(agora // janela)
+        chave_atual = f"rate_limit:{escopo}:{cliente}:{indice}"
+        chave_anterior = f"rate_limit:{escopo}:{cliente}:{indice - 1}"
+        
+        try:
+            contagens = _ler_contagens([chave_atual, chave_anterior])
+            peso_anterior = 1 - (agora % janela) / janela
+            estimado = contagens.get(chave_atual, 0) + contagens.get(chave_anterior, 0) * peso_anterior
+            
+            # Verificar se excedeu o limite (requisições bloqueadas não contam)
+            if estimado >= limite['requests']:
+                return True
+            
+            # Registrar a requisição; o contador vive por duas janelas
+            _incrementar(chave_atual, janela * 2)
+        except Exception as e:
+            # Sem cache disponível o limite não é aplicado
+            logger.error(f"Erro no rate limit: {e}")
         
         return False
     
     def _get_client_ip(self, request):
         """Obter IP do cliente"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
-    def _log_request_info(self, request):
-        """Registrar informações da requisição"""
-        if request.path in ['/processar/', '/']:
-            logger.info(f"Requisição: {request.method} {request.path} - IP: {self._get_client_ip(request)} - UA: {request.META.get('HTTP_USER_AGENT', 'Unknown')}")
+        return _ip_do_cliente(request)
 
 class FileUploadSecurityMiddleware(MiddlewareMixin):
     """Middleware para segurança de upload de arquivos"""
@@ -96,24 +179,19 @@ class FileUploadSecurityMiddleware(MiddlewareMixin):
             max_size = getattr(settings, 'MAX_UPLOAD_SIZE', 50 * 1024 * 1024)  # 50MB
             
             if total_size > max_size:
-                logger.warning(f"Upload muito grande: {total_size} bytes de {self._get_client_ip(request)}")
+                logger.warning(f"Upload muito grande: {total_size} bytes de {_identificador_cliente(request)}")
                 return HttpResponseForbidden("Tamanho total dos arquivos excede o limite permitido.")
             
             # Verificar número de arquivos
             if len(request.FILES) > 20:  # Máximo 20 arquivos
-                logger.warning(f"Muitos arquivos no upload: {len(request.FILES)} de {self._get_client_ip(request)}")
+                logger.warning(f"Muitos arquivos no upload: {len(request.FILES)} de {_identificador_cliente(request)}")
                 return HttpResponseForbidden("Número de arquivos excede o limite permitido.")
         
         return None
     
     def _get_client_ip(self, request):
         """Obter IP do cliente"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return _ip_do_cliente(request)
 
 class HeaderSecurityMiddleware(MiddlewareMixin):
     """Middleware para adicionar cabeçalhos de segurança"""
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.2 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+def marcar_processados_como_concluidos(apps, schema_editor):
+    ProcessamentoExtrato = apps.get_model('extratos_app', 'ProcessamentoExtrato')
+    ProcessamentoExtrato.objects.filter(processado=True).update(status='concluido', progresso=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0003_processamentoextrato_arquivo_c6_cartao_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='status',
+            field=models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('erro', 'Erro')], db_index=True, default='pendente', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='etapa',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='progresso',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='mensagem_erro',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='data_inicio',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='data_fim',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(marcar_processados_como_concluidos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.2 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0004_fila_processamento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='tentativas',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='ultimo_heartbeat',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
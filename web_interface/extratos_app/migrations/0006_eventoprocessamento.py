@@ -0,0 +1,30 @@
+# Generated by Django 5.2.2 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0005_processamentoextrato_tentativas_worker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoProcessamento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etapa', models.CharField(max_length=100)),
+                ('mensagem', models.CharField(blank=True, default='', max_length=255)),
+                ('progresso', models.PositiveSmallIntegerField(default=0)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+                ('processamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to='extratos_app.processamentoextrato')),
+            ],
+            options={
+                'verbose_name': 'Evento de Processamento',
+                'verbose_name_plural': 'Eventos de Processamento',
+                'ordering': ['id'],
+            },
+        ),
+    ]
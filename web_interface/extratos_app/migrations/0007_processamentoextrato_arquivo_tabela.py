@@ -0,0 +1,19 @@
+# Generated by Django 5.2.2 on 2026-10-19 13:00
+
+import extratos_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0006_eventoprocessamento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='arquivo_tabela',
+            field=models.FileField(blank=True, null=True, upload_to=extratos_app.models.upload_result_secure_path),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.2 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0007_processamentoextrato_arquivo_tabela'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GraficoSankey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.SlugField(max_length=100)),
+                ('titulo', models.CharField(max_length=100)),
+                ('ordem', models.PositiveSmallIntegerField(default=0)),
+                ('dados', models.BinaryField()),
+                ('processamento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='graficos', to='extratos_app.processamentoextrato')),
+            ],
+            options={
+                'verbose_name': 'Gráfico Sankey',
+                'verbose_name_plural': 'Gráficos Sankey',
+                'ordering': ['ordem'],
+                'constraints': [models.UniqueConstraint(fields=('processamento', 'chave'), name='grafico_sankey_unico')],
+            },
+        ),
+        migrations.RemoveField(
+            model_name='processamentoextrato',
+            name='sankey_data',
+        ),
+    ]
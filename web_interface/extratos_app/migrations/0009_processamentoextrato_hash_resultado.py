@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-19 15:00
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def calcular_hashes(apps, schema_editor):
+    ProcessamentoExtrato = apps.get_model('extratos_app', 'ProcessamentoExtrato')
+    for processamento in ProcessamentoExtrato.objects.exclude(arquivo_resultado='').exclude(arquivo_resultado=None):
+        try:
+            with processamento.arquivo_resultado.open('rb') as arquivo:
+                hash_resultado = hashlib.sha256(arquivo.read()).hexdigest()
+        except OSError:
+            continue
+        ProcessamentoExtrato.objects.filter(pk=processamento.pk).update(hash_resultado=hash_resultado)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0008_graficosankey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='hash_resultado',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(calcular_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0009_processamentoextrato_hash_resultado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='chave_cache',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0010_processamentoextrato_chave_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='hashes_upload',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.2 on 2026-10-19 18:00
+
+from django.db import migrations, models
+
+import extratos_app.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0011_processamentoextrato_hashes_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processamentoextrato',
+            name='data_expiracao',
+            field=models.DateTimeField(db_index=True, default=extratos_app.models.expiracao_padrao),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.2 on 2026-10-19 19:00
+
+import extratos_app.armazenamento
+import extratos_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0012_processamentoextrato_data_expiracao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlobArmazenado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255, unique=True)),
+                ('referencias', models.PositiveIntegerField(default=1)),
+                ('tamanho', models.BigIntegerField(default=0)),
+                ('data_criacao', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Arquivo Armazenado',
+                'verbose_name_plural': 'Arquivos Armazenados',
+            },
+        ),
+        migrations.AlterField(
+            model_name='arquivoextrato',
+            name='arquivo',
+            field=models.FileField(storage=extratos_app.armazenamento.armazenamento_conteudo, upload_to=extratos_app.models.upload_to_secure_path),
+        ),
+        migrations.AlterField(
+            model_name='processamentoextrato',
+            name='arquivo_bradesco',
+            field=models.FileField(blank=True, null=True, storage=extratos_app.armazenamento.armazenamento_conteudo, upload_to=extratos_app.models.upload_to_secure_path),
+        ),
+        migrations.AlterField(
+            model_name='processamentoextrato',
+            name='arquivo_c6',
+            field=models.FileField(blank=True, null=True, storage=extratos_app.armazenamento.armazenamento_conteudo, upload_to=extratos_app.models.upload_to_secure_path),
+        ),
+        migrations.AlterField(
+            model_name='processamentoextrato',
+            name='arquivo_c6_cartao',
+            field=models.FileField(blank=True, null=True, storage=extratos_app.armazenamento.armazenamento_conteudo, upload_to=extratos_app.models.upload_to_secure_path),
+        ),
+        migrations.AlterField(
+            model_name='processamentoextrato',
+            name='arquivo_resultado',
+            field=models.FileField(blank=True, null=True, storage=extratos_app.armazenamento.armazenamento_conteudo, upload_to=extratos_app.models.upload_result_secure_path),
+        ),
+        migrations.AlterField(
+            model_name='processamentoextrato',
+            name='arquivo_tabela',
+            field=models.FileField(blank=True, null=True, storage=extratos_app.armazenamento.armazenamento_conteudo, upload_to=extratos_app.models.upload_result_secure_path),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.2 on 2026-10-19 20:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0013_blobarmazenado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processamentoextrato',
+            name='status',
+            field=models.CharField(choices=[('pendente', 'Na fila'), ('processando', 'Processando'), ('concluido', 'Concluído'), ('erro', 'Erro')], default='pendente', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='arquivoextrato',
+            index=models.Index(fields=['processamento', 'banco', 'ordem'], name='arquivo_extrato_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventoprocessamento',
+            index=models.Index(fields=['processamento', 'id'], name='evento_processamento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processamentoextrato',
+            index=models.Index(fields=['-data_criacao'], name='processamento_criacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processamentoextrato',
+            index=models.Index(fields=['status', 'data_criacao'], name='processamento_fila_idx'),
+        ),
+    ]
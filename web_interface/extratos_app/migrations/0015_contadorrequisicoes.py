@@ -0,0 +1,26 @@
+# Generated by Django 5.2.2 on 2026-10-19 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0014_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorRequisicoes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=255, unique=True)),
+                ('contagem', models.PositiveIntegerField(default=0)),
+                ('expiracao', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Contador de Requisições',
+                'verbose_name_plural': 'Contadores de Requisições',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-19 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extratos_app', '0015_contadorrequisicoes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='arquivoextrato',
+            name='nome_original',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -1,9 +1,16 @@
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 import uuid
 import os
+import json
+import zlib
 from django.core.exceptions import ValidationError
 import logging
 
+from .armazenamento import armazenamento_conteudo
+
 logger = logging.getLogger(__name__)
 
 # Importações condicionais para evitar erros de importação
@@ -23,14 +30,18 @@ except ImportError:
         return filename or 'unnamed_file'
 
 
-def _remover_arquivo_seguro(arquivo_path):
-    """Remove arquivo se existir, ignora erros silenciosamente"""
+def liberar_arquivo(campo):
+    """Apaga o arquivo do campo (ou só uma referência, se for compartilhado), ignora erros"""
     try:
-        if arquivo_path and os.path.isfile(arquivo_path):
-            os.remove(arquivo_path)
-    except (OSError, IOError):
-        # Ignorar erros de remoção (arquivo pode já ter sido removido, etc.)
-        pass
+        if campo:
+            campo.storage.delete(campo.name)
+    except Exception as e:
+        logger.error(f"Erro ao liberar {campo.name}: {e}")
+
+
+def expiracao_padrao():
+    """Momento em que um processamento criado (ou concluído) agora expira"""
+    return timezone.now() + timedelta(seconds=getattr(settings, 'RESULTADO_VALIDADE', 3600))
 
 
 def upload_to_secure_path(instance, filename):
@@ -54,6 +65,18 @@ def upload_result_secure_path(instance, filename):
 class ProcessamentoExtrato(models.Model):
     """Model para processamento de extratos bancários"""
     
+    # Situação do processamento na fila (ver tarefas.py)
+    STATUS_PENDENTE = 'pendente'
+    STATUS_PROCESSANDO = 'processando'
+    STATUS_CONCLUIDO = 'concluido'
+    STATUS_ERRO = 'erro'
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Na fila'),
+        (STATUS_PROCESSANDO, 'Processando'),
+        (STATUS_CONCLUIDO, 'Concluído'),
+        (STATUS_ERRO, 'Erro'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     nome_usuario = models.CharField(max_length=200, verbose_name="Nome", blank=True, null=True)
     
@@ -71,9 +94,10 @@ class ProcessamentoExtrato(models.Model):
     usar_itau = models.BooleanField(default=False, verbose_name="Itaú")
     
     # Arquivos de extrato
-    arquivo_c6 = models.FileField(upload_to=upload_to_secure_path, blank=True, null=True)
-    arquivo_c6_cartao = models.FileField(upload_to=upload_to_secure_path, blank=True, null=True)
-    arquivo_bradesco = models.FileField(upload_to=upload_to_secure_path, blank=True, null=True)
+    # Extratos e resultados ficam no armazenamento por conteúdo (ver armazenamento.py)
+    arquivo_c6 = models.FileField(upload_to=upload_to_secure_path, storage=armazenamento_conteudo, blank=True, null=True)
+    arquivo_c6_cartao = models.FileField(upload_to=upload_to_secure_path, storage=armazenamento_conteudo, blank=True, null=True)
+    arquivo_bradesco = models.FileField(upload_to=upload_to_secure_path, storage=armazenamento_conteudo, blank=True, null=True)
     
     # Arquivo de configuração personalizado (opcional)
     arquivo_config = models.FileField(
@@ -100,10 +124,28 @@ class ProcessamentoExtrato(models.Model):
     # Controle
     data_criacao = models.DateTimeField(auto_now_add=True)
     processado = models.BooleanField(default=False)
-    arquivo_resultado = models.FileField(upload_to=upload_result_secure_path, blank=True, null=True)
+    arquivo_resultado = models.FileField(upload_to=upload_result_secure_path, storage=armazenamento_conteudo, blank=True, null=True)
+    # SHA-256 da planilha resultado, usado nos ETags dos gráficos
+    hash_resultado = models.CharField(max_length=64, blank=True, default='')
+    # HMAC dos arquivos e da configuração; envios idênticos reaproveitam o resultado
+    chave_cache = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    # SHA-256 de cada arquivo enviado (nome no storage -> hash), calculado no upload
+    hashes_upload = models.JSONField(blank=True, default=dict)
+    # Removido (linha e arquivos) por tarefas.limpar_expirados depois desta data
+    data_expiracao = models.DateTimeField(default=expiracao_padrao, db_index=True)
+    # Mesmas transações em Parquet, consultadas pela página de resultado
+    arquivo_tabela = models.FileField(upload_to=upload_result_secure_path, storage=armazenamento_conteudo, blank=True, null=True)
     
-    # Dados dos gráficos Sankey em JSON
-    sankey_data = models.TextField(blank=True, null=True, verbose_name="Dados dos Gráficos Sankey")
+    # Fila de processamento
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDENTE)
+    etapa = models.CharField(max_length=100, blank=True, default='')
+    progresso = models.PositiveSmallIntegerField(default=0)
+    mensagem_erro = models.TextField(blank=True, null=True)
+    data_inicio = models.DateTimeField(blank=True, null=True)
+    data_fim = models.DateTimeField(blank=True, null=True)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='')
+    ultimo_heartbeat = models.DateTimeField(blank=True, null=True)
     
     # Controle de acesso
     ip_address = models.GenericIPAddressField(blank=True, null=True)
@@ -153,23 +195,28 @@ class ProcessamentoExtrato(models.Model):
         super().save(*args, **kwargs)
     
     def delete(self, *args, **kwargs):
-        """Sobrescrever delete para remover arquivos do sistema de arquivos"""
-        # Remover arquivo de resultado
-        if self.arquivo_resultado:
-            _remover_arquivo_seguro(self.arquivo_resultado.path)
+        """Sobrescrever delete para liberar os arquivos (referências no armazenamento por conteúdo)"""
+        # Arquivo de resultado
+        liberar_arquivo(self.arquivo_resultado)
+        liberar_arquivo(self.arquivo_tabela)
         
-        # Remover arquivos de extratos principais
-        _remover_arquivo_seguro(self.arquivo_c6.path if self.arquivo_c6 else None)
-        _remover_arquivo_seguro(self.arquivo_bradesco.path if self.arquivo_bradesco else None)
-        _remover_arquivo_seguro(self.arquivo_config.path if self.arquivo_config else None)
+        # Arquivos de extratos principais
+        liberar_arquivo(self.arquivo_c6)
+        liberar_arquivo(self.arquivo_c6_cartao)
+        liberar_arquivo(self.arquivo_bradesco)
+        liberar_arquivo(self.arquivo_config)
         
-        # Remover arquivos múltiplos
+        # Arquivos múltiplos
         for arquivo in self.arquivos.all():
-            if arquivo.arquivo:
-                _remover_arquivo_seguro(arquivo.arquivo.path)
+            liberar_arquivo(arquivo.arquivo)
         
         super().delete(*args, **kwargs)
     
+    @property
+    def finalizado(self):
+        """Indica se o processamento saiu da fila (com sucesso ou erro)"""
+        return self.status in (self.STATUS_CONCLUIDO, self.STATUS_ERRO)
+    
     def __str__(self):
         """Representação string do modelo"""
         nome = self.nome_usuario or "Usuário"
@@ -180,6 +227,12 @@ class ProcessamentoExtrato(models.Model):
         verbose_name = "Processamento de Extrato"
         verbose_name_plural = "Processamentos de Extratos"
         ordering = ['-data_criacao']
+        indexes = [
+            # Ordenação padrão (admin e listagens)
+            models.Index(fields=['-data_criacao'], name='processamento_criacao_idx'),
+            # Fila: pendentes/em andamento do mais antigo para o mais novo (tarefas._reivindicaveis)
+            models.Index(fields=['status', 'data_criacao'], name='processamento_fila_idx'),
+        ]
 
 
 class ArquivoExtrato(models.Model):
@@ -197,8 +250,11 @@ class ArquivoExtrato(models.Model):
         related_name='arquivos'
     )
     banco = models.CharField(max_length=20, choices=BANCO_CHOICES)
-    arquivo = models.FileField(upload_to=upload_to_secure_path)
+    arquivo = models.FileField(upload_to=upload_to_secure_path, storage=armazenamento_conteudo)
     ordem = models.PositiveIntegerField(default=1)
+    # Nome do arquivo enviado: o storage grava pelo conteúdo (blobs/...) e o
+    # processador do BB ordena os extratos pelo mês/ano no nome
+    nome_original = models.CharField(max_length=255, blank=True, default='')
     
     def clean(self):
         """Validação do modelo"""
@@ -210,9 +266,116 @@ class ArquivoExtrato(models.Model):
     
     class Meta:
         ordering = ['banco', 'ordem']
+        indexes = [
+            # processamento.arquivos.all() já na ordem do Meta.ordering
+            models.Index(fields=['processamento', 'banco', 'ordem'], name='arquivo_extrato_ordem_idx'),
+        ]
         verbose_name = "Arquivo de Extrato"
         verbose_name_plural = "Arquivos de Extratos"
     
     def __str__(self):
         """Representação string do modelo"""
         return f"{self.get_banco_display()} - {self.arquivo.name}"
+
+
+class EventoProcessamento(models.Model):
+    """Etapas registradas durante um processamento, transmitidas para a página de acompanhamento"""
+    
+    processamento = models.ForeignKey(
+        ProcessamentoExtrato,
+        on_delete=models.CASCADE,
+        related_name='eventos'
+    )
+    etapa = models.CharField(max_length=100)
+    mensagem = models.CharField(max_length=255, blank=True, default='')
+    progresso = models.PositiveSmallIntegerField(default=0)
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Eventos novos de um processamento (id > Last-Event-ID), lidos pelo SSE
+            models.Index(fields=['processamento', 'id'], name='evento_processamento_idx'),
+        ]
+        verbose_name = "Evento de Processamento"
+        verbose_name_plural = "Eventos de Processamento"
+    
+    def __str__(self):
+        """Representação string do modelo"""
+        return f"{self.etapa} ({self.progresso}%)"
+
+
+class GraficoSankey(models.Model):
+    """
+    Dados de um gráfico Sankey do resultado (nós, links e título), desenhado
+    no navegador pelo Plotly. Guardados como JSON comprimido com zlib.
+    """
+    
+    processamento = models.ForeignKey(
+        ProcessamentoExtrato,
+        on_delete=models.CASCADE,
+        related_name='graficos'
+    )
+    # 'geral' ou o nome do banco em slug
+    chave = models.SlugField(max_length=100)
+    titulo = models.CharField(max_length=100)
+    ordem = models.PositiveSmallIntegerField(default=0)
+    dados = models.BinaryField()
+    
+    @staticmethod
+    def comprimir(especificacao):
+        """Serializa os dados do gráfico em JSON compacto comprimido"""
+        return zlib.compress(json.dumps(especificacao, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+    
+    @property
+    def especificacao(self):
+        """Dados do gráfico descomprimidos"""
+        return json.loads(zlib.decompress(bytes(self.dados)))
+    
+    class Meta:
+        ordering = ['ordem']
+        constraints = [
+            models.UniqueConstraint(fields=['processamento', 'chave'], name='grafico_sankey_unico')
+        ]
+        verbose_name = "Gráfico Sankey"
+        verbose_name_plural = "Gráficos Sankey"
+    
+    def __str__(self):
+        """Representação string do modelo"""
+        return self.titulo
+
+
+class BlobArmazenado(models.Model):
+    """Arquivo guardado uma única vez pelo conteúdo e quantos campos apontam para ele (ver armazenamento.py)"""
+    
+    nome = models.CharField(max_length=255, unique=True)
+    referencias = models.PositiveIntegerField(default=1)
+    tamanho = models.BigIntegerField(default=0)
+    data_criacao = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Arquivo Armazenado"
+        verbose_name_plural = "Arquivos Armazenados"
+    
+    def __str__(self):
+        """Representação string do modelo"""
+        return f"{self.nome} ({self.referencias})"
+
+
+class ContadorRequisicoes(models.Model):
+    """
+    Contador do rate limit por IP, endpoint e janela quando o cache não tem
+    incremento atômico (ver middleware/security_middleware.py)
+    """
+    
+    chave = models.CharField(max_length=255, unique=True)
+    contagem = models.PositiveIntegerField(default=0)
+    expiracao = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        verbose_name = "Contador de Requisições"
+        verbose_name_plural = "Contadores de Requisições"
+    
+    def __str__(self):
+        """Representação string do modelo"""
+        return f"{self.chave} ({self.contagem})"
@@ -0,0 +1,23 @@
+"""
+Processos do pool de processamento (PROCESSAMENTO_MODO='processo').
+
+O forkserver importa este módulo uma única vez (set_forkserver_preload, ver
+tarefas._criar_pool_processos): o Django é configurado e o pipeline aquecido
+antes de qualquer fork, e cada processo do pool nasce de um fork dele já com
+pandas, core e analise carregados. Sem forkserver (spawn), cada processo
+importa este módulo ao iniciar, pelo initializer.
+
+Não deve ser importado pelo processo web, que já está aquecido.
+"""
+import os
+
+import django
+from django.apps import apps
+
+if not apps.ready:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'web_extratos.settings')
+    django.setup()
+
+from .aquecimento import aquecer  # noqa: E402
+
+aquecer()
@@ -0,0 +1,615 @@
+"""
+Pipeline de processamento dos extratos enviados pela interface web.
+
+Monta o config do core apontando para os uploads no storage, roda o
+processador e a análise Sankey e grava o resultado no ProcessamentoExtrato.
+Fica separado das views para poder ser executado fora da requisição (ver
+tarefas.py).
+"""
+import io
+import os
+import sys
+import json
+import hashlib
+import importlib.util
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.utils.crypto import salted_hmac
+from django.utils.text import slugify
+
+from .models import GraficoSankey, liberar_arquivo
+from .tabela import COLUNAS_NUMERICAS, ler_planilha_resultado, gerar_parquet
+
+# Constantes
+TRANSFERENCIAS_WINDOW_DAYS = 3
+TOLERANCIA_VALOR = 0.01
+
+# Incrementar quando o resultado do pipeline mudar para os mesmos arquivos
+# (invalida o cache de resultados, ver chave_cache_resultado)
+VERSAO_PIPELINE = 1
+
+# Import das funções do processador original
+core_dir = Path(__file__).parent.parent.parent / "core"
+analise_dir = Path(__file__).parent.parent.parent / "analise"
+sys.path.insert(0, str(core_dir))
+sys.path.insert(0, str(analise_dir))
+
+try:
+    from processador import consolidar_extratos, exportar_excel
+    from bancos import NOMES_BANCOS
+    from graficos_sankey import montar_graficos_sankey
+except ImportError:
+    spec = importlib.util.spec_from_file_location("processador", core_dir / "processador.py")
+    processador = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(processador)
+    consolidar_extratos = processador.consolidar_extratos
+    exportar_excel = processador.exportar_excel
+    NOMES_BANCOS = processador.NOMES_BANCOS
+    
+    # Importar Sankey
+    spec_sankey = importlib.util.spec_from_file_location("graficos_sankey", analise_dir / "graficos_sankey.py")
+    graficos_sankey = importlib.util.module_from_spec(spec_sankey)
+    spec_sankey.loader.exec_module(graficos_sankey)
+    montar_graficos_sankey = graficos_sankey.montar_graficos_sankey
+
+
+def _log_error(error_msg, exception=None):
+    """Helper para log de erros"""
+    import logging
+    logger = logging.getLogger(__name__)
+    if exception:
+        logger.error(f"ERRO: {error_msg}", exc_info=True)
+    else:
+        logger.error(f"ERRO: {error_msg}")
+
+
+def _get_config_base_dir(config_file_path):
+    """Determina o diretório base para arquivos de configuração"""
+    base_dir = Path(config_file_path).parent.parent.parent
+    
+    # Verificar se estamos no diretório correto (deve ter o arquivo config.json na raiz)
+    if not (base_dir / "config.json").exists():
+        # Se não encontrou, tentar o diretório pai do web_interface
+        base_dir = Path(__file__).parent.parent.parent
+    
+    return base_dir
+
+
+def _caminho_no_projeto(base_dir, arquivo_path):
+    """
+    Caminho de um arquivo do config.json dentro de base_dir. Caminhos
+    absolutos ou com '..' que saiam do projeto são recusados antes de
+    qualquer leitura
+    """
+    caminho = (base_dir / arquivo_path).resolve()
+    if not caminho.is_relative_to(base_dir.resolve()):
+        raise ValueError(f"Arquivo fora do diretório do projeto no config.json: {arquivo_path}")
+    return caminho
+
+
+def _get_default_categories():
+    """Retorna as categorias padrão para processamento"""
+    return {
+        "estornos": ["ESTORNO", "EST "],
+        "investimentos": ["OUROCAP", "B3", "ATIVO", "ACOES", "FUNDO", "CDB", "LCI", "TESOURO", "APLICACAO", "RESGATE"],
+        "rendimentos": ["CASHBACK", "REMUNERACAO", "RENDIMENTO", "JUROS", "DIVIDENDO", "JSCP", "SALARIO", "ORDEM BANC", "PROVENTO", "FOLHA"],
+        "pix_transferencia": ["PIX", "TRANSFERENCIA", "TED", "DOC"],
+        "cartao_credito": ["CARTAO CREDITO", "CREDITO CARTAO", "COMPRA CARTAO"],
+        "cartao_debito": ["CARTAO DEBITO", "DEBITO CARTAO", "DEBITO DE CARTAO"],
+        "debito_automatico": ["DEBITO AUTOMATICO"],
+        "tarifas": ["TARIFA", "TAXA", "IOF", "ANUIDADE", "MANUTENCAO"],
+        "saques": ["SAQUE", "RETIRADA"],
+        "depositos": ["DEPOSITO", "CREDITO EM CONTA"]
+    }
+
+
+def _get_default_processing_config():
+    """Retorna configurações padrão de processamento"""
+    return {
+        "skip_rows_c6": 8,
+        "skip_rows_bradesco": 1,
+        "skip_rows_bb": 0,
+        "skip_rows_itau": 10,
+        "janela_transferencias_dias": TRANSFERENCIAS_WINDOW_DAYS,
+        "tolerancia_valor": TOLERANCIA_VALOR
+    }
+
+
+def gerar_graficos_sankey(processamento, df):
+    """
+    Gera os gráficos Sankey da planilha consolidada e grava seus dados em
+    GraficoSankey (o navegador desenha a partir deles)
+    
+    Returns:
+        Quantidade de gráficos gravados
+    """
+    try:
+        graficos = montar_graficos_sankey(df)
+        
+        registros = []
+        if graficos['geral']:
+            registros.append(GraficoSankey(
+                processamento=processamento, chave='geral', titulo='Visão Geral',
+                dados=GraficoSankey.comprimir(graficos['geral'])
+            ))
+        for banco, especificacao in graficos['bancos'].items():
+            registros.append(GraficoSankey(
+                processamento=processamento, chave=slugify(banco)[:100] or f'banco-{len(registros)}',
+                titulo=str(banco)[:100], dados=GraficoSankey.comprimir(especificacao)
+            ))
+        for ordem, registro in enumerate(registros):
+            registro.ordem = ordem
+        
+        # Uma nova tentativa substitui os gráficos gravados pela anterior
+        GraficoSankey.objects.filter(processamento=processamento).delete()
+        GraficoSankey.objects.bulk_create(registros)
+        return len(registros)
+        
+    except MemoryError:
+        raise
+    except Exception as e:
+        _log_error("Erro ao gerar gráficos Sankey", e)
+        return 0
+
+
+def _criar_args_processamento(processamento, config):
+    """Criar objeto args para o processador"""
+    class Args:
+        def __init__(self):
+            # Determinar quais bancos usar com base na configuração
+            if processamento.arquivo_config:
+                # Se há arquivo config, usar todos os bancos que têm arquivos
+                self.all = True
+                self.c6 = 'c6_bank' in config.get("arquivos", {})
+                self.c6_cartao = 'c6_cartao' in config.get("arquivos", {})
+                self.bradesco = 'bradesco' in config.get("arquivos", {})
+                self.bb = 'bb' in config.get("arquivos", {})
+                self.bb_cartao = 'bb_cartao' in config.get("arquivos", {})
+                self.itau = 'itau' in config.get("arquivos", {})
+                self.b3 = 'b3' in config.get("arquivos", {})
+            else:
+                # Se é configuração manual, usar bancos selecionados
+                self.all = False
+                self.c6 = processamento.usar_c6
+                self.c6_cartao = processamento.usar_c6_cartao
+                self.bradesco = processamento.usar_bradesco
+                self.bb = processamento.usar_bb
+                self.bb_cartao = processamento.usar_bb_cartao
+                self.itau = processamento.usar_itau
+                self.b3 = False  # B3 não está disponível na interface manual
+            
+            self.output = None  # Usar output do config.json
+    
+    return Args()
+
+
+def _notificar(progresso, etapa, percentual, mensagem=''):
+    """Repassa a etapa atual para o callback de progresso, se houver"""
+    if progresso:
+        progresso(etapa, percentual, mensagem)
+
+
+def _progresso_core(progresso):
+    """
+    Traduz os eventos do processador do core em etapas da interface.
+    
+    A leitura dos extratos vai de 15% a 55%, dividida entre os bancos; as
+    demais etapas do core ocupam até 65%.
+    """
+    estado = {'bancos': 1, 'lidos': 0}
+    
+    def callback(evento, **dados):
+        if evento == 'bancos':
+            estado['bancos'] = max(len(dados['bancos']), 1)
+            nomes = ', '.join(NOMES_BANCOS.get(banco, banco) for banco in dados['bancos'])
+            _notificar(progresso, 'Lendo extratos', 15, nomes)
+        elif evento == 'banco':
+            estado['lidos'] += 1
+            nome = NOMES_BANCOS.get(dados['banco'], dados['banco'])
+            _notificar(progresso, 'Lendo extratos', 15 + 40 * estado['lidos'] // estado['bancos'],
+                       f"{nome}: {dados['linhas']} transações")
+        elif evento == 'consolidacao':
+            _notificar(progresso, 'Consolidando', 58, f"{dados['linhas']} transações no total")
+        elif evento == 'transferencias':
+            _notificar(progresso, 'Identificando transferências', 62,
+                       f"{dados['quantidade']} transferências entre contas próprias")
+        elif evento == 'saldos':
+            _notificar(progresso, 'Calculando saldos', 65)
+    
+    return callback
+
+
+def processar_extratos_web(processamento, progresso=None):
+    """
+    Processar extratos usando o processador do core
+    
+    Os processadores leem os uploads direto do storage (pelo caminho ou, em
+    storages sem caminho local, pelo arquivo aberto), sem cópias.
+    
+    progresso é um callback opcional chamado com (etapa, percentual, mensagem)
+    a cada etapa, inclusive as do processador do core.
+    """
+    try:
+        with ExitStack() as arquivos_abertos:
+            # Preparar configuração
+            _notificar(progresso, 'Preparando arquivos', 5)
+            config = preparar_configuracao(processamento, arquivos_abertos)
+            
+            if not config:
+                return False
+            
+            # Criar objeto args para o processador
+            args = _criar_args_processamento(processamento, config)
+            
+            # Executar processamento
+            df_consolidado = consolidar_extratos(args, config, progresso=_progresso_core(progresso))
+        
+        if df_consolidado.empty:
+            return False
+        
+        # A planilha é só para download; gráficos e tabela usam o DataFrame
+        # (com os valores arredondados como na planilha)
+        planilha = io.BytesIO()
+        if not exportar_excel(df_consolidado, planilha):
+            return False
+        _notificar(progresso, 'Planilha gerada', 68)
+        df_resultado = df_consolidado.round({coluna: 2 for coluna in COLUNAS_NUMERICAS})
+        
+        # Gerar gráficos Sankey
+        _notificar(progresso, 'Gerando gráficos', 70)
+        graficos = gerar_graficos_sankey(processamento, df_resultado)
+        _notificar(progresso, 'Gerando gráficos', 85, f"{graficos} gráfico(s) Sankey")
+        
+        # Salvar resultado
+        _notificar(progresso, 'Salvando resultado', 90)
+        conteudo = planilha.getvalue()
+        # Gravar só o campo do arquivo para não sobrescrever o status da fila
+        processamento.arquivo_resultado.save(
+            nome_arquivo_resultado(processamento),
+            ContentFile(conteudo),
+            save=False
+        )
+        processamento.hash_resultado = hashlib.sha256(conteudo).hexdigest()
+        processamento.save(update_fields=['arquivo_resultado', 'hash_resultado'])
+        
+        salvar_tabela_transacoes(processamento, df_resultado)
+        
+        # Limpar arquivos de upload após processamento bem-sucedido
+        limpar_arquivos_upload(processamento)
+        
+        return True
+    
+    except MemoryError:
+        # Limite de memória do processamento (ver tarefas._limites_de_recursos)
+        raise
+    except Exception as e:
+        _log_error("Erro ao processar extratos", e)
+        return False
+
+
+def nome_arquivo_resultado(processamento):
+    """Nome da planilha para download (no storage ela fica sob o hash do conteúdo)"""
+    nome_usuario = processamento.nome_usuario or 'usuario'
+    return f"controle_gastos_{nome_usuario}_{processamento.data_criacao.strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+def salvar_tabela_transacoes(processamento, df):
+    """Grava as transações consolidadas em Parquet (arquivo_tabela)"""
+    try:
+        conteudo = gerar_parquet(df)
+        nome_arquivo = Path(nome_arquivo_resultado(processamento)).with_suffix('.parquet').name
+        processamento.arquivo_tabela.save(nome_arquivo, ContentFile(conteudo), save=False)
+        processamento.save(update_fields=['arquivo_tabela'])
+        return True
+    except MemoryError:
+        raise
+    except Exception as e:
+        _log_error("Erro ao gerar tabela de transações", e)
+        return False
+
+
+def _hash_arquivo(arquivo):
+    """SHA-256 do conteúdo de um FileField ou caminho"""
+    sha = hashlib.sha256()
+    if isinstance(arquivo, (str, Path)):
+        with open(arquivo, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(bloco)
+    else:
+        with arquivo.open('rb'):
+            for bloco in arquivo.chunks():
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _hash_enviado(processamento, campo):
+    """Hash calculado no upload (ver uploads.py) ou, na falta dele, lido do storage"""
+    return processamento.hashes_upload.get(campo.name) or _hash_arquivo(campo)
+
+
+def _arquivos_do_config(processamento):
+    """Arquivos (banco, caminho) referenciados pelo config.json enviado"""
+    with open(processamento.arquivo_config.path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    base_dir = _get_config_base_dir(processamento.arquivo_config.path)
+    
+    arquivos = []
+    for banco_key, arquivos_banco in config.get("arquivos", {}).items():
+        if banco_key == "output":
+            continue
+        for arquivo_path in ([arquivos_banco] if isinstance(arquivos_banco, str) else arquivos_banco):
+            caminho = _caminho_no_projeto(base_dir, arquivo_path)
+            if caminho.is_file():
+                arquivos.append((banco_key, caminho))
+    return arquivos
+
+
+def chave_cache_resultado(processamento):
+    """
+    Chave do cache de resultados: HMAC (com a SECRET_KEY) dos hashes dos
+    arquivos enviados (ordenados), da configuração efetiva, dos bancos
+    selecionados e de VERSAO_PIPELINE. Nome e CPF entram só no HMAC, então a
+    chave não guarda dados pessoais.
+    
+    Returns:
+        Chave em hexadecimal ou '' se não foi possível calcular
+    """
+    try:
+        if processamento.arquivo_config:
+            arquivos = [(banco, _hash_arquivo(caminho)) for banco, caminho in _arquivos_do_config(processamento)]
+            arquivos.append(('config', _hash_enviado(processamento, processamento.arquivo_config)))
+        else:
+            campos = [('c6', processamento.arquivo_c6), ('c6_cartao', processamento.arquivo_c6_cartao),
+                      ('bradesco', processamento.arquivo_bradesco)]
+            arquivos = [(banco, _hash_enviado(processamento, campo)) for banco, campo in campos if campo]
+            # O nome enviado decide a ordem dos extratos do BB (saldo anterior)
+            arquivos += [(arquivo.banco, _hash_enviado(processamento, arquivo.arquivo), arquivo.nome_original)
+                         for arquivo in processamento.arquivos.all() if arquivo.arquivo]
+        
+        if not arquivos:
+            return ''
+        
+        dados = {
+            'versao': VERSAO_PIPELINE,
+            'arquivos': sorted(arquivos),
+            'bancos': [campo for campo in ('usar_c6', 'usar_c6_cartao', 'usar_bradesco', 'usar_bb',
+                                           'usar_bb_cartao', 'usar_itau') if getattr(processamento, campo)],
+            'saldos': [str(processamento.saldo_inicial_c6), str(processamento.saldo_inicial_bradesco),
+                       str(processamento.saldo_inicial_bb), str(processamento.saldo_inicial_itau)],
+            'usuario': [processamento.nome_usuario or '', processamento.cpf_usuario or ''],
+            'processamento': _get_default_processing_config(),
+            'categorias': _get_default_categories(),
+        }
+        return salted_hmac(
+            'extratos_app.chave_cache_resultado', json.dumps(dados, sort_keys=True), algorithm='sha256'
+        ).hexdigest()
+    
+    except Exception as e:
+        _log_error("Erro ao calcular chave do cache de resultados", e)
+        return ''
+
+
+def _compartilhar_arquivo(origem, destino):
+    """Aponta o campo destino para o mesmo arquivo (só mais uma referência, sem copiar bytes)"""
+    if origem.storage.referenciar(origem.name):
+        return origem.name
+    # Arquivo gravado antes do armazenamento por conteúdo: copiar
+    with origem.open('rb') as f:
+        destino.save(os.path.basename(origem.name), ContentFile(f.read()), save=False)
+    return destino.name
+
+
+def copiar_resultado(origem, destino):
+    """Copia planilha, tabela de transações e gráficos Sankey de um processamento concluído"""
+    destino.arquivo_resultado = _compartilhar_arquivo(origem.arquivo_resultado, destino.arquivo_resultado)
+    campos = ['arquivo_resultado', 'hash_resultado']
+    destino.hash_resultado = origem.hash_resultado
+    
+    if origem.arquivo_tabela:
+        destino.arquivo_tabela = _compartilhar_arquivo(origem.arquivo_tabela, destino.arquivo_tabela)
+        campos.append('arquivo_tabela')
+    destino.save(update_fields=campos)
+    
+    GraficoSankey.objects.filter(processamento=destino).delete()
+    GraficoSankey.objects.bulk_create(
+        GraficoSankey(processamento=destino, chave=grafico.chave, titulo=grafico.titulo,
+                      ordem=grafico.ordem, dados=grafico.dados)
+        for grafico in GraficoSankey.objects.filter(processamento=origem)
+    )
+
+
+def _processar_config_arquivo(processamento):
+    """Processar configuração a partir de arquivo JSON"""
+    try:
+        with open(processamento.arquivo_config.path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        # Os caminhos do JSON são relativos ao diretório raiz do projeto
+        base_dir = _get_config_base_dir(processamento.arquivo_config.path)
+        
+        arquivos_atualizados = {}
+        for banco_key, arquivos_banco in config.get("arquivos", {}).items():
+            if banco_key == "output":
+                # A planilha é gerada em memória
+                continue
+            
+            if isinstance(arquivos_banco, str):
+                arquivos_atualizados[banco_key] = str(_caminho_no_projeto(base_dir, arquivos_banco))
+            elif isinstance(arquivos_banco, list):
+                arquivos_atualizados[banco_key] = [str(_caminho_no_projeto(base_dir, arquivo_path))
+                                                   for arquivo_path in arquivos_banco]
+        
+        # Atualizar configuração com os caminhos completos
+        config["arquivos"] = arquivos_atualizados
+        
+        return config
+        
+    except Exception as e:
+        _log_error("Erro ao processar arquivo de configuração", e)
+        return None
+
+
+def _arquivo_armazenado(campo, arquivos_abertos):
+    """
+    Caminho do upload no storage ou, em storages sem caminho local, o próprio
+    arquivo aberto (fechado por arquivos_abertos ao fim do processamento)
+    """
+    try:
+        return campo.path
+    except NotImplementedError:
+        campo.open('rb')
+        arquivos_abertos.callback(campo.close)
+        return campo
+
+
+def _criar_config_manual(processamento, arquivos_abertos):
+    """Criar configuração manual baseada nos campos do formulário"""
+    config = {
+        "usuario": {
+            "nome": processamento.nome_usuario,
+            "cpf": processamento.cpf_usuario
+        },
+        "arquivos": {},
+        "saldos_iniciais": {
+            # Sempre incluir todos os bancos com valor 0 para evitar KeyError
+            "c6_bank": 0,
+            "bradesco": 0,
+            "bb": 0,
+            "itau": 0
+        },
+        "processamento": _get_default_processing_config(),
+        "categorias": _get_default_categories()
+    }
+    
+    # Configurar bancos selecionados
+    _configurar_bancos_selecionados(processamento, config, arquivos_abertos)
+    
+    return config
+
+
+def _configurar_bancos_selecionados(processamento, config, arquivos_abertos):
+    """Configurar arquivos e saldos dos bancos selecionados"""
+    def armazenado(campo):
+        return _arquivo_armazenado(campo, arquivos_abertos) if campo else ''
+    
+    def multiplos(banco):
+        caminhos = []
+        for arquivo in processamento.arquivos.filter(banco=banco):
+            caminho = armazenado(arquivo.arquivo)
+            # O nome em disco é o hash do conteúdo; o BB ordena pelo nome enviado
+            if arquivo.nome_original:
+                config.setdefault("nomes_originais", {})[caminho] = arquivo.nome_original
+            caminhos.append(caminho)
+        return caminhos
+    
+    if processamento.usar_c6:
+        config["arquivos"]["c6_bank"] = armazenado(processamento.arquivo_c6)
+        config["saldos_iniciais"]["c6_bank"] = float(processamento.saldo_inicial_c6)
+    
+    if processamento.usar_c6_cartao:
+        config["arquivos"]["c6_cartao"] = armazenado(processamento.arquivo_c6_cartao)
+    
+    if processamento.usar_bradesco:
+        config["arquivos"]["bradesco"] = armazenado(processamento.arquivo_bradesco)
+        config["saldos_iniciais"]["bradesco"] = float(processamento.saldo_inicial_bradesco)
+    
+    if processamento.usar_bb:
+        config["arquivos"]["bb"] = multiplos('bb')
+        config["saldos_iniciais"]["bb"] = float(processamento.saldo_inicial_bb)
+    
+    if processamento.usar_bb_cartao:
+        config["arquivos"]["bb_cartao"] = multiplos('bb_cartao')
+    
+    if processamento.usar_itau:
+        config["arquivos"]["itau"] = multiplos('itau')
+        config["saldos_iniciais"]["itau"] = float(processamento.saldo_inicial_itau)
+
+
+def preparar_configuracao(processamento, arquivos_abertos):
+    """Preparar configuração para processamento"""
+    
+    # Se há arquivo de configuração, usar ele
+    if processamento.arquivo_config:
+        return _processar_config_arquivo(processamento)
+    
+    # Configuração manual baseada nos campos do formulário
+    return _criar_config_manual(processamento, arquivos_abertos)
+
+
+def limpar_arquivos_upload(processamento):
+    """Libera os arquivos de upload depois que o processamento termina"""
+    try:
+        # Arquivo de configuração e arquivos únicos de bancos
+        liberados = []
+        for campo in ('arquivo_config', 'arquivo_c6', 'arquivo_c6_cartao', 'arquivo_bradesco'):
+            arquivo = getattr(processamento, campo)
+            if arquivo:
+                liberar_arquivo(arquivo)
+                setattr(processamento, campo, None)
+                liberados.append(campo)
+        if liberados:
+            processamento.save(update_fields=liberados)
+        
+        # Múltiplos arquivos
+        for arquivo in processamento.arquivos.exclude(arquivo='').only('id', 'arquivo'):
+            liberar_arquivo(arquivo.arquivo)
+        processamento.arquivos.update(arquivo='')
+        
+    except Exception as e:
+        # Se houver erro na limpeza, apenas registrar mas não falhar o processamento
+        _log_error("Erro ao limpar arquivos de upload", e)
+
+
+def _atualizar_bancos_do_config(processamento):
+    """Atualizar campos de bancos baseado no arquivo de configuração"""
+    if not processamento.arquivo_config:
+        return
+        
+    try:
+        with open(processamento.arquivo_config.path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        # Mapear bancos do JSON para campos do modelo
+        banco_mapping = {
+            'c6_bank': 'usar_c6',
+            'bradesco': 'usar_bradesco', 
+            'bb': 'usar_bb',
+            'bb_cartao': 'usar_bb_cartao',
+            'itau': 'usar_itau'
+        }
+        
+        # Obter lista de bancos configurados no JSON
+        arquivos = config.get('arquivos', {})
+        
+        # Atualizar campos do modelo baseado no que está configurado no JSON
+        for banco_json, campo_modelo in banco_mapping.items():
+            if banco_json in arquivos:
+                setattr(processamento, campo_modelo, True)
+        
+        # Atualizar dados do usuário se não estão definidos
+        usuario = config.get('usuario', {})
+        if usuario.get('nome') and not processamento.nome_usuario:
+            processamento.nome_usuario = usuario['nome']
+        if usuario.get('cpf') and not processamento.cpf_usuario:
+            processamento.cpf_usuario = usuario['cpf']
+            
+        # Atualizar saldos iniciais
+        saldos = config.get('saldos_iniciais', {})
+        saldo_mapping = {
+            'c6_bank': 'saldo_inicial_c6',
+            'bradesco': 'saldo_inicial_bradesco',
+            'bb': 'saldo_inicial_bb', 
+            'itau': 'saldo_inicial_itau'
+        }
+        
+        for banco_json, campo_saldo in saldo_mapping.items():
+            if banco_json in saldos:
+                setattr(processamento, campo_saldo, saldos[banco_json])
+        
+        # Salvar as alterações
+        processamento.save()
+        
+    except Exception as e:
+        _log_error("Erro ao atualizar bancos do arquivo de configuração", e)
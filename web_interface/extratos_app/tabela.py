@@ -0,0 +1,132 @@
+"""
+Tabela de transações do resultado em Parquet.
+
+A planilha consolidada é gravada também em Parquet ao lado de
+arquivo_resultado, para que a página de resultado consulte as transações
+(paginadas, ordenadas e filtradas) sem reabrir o .xlsx a cada visita.
+"""
+import io
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+TRANSACOES_POR_PAGINA = 50
+TRANSACOES_POR_PAGINA_MAXIMO = 500
+
+# Tabelas mantidas em memória por processo (as mais consultadas recentemente)
+TABELAS_EM_CACHE = 4
+
+# Colunas que o exportador do core grava como texto no formato brasileiro
+COLUNAS_NUMERICAS = ['Valor', 'Valor_Entrada', 'Valor_Saida', 'Saldo_no_Banco', 'Saldo_Real']
+COLUNAS_DATA = ['Data', 'Data_Contabil']
+
+
+def ler_planilha_resultado(arquivo_excel) -> pd.DataFrame:
+    """Lê a planilha gerada pelo core, convertendo valores e datas de volta"""
+    df = pd.read_excel(arquivo_excel)
+    for coluna in COLUNAS_NUMERICAS:
+        if coluna in df.columns and df[coluna].dtype == object:
+            df[coluna] = pd.to_numeric(df[coluna].astype(str).str.replace(',', '.', regex=False), errors='coerce')
+    for coluna in COLUNAS_DATA:
+        if coluna in df.columns:
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+    return df
+
+
+def gerar_parquet(df: pd.DataFrame) -> bytes:
+    """Serializa as transações em Parquet"""
+    df = df.copy()
+    # Colunas de texto podem misturar tipos (ex.: Agencia_Conta), o que o Arrow não aceita
+    for coluna in df.columns:
+        if df[coluna].dtype == object:
+            df[coluna] = df[coluna].astype('string')
+
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, compression='zstd')
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=TABELAS_EM_CACHE)
+def _ler_parquet(caminho: str, modificado_em: float) -> pd.DataFrame:
+    return pd.read_parquet(caminho)
+
+
+def carregar_tabela(caminho: str) -> pd.DataFrame:
+    """Lê a tabela Parquet, reaproveitando a leitura enquanto o arquivo não mudar"""
+    return _ler_parquet(caminho, os.path.getmtime(caminho))
+
+
+def _inteiro(valor, padrao, minimo=1, maximo=None):
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        return padrao
+    numero = max(numero, minimo)
+    return min(numero, maximo) if maximo else numero
+
+
+def consultar_transacoes(df: pd.DataFrame, parametros) -> dict:
+    """
+    Filtra, ordena e pagina as transações.
+
+    Parâmetros aceitos (todos opcionais): pagina, por_pagina, ordenar (nome da
+    coluna, com '-' na frente para ordem decrescente), data_inicio e data_fim
+    (AAAA-MM-DD), banco, categoria e opcoes=1 (inclui os bancos e categorias
+    disponíveis para os filtros).
+    """
+    mascara = pd.Series(True, index=df.index)
+
+    for parametro, operador in (('data_inicio', '__ge__'), ('data_fim', '__le__')):
+        valor = parametros.get(parametro)
+        if valor and 'Data' in df.columns:
+            data = pd.to_datetime(valor, errors='coerce')
+            if pd.notna(data):
+                mascara &= getattr(df['Data'], operador)(data)
+
+    for parametro, coluna in (('banco', 'Banco'), ('categoria', 'Categoria_Auto')):
+        valor = parametros.get(parametro)
+        if valor and coluna in df.columns:
+            mascara &= (df[coluna] == valor).fillna(False).astype(bool)
+
+    filtrado = df if mascara.all() else df[mascara]
+
+    ordenar = parametros.get('ordenar') or ''
+    coluna_ordem = ordenar.lstrip('-')
+    if coluna_ordem in df.columns:
+        filtrado = filtrado.sort_values(coluna_ordem, ascending=not ordenar.startswith('-'),
+                                        kind='stable', na_position='last')
+
+    por_pagina = _inteiro(parametros.get('por_pagina'), TRANSACOES_POR_PAGINA, maximo=TRANSACOES_POR_PAGINA_MAXIMO)
+    total = len(filtrado)
+    paginas = max((total + por_pagina - 1) // por_pagina, 1)
+    pagina = _inteiro(parametros.get('pagina'), 1, maximo=paginas)
+
+    inicio = (pagina - 1) * por_pagina
+    pagina_df = filtrado.iloc[inicio:inicio + por_pagina]
+
+    resposta = {
+        'pagina': pagina,
+        'paginas': paginas,
+        'por_pagina': por_pagina,
+        'total': total,
+        'colunas': list(df.columns),
+        'linhas': _linhas_json(pagina_df),
+    }
+
+    if parametros.get('opcoes'):
+        resposta['opcoes'] = {
+            'bancos': sorted(df['Banco'].dropna().unique().tolist()) if 'Banco' in df.columns else [],
+            'categorias': sorted(df['Categoria_Auto'].dropna().unique().tolist()) if 'Categoria_Auto' in df.columns else [],
+        }
+
+    return resposta
+
+
+def _linhas_json(df: pd.DataFrame) -> list:
+    """Converte as linhas em listas serializáveis (datas como AAAA-MM-DD, nulos como None)"""
+    df = df.copy()
+    for coluna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = df[coluna].dt.strftime('%Y-%m-%d')
+    return df.astype(object).where(df.notna(), None).values.tolist()
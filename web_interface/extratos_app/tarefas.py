@@ -0,0 +1,749 @@
+"""
+Fila de processamento dos extratos.
+
+A view só grava o ProcessamentoExtrato e o enfileira; o processamento roda
+fora da requisição e registra status, etapa e progresso na própria tabela,
+que é consultada pelo endpoint de status. O modo de execução vem de
+settings.PROCESSAMENTO_MODO:
+
+- 'thread': pool de threads dentro do processo web (padrão)
+- 'processo': pool de processos criados por um forkserver que já importou e
+  aqueceu o pipeline (ver pool_processos.py); o processamento não disputa o
+  GIL com as requisições
+- 'fila': só grava na tabela; processos `manage.py processar_fila`, em uma
+  ou mais máquinas, reivindicam os pendentes
+- 'sincrono': processa dentro da própria requisição (útil para depuração)
+
+Com PROCESSAMENTO_FILA_MAXIMA processamentos na fila ou em andamento, novos
+envios são recusados (verificar_admissao); nos modos 'processo' e 'fila' cada
+processamento roda com limites de memória e de CPU (_limites_de_recursos). Nos
+modos 'thread' (o padrão) e 'sincrono' não há limite por processamento.
+
+Cada processamento em andamento pertence a um worker, que renova
+ultimo_heartbeat enquanto ele roda. Se o heartbeat ficar mais de
+PROCESSAMENTO_VISIBILIDADE segundos sem ser renovado (worker morto), o
+processamento volta a poder ser reivindicado, até PROCESSAMENTO_MAX_TENTATIVAS
+tentativas.
+
+Antes de enfileirar, um envio idêntico a um já concluído (mesma chave_cache)
+reaproveita o resultado dele sem reprocessar.
+
+Processamentos vencidos (data_expiracao, renovada na conclusão) são
+removidos com seus arquivos por limpar_expirados, chamada pelas threads do
+pool e pelos workers a cada PROCESSAMENTO_LIMPEZA_INTERVALO segundos ou
+pelo comando `manage.py limpar_expirados`.
+"""
+import os
+import math
+import time
+import signal
+import socket
+import logging
+import threading
+import importlib
+import multiprocessing
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from .armazenamento import PASTA_BLOBS
+from .models import ProcessamentoExtrato, ArquivoExtrato, EventoProcessamento, expiracao_padrao
+from .processamento import processar_extratos_web, limpar_arquivos_upload, chave_cache_resultado, copiar_resultado
+
+try:
+    import resource
+except ImportError:
+    # Windows: sem limites de memória e de CPU por processamento
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MENSAGEM_ERRO_PADRAO = 'Erro ao processar os extratos. Verifique os arquivos e tente novamente.'
+MENSAGEM_ERRO_TENTATIVAS = 'O processamento foi interrompido várias vezes. Tente enviar os arquivos novamente.'
+MENSAGEM_ERRO_LIMITE = ('O processamento excedeu o limite de memória ou de tempo. '
+                        'Tente enviar um período menor de cada vez.')
+
+# Candidatos lidos por rodada no fallback sem SKIP LOCKED
+CANDIDATOS_POR_RODADA = 10
+
+# Processamentos expirados removidos por lote
+EXPIRADOS_POR_LOTE = 200
+
+CAMPOS_ARQUIVO = ['arquivo_c6', 'arquivo_c6_cartao', 'arquivo_bradesco', 'arquivo_config',
+                  'arquivo_resultado', 'arquivo_tabela']
+# Colunas grandes que a limpeza e o encerramento de esgotados não usam
+CAMPOS_DISPENSAVEIS = ['user_agent', 'cpf_usuario_encrypted', 'hashes_upload']
+
+# Importado pelo forkserver e pelos processos do pool no modo 'processo'
+MODULO_POOL_PROCESSOS = 'extratos_app.pool_processos'
+
+# Janela (segundos) das médias de espera e de duração em situacao_fila
+JANELA_METRICAS = 900
+# Retry-After dos envios recusados: a duração média recente, dentro destes limites
+RETRY_AFTER_PADRAO = 30
+RETRY_AFTER_MINIMO = 5
+RETRY_AFTER_MAXIMO = 300
+
+_executor = None
+_executor_lock = threading.Lock()
+_ultima_limpeza = None
+_limpeza_lock = threading.Lock()
+
+
+def _configuracao(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def identificador_worker(sufixo=None):
+    """Identifica o worker como host:pid[:sufixo]"""
+    identificador = f"{socket.gethostname()}:{os.getpid()}"
+    identificador = f"{identificador}:{sufixo}" if sufixo else identificador
+    return identificador[:100]
+
+
+@contextmanager
+def _pythonpath_com_projeto():
+    """PYTHONPATH com BASE_DIR enquanto o bloco roda; o valor anterior volta ao sair"""
+    anterior = os.environ.get('PYTHONPATH')
+    caminhos = [caminho for caminho in (anterior or '').split(os.pathsep) if caminho]
+    if str(settings.BASE_DIR) not in caminhos:
+        os.environ['PYTHONPATH'] = os.pathsep.join([str(settings.BASE_DIR)] + caminhos)
+    try:
+        yield
+    finally:
+        if anterior is None:
+            os.environ.pop('PYTHONPATH', None)
+        else:
+            os.environ['PYTHONPATH'] = anterior
+
+
+def _criar_pool_processos():
+    """
+    Pool de processos que nascem de um fork do forkserver, que importa
+    pool_processos (Django configurado e pipeline aquecido) uma única vez.
+    Sem forkserver (Windows), cada processo é iniciado do zero e importa
+    pool_processos pelo initializer.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context('forkserver')
+        contexto.set_forkserver_preload([MODULO_POOL_PROCESSOS])
+        # O forkserver é um interpretador novo que não recebe o sys.path deste
+        # processo; sem achar o projeto, o preload falharia em silêncio. Ele é
+        # iniciado já aqui, com o PYTHONPATH só durante a partida, para não
+        # alterar o ambiente do processo web (um pool recriado passa por aqui)
+        from multiprocessing import forkserver
+        with _pythonpath_com_projeto():
+            forkserver.ensure_running()
+    else:
+        contexto = multiprocessing.get_context('spawn')
+
+    # Referência por nome: importar o módulo aqui aqueceria o processo web de novo
+    return ProcessPoolExecutor(
+        max_workers=_configuracao('PROCESSAMENTO_THREADS', 2),
+        mp_context=contexto,
+        initializer=partial(importlib.import_module, MODULO_POOL_PROCESSOS)
+    )
+
+
+def _obter_executor():
+    """Cria o pool (de threads ou, no modo 'processo', de processos) na primeira utilização"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if _configuracao('PROCESSAMENTO_MODO', 'thread') == 'processo':
+                _executor = _criar_pool_processos()
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_configuracao('PROCESSAMENTO_THREADS', 2),
+                    thread_name_prefix='processamento'
+                )
+    return _executor
+
+
+def _descartar_executor(executor):
+    """Esquece um pool quebrado; o próximo envio cria outro"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _submeter(processamento_id):
+    """Envia o processamento ao pool, recriando-o se um processo dele tiver morrido"""
+    executor = _obter_executor()
+    try:
+        futuro = executor.submit(_executar_em_thread, processamento_id)
+    except BrokenProcessPool:
+        _descartar_executor(executor)
+        executor = _obter_executor()
+        futuro = executor.submit(_executar_em_thread, processamento_id)
+
+    if isinstance(executor, ProcessPoolExecutor):
+        futuro.add_done_callback(partial(_verificar_pool, processamento_id, executor))
+
+
+def _verificar_pool(processamento_id, executor, futuro):
+    """
+    Um processo do pool morto (ex.: pelo sistema, sem memória) quebra o pool
+    inteiro e os processamentos dele: os que estavam em andamento contam a
+    tentativa e voltam para a fila, e todos são reenviados a um pool novo
+    """
+    if futuro.cancelled() or not isinstance(futuro.exception(), BrokenProcessPool):
+        return
+
+    logger.warning(f"Pool de processos quebrado durante {processamento_id}")
+    _descartar_executor(executor)
+    try:
+        processamento = ProcessamentoExtrato.objects.defer(*CAMPOS_DISPENSAVEIS).get(pk=processamento_id)
+        if processamento.status == ProcessamentoExtrato.STATUS_PROCESSANDO:
+            _devolver_para_fila(processamento, processamento.worker)
+            processamento.refresh_from_db(fields=['status'])
+        if processamento.status == ProcessamentoExtrato.STATUS_PENDENTE:
+            _submeter(processamento_id)
+    except Exception as e:
+        logger.error(f"Erro: {e}")
+    finally:
+        connection.close()
+
+
+def iniciar_pool_processos():
+    """
+    No modo 'processo', sobe o forkserver e os processos do pool antes do
+    primeiro envio (chamada pelo gunicorn.conf.py em cada worker)
+    """
+    if _configuracao('PROCESSAMENTO_MODO', 'thread') != 'processo':
+        return
+
+    executor = _obter_executor()
+    for _ in range(_configuracao('PROCESSAMENTO_THREADS', 2)):
+        executor.submit(os.getpid)
+
+
+def reaproveitar_resultado(processamento):
+    """
+    Conclui o processamento com uma cópia do resultado de um envio idêntico.
+    
+    Returns:
+        True se havia um resultado para reaproveitar
+    """
+    if not processamento.chave_cache:
+        return False
+    
+    origem = ProcessamentoExtrato.objects.filter(
+        chave_cache=processamento.chave_cache, status=ProcessamentoExtrato.STATUS_CONCLUIDO
+    ).exclude(pk=processamento.pk).exclude(arquivo_resultado='').order_by('-data_fim').first()
+    if origem is None:
+        return False
+    
+    try:
+        copiar_resultado(origem, processamento)
+    except Exception as e:
+        # Arquivos do resultado anterior removidos, por exemplo: processar normalmente
+        logger.warning(f"Resultado {origem.id} não pôde ser reaproveitado: {e}")
+        return False
+    
+    agora = timezone.now()
+    campos = {
+        'status': ProcessamentoExtrato.STATUS_CONCLUIDO,
+        'processado': True,
+        'etapa': 'Concluído',
+        'progresso': 100,
+        'data_inicio': agora,
+        'data_fim': agora,
+        'data_expiracao': expiracao_padrao(),
+    }
+    ProcessamentoExtrato.objects.filter(pk=processamento.pk).update(**campos)
+    for campo, valor in campos.items():
+        setattr(processamento, campo, valor)
+    
+    registrar_evento(processamento, 'Concluído', 100, 'Resultado reaproveitado de um envio idêntico')
+    limpar_arquivos_upload(processamento)
+    logger.info(f"♻️ Processamento {processamento.id} reaproveitou o resultado de {origem.id}")
+    return True
+
+
+def enfileirar_processamento(processamento):
+    """
+    Coloca o processamento na fila e dispara a execução conforme
+    PROCESSAMENTO_MODO, a menos que o resultado de um envio idêntico possa
+    ser reaproveitado
+    """
+    processamento.chave_cache = chave_cache_resultado(processamento)
+    processamento.save(update_fields=['chave_cache'])
+    if reaproveitar_resultado(processamento):
+        return
+    
+    modo = _configuracao('PROCESSAMENTO_MODO', 'thread')
+    logger.info(f"📥 Processamento {processamento.id} enfileirado (modo {modo})")
+
+    if modo == 'fila':
+        return
+
+    if modo == 'sincrono':
+        _executar_pendente(processamento.id, identificador_worker('sincrono'))
+        return
+
+    # Só dispara depois do commit para a thread enxergar o registro e os arquivos
+    transaction.on_commit(lambda: _submeter(processamento.id))
+
+
+def _ativos(agora):
+    """Pendentes e em andamento com heartbeat em dia, por status"""
+    limite = agora - timedelta(seconds=_configuracao('PROCESSAMENTO_VISIBILIDADE', 300))
+    ativos = ProcessamentoExtrato.objects.filter(
+        Q(status=ProcessamentoExtrato.STATUS_PENDENTE)
+        | Q(status=ProcessamentoExtrato.STATUS_PROCESSANDO, ultimo_heartbeat__gte=limite)
+    )
+    return dict(ativos.order_by().values_list('status').annotate(Count('pk')))
+
+
+def _medias_recentes(agora):
+    """Espera na fila e duração médias (timedelta ou None) dos iniciados na janela"""
+    return ProcessamentoExtrato.objects.filter(
+        data_inicio__gte=agora - timedelta(seconds=JANELA_METRICAS)
+    ).aggregate(
+        espera=Avg(ExpressionWrapper(F('data_inicio') - F('data_criacao'), output_field=DurationField())),
+        duracao=Avg(ExpressionWrapper(F('data_fim') - F('data_inicio'), output_field=DurationField())),
+    )
+
+
+def _segundos(duracao):
+    return round(duracao.total_seconds(), 1) if duracao is not None else None
+
+
+def situacao_fila():
+    """
+    Profundidade da fila e tempos de espera, de todos os processos que usam
+    o banco (ver views.metricas_fila)
+    """
+    agora = timezone.now()
+    ativos = _ativos(agora)
+    medias = _medias_recentes(agora)
+    mais_antigo = ProcessamentoExtrato.objects.filter(
+        status=ProcessamentoExtrato.STATUS_PENDENTE
+    ).order_by('data_criacao').values_list('data_criacao', flat=True).first()
+
+    return {
+        'pendentes': ativos.get(ProcessamentoExtrato.STATUS_PENDENTE, 0),
+        'em_andamento': ativos.get(ProcessamentoExtrato.STATUS_PROCESSANDO, 0),
+        'fila_maxima': _configuracao('PROCESSAMENTO_FILA_MAXIMA', 20),
+        'espera_atual_segundos': _segundos(agora - mais_antigo) if mais_antigo else 0,
+        'espera_media_segundos': _segundos(medias['espera']),
+        'duracao_media_segundos': _segundos(medias['duracao']),
+    }
+
+
+def verificar_admissao():
+    """
+    Controle de admissão: com PROCESSAMENTO_FILA_MAXIMA processamentos na fila
+    ou em andamento, somando todos os processos e máquinas, o envio é recusado
+    (ver middleware/admissao_middleware.py).
+
+    Returns:
+        None se o envio pode entrar; senão, os segundos para o Retry-After
+    """
+    maximo = _configuracao('PROCESSAMENTO_FILA_MAXIMA', 20)
+    if not maximo:
+        return None
+
+    agora = timezone.now()
+    ativos = sum(_ativos(agora).values())
+    if ativos < maximo:
+        return None
+
+    # Em média uma vaga abre a cada duração de processamento
+    duracao = _medias_recentes(agora)['duracao']
+    espera = duracao.total_seconds() if duracao is not None else RETRY_AFTER_PADRAO
+    espera = min(max(math.ceil(espera), RETRY_AFTER_MINIMO), RETRY_AFTER_MAXIMO)
+    logger.warning(f"🚦 Fila cheia ({ativos}/{maximo}), envio recusado (Retry-After {espera}s)")
+    return espera
+
+
+def _reivindicaveis(agora):
+    """Pendentes e em andamento com heartbeat vencido que ainda têm tentativas"""
+    limite = agora - timedelta(seconds=_configuracao('PROCESSAMENTO_VISIBILIDADE', 300))
+    return ProcessamentoExtrato.objects.filter(
+        Q(status=ProcessamentoExtrato.STATUS_PENDENTE)
+        | Q(status=ProcessamentoExtrato.STATUS_PROCESSANDO, ultimo_heartbeat__lt=limite),
+        tentativas__lt=_configuracao('PROCESSAMENTO_MAX_TENTATIVAS', 3)
+    )
+
+
+def reivindicar_processamento(worker, processamento_id=None):
+    """
+    Reivindica o processamento mais antigo disponível para o worker.
+
+    No PostgreSQL usa SELECT ... FOR UPDATE SKIP LOCKED, então vários workers
+    pegam linhas diferentes sem esperar uns pelos outros. Nos bancos sem
+    SKIP LOCKED (SQLite) usa um UPDATE condicionado ao estado lido, que só
+    altera a linha se nenhum outro worker tiver chegado antes.
+
+    Args:
+        worker: Identificador do worker (ver identificador_worker)
+        processamento_id: Reivindicar apenas este processamento (opcional)
+
+    Returns:
+        ProcessamentoExtrato reivindicado ou None se não houver nenhum disponível
+    """
+    agora = timezone.now()
+    candidatos = _reivindicaveis(agora).order_by('data_criacao')
+    if processamento_id:
+        candidatos = candidatos.filter(pk=processamento_id)
+
+    campos = {
+        'status': ProcessamentoExtrato.STATUS_PROCESSANDO,
+        'worker': worker,
+        'ultimo_heartbeat': agora,
+        'tentativas': F('tentativas') + 1,
+        'etapa': 'Iniciando',
+        'progresso': 0,
+        'data_inicio': agora,
+    }
+
+    reivindicado = None
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pk = candidatos.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+            if pk is not None:
+                ProcessamentoExtrato.objects.filter(pk=pk).update(**campos)
+                reivindicado = pk
+    else:
+        estados = candidatos.values('pk', 'status', 'tentativas', 'ultimo_heartbeat')[:CANDIDATOS_POR_RODADA]
+        for estado in estados:
+            # tentativas muda a cada reivindicação e ultimo_heartbeat a cada renovação
+            if ProcessamentoExtrato.objects.filter(**estado).update(**campos):
+                reivindicado = estado['pk']
+                break
+
+    if reivindicado is None:
+        return None
+
+    processamento = ProcessamentoExtrato.objects.get(pk=reivindicado)
+    registrar_evento(processamento, 'Iniciando', 0, f"Tentativa {processamento.tentativas}")
+    logger.info(f"⚙️ {worker} reivindicou {processamento.id} (tentativa {processamento.tentativas})")
+    return processamento
+
+
+def encerrar_esgotados():
+    """
+    Marca como erro os processamentos abandonados que já usaram todas as tentativas.
+
+    Returns:
+        Quantidade de processamentos encerrados
+    """
+    limite = timezone.now() - timedelta(seconds=_configuracao('PROCESSAMENTO_VISIBILIDADE', 300))
+    esgotados = ProcessamentoExtrato.objects.filter(
+        status=ProcessamentoExtrato.STATUS_PROCESSANDO,
+        ultimo_heartbeat__lt=limite,
+        tentativas__gte=_configuracao('PROCESSAMENTO_MAX_TENTATIVAS', 3)
+    ).defer(*CAMPOS_DISPENSAVEIS)
+
+    encerrados = 0
+    for processamento in esgotados:
+        if _finalizar_com_erro(processamento, processamento.worker, MENSAGEM_ERRO_TENTATIVAS):
+            logger.warning(f"Processamento {processamento.id} esgotou as tentativas")
+            encerrados += 1
+    return encerrados
+
+
+def _do_worker(processamento, worker):
+    """Filtro que só casa enquanto o worker ainda é o dono do processamento"""
+    return ProcessamentoExtrato.objects.filter(
+        pk=processamento.pk, worker=worker, status=ProcessamentoExtrato.STATUS_PROCESSANDO
+    )
+
+
+def registrar_evento(processamento, etapa, progresso, mensagem=''):
+    """Grava um evento para a página de acompanhamento (ver views.eventos_processamento)"""
+    EventoProcessamento.objects.create(
+        processamento_id=processamento.pk, etapa=etapa, progresso=progresso, mensagem=mensagem[:255]
+    )
+
+
+def atualizar_progresso(processamento, worker, etapa, progresso, mensagem=''):
+    """Registra a etapa atual (e renova o heartbeat) sem tocar nos demais campos"""
+    processamento.etapa = etapa
+    processamento.progresso = progresso
+    if _do_worker(processamento, worker).update(etapa=etapa, progresso=progresso, ultimo_heartbeat=timezone.now()):
+        registrar_evento(processamento, etapa, progresso, mensagem)
+
+
+def _renovar_heartbeat(processamento, worker, parar):
+    intervalo = _configuracao('PROCESSAMENTO_HEARTBEAT', 30)
+    try:
+        while not parar.wait(intervalo):
+            if not _do_worker(processamento, worker).update(ultimo_heartbeat=timezone.now()):
+                logger.warning(f"{worker} perdeu o processamento {processamento.id}")
+                return
+    except Exception as e:
+        logger.error(f"Erro: {e}")
+    finally:
+        connection.close()
+
+
+@contextmanager
+def _heartbeat(processamento, worker):
+    """Renova o heartbeat em segundo plano enquanto o bloco executa"""
+    parar = threading.Event()
+    thread = threading.Thread(
+        target=_renovar_heartbeat, args=(processamento, worker, parar),
+        name=f'heartbeat-{processamento.pk}', daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        parar.set()
+        thread.join()
+
+
+def _memoria_em_uso():
+    """Espaço de endereçamento do processo, em bytes (Linux)"""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class CpuEsgotada(BaseException):
+    """
+    Tempo de CPU do processamento esgotado. Deriva de BaseException, como
+    KeyboardInterrupt: o SIGXCPU pode chegar em qualquer ponto do pipeline e
+    nenhum except Exception dele deve transformar o estouro num resultado
+    """
+
+
+def _cpu_esgotada(signum, frame):
+    raise CpuEsgotada('Tempo de CPU do processamento esgotado')
+
+
+@contextmanager
+def _limites_de_recursos():
+    """
+    Limita a memória (RLIMIT_AS) e o tempo de CPU (RLIMIT_CPU) do processo
+    enquanto o bloco executa, a partir do que ele já usa. Só nos modos
+    'processo' e 'fila', em que cada processamento roda sozinho na thread
+    principal de um processo próprio. Nos modos 'thread' e 'sincrono' o
+    limite valeria para o servidor inteiro e o processamento roda sem ele.
+
+    Só os limites soft mudam (o hard não voltaria a subir) e são restaurados
+    ao final. Estourar a memória gera MemoryError, que os tratadores do
+    pipeline repassam; a CPU, CpuEsgotada (pelo SIGXCPU).
+    """
+    if (resource is None or _configuracao('PROCESSAMENTO_MODO', 'thread') not in ('processo', 'fila')
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    limites = []
+    memoria = _configuracao('PROCESSAMENTO_MEMORIA_MAXIMA', 1024)
+    if memoria and os.path.exists('/proc/self/statm'):
+        limites.append((resource.RLIMIT_AS, _memoria_em_uso() + memoria * 1024 * 1024))
+    cpu = _configuracao('PROCESSAMENTO_CPU_MAXIMO', 300)
+    if cpu:
+        uso = resource.getrusage(resource.RUSAGE_SELF)
+        limites.append((resource.RLIMIT_CPU, math.ceil(uso.ru_utime + uso.ru_stime) + cpu))
+        tratador_anterior = signal.signal(signal.SIGXCPU, _cpu_esgotada)
+
+    anteriores = []
+    try:
+        for recurso, valor in limites:
+            soft, hard = resource.getrlimit(recurso)
+            anteriores.append((recurso, soft, hard))
+            # Um limite já menor, definido por quem iniciou o processo, prevalece
+            resource.setrlimit(recurso, (valor if soft == resource.RLIM_INFINITY else min(valor, soft), hard))
+        yield
+    finally:
+        for recurso, soft, hard in anteriores:
+            resource.setrlimit(recurso, (soft, hard))
+        if cpu:
+            signal.signal(signal.SIGXCPU, tratador_anterior)
+
+
+def _finalizar_com_erro(processamento, worker, mensagem):
+    encerrado = _do_worker(processamento, worker).update(
+        status=ProcessamentoExtrato.STATUS_ERRO,
+        mensagem_erro=mensagem,
+        data_fim=timezone.now()
+    )
+    if encerrado:
+        registrar_evento(processamento, 'Erro', processamento.progresso, mensagem)
+        limpar_arquivos_upload(processamento)
+    return bool(encerrado)
+
+
+def _devolver_para_fila(processamento, worker):
+    """Libera o processamento para outra tentativa ou encerra se as tentativas acabaram"""
+    if processamento.tentativas >= _configuracao('PROCESSAMENTO_MAX_TENTATIVAS', 3):
+        _finalizar_com_erro(processamento, worker, MENSAGEM_ERRO_TENTATIVAS)
+        return
+
+    _do_worker(processamento, worker).update(
+        status=ProcessamentoExtrato.STATUS_PENDENTE,
+        worker='',
+        ultimo_heartbeat=None
+    )
+    logger.warning(f"Processamento {processamento.id} devolvido para a fila")
+
+
+def executar_processamento(processamento, worker):
+    """
+    Executa um processamento já reivindicado pelo worker e registra o resultado.
+
+    Falhas do pipeline (arquivo inválido, por exemplo) e estouros dos limites
+    de memória e de CPU encerram o processamento com erro; exceções fora dele
+    devolvem o processamento para a fila.
+
+    Returns:
+        True se o processamento foi concluído com sucesso
+    """
+    try:
+        with _heartbeat(processamento, worker), _limites_de_recursos():
+            sucesso = processar_extratos_web(
+                processamento,
+                progresso=lambda etapa, percentual, mensagem: atualizar_progresso(
+                    processamento, worker, etapa, percentual, mensagem
+                )
+            )
+    except (MemoryError, CpuEsgotada) as e:
+        # Tentar de novo estouraria o mesmo limite
+        logger.error(f"❌ Processamento {processamento.id} excedeu os limites: {type(e).__name__} {e}")
+        _finalizar_com_erro(processamento, worker, MENSAGEM_ERRO_LIMITE)
+        return False
+    except Exception as e:
+        logger.error(f"Erro: {e}", exc_info=True)
+        _devolver_para_fila(processamento, worker)
+        return False
+
+    if not sucesso:
+        logger.error(f"❌ Processamento {processamento.id} falhou")
+        _finalizar_com_erro(processamento, worker, MENSAGEM_ERRO_PADRAO)
+        return False
+
+    concluido = _do_worker(processamento, worker).update(
+        status=ProcessamentoExtrato.STATUS_CONCLUIDO,
+        processado=True,
+        etapa='Concluído',
+        progresso=100,
+        data_fim=timezone.now(),
+        data_expiracao=expiracao_padrao()
+    )
+    if not concluido:
+        # Outro worker assumiu depois que o heartbeat venceu; o resultado dele prevalece
+        logger.warning(f"{worker} terminou {processamento.id} mas já não era o dono")
+        return False
+
+    registrar_evento(processamento, 'Concluído', 100)
+    logger.info(f"✅ Processamento {processamento.id} concluído")
+    return True
+
+
+def _executar_pendente(processamento_id, worker):
+    processamento = reivindicar_processamento(worker, processamento_id)
+    if processamento is None:
+        logger.warning(f"Processamento {processamento_id} não está disponível, ignorando")
+        return False
+    return executar_processamento(processamento, worker)
+
+
+def _executar_em_thread(processamento_id):
+    """Ponto de entrada das threads (ou processos) do pool; cada uma usa a própria conexão"""
+    close_old_connections()
+    try:
+        _executar_pendente(processamento_id, identificador_worker(threading.current_thread().name))
+        limpar_expirados_periodicamente()
+    except Exception as e:
+        logger.error(f"Erro: {e}", exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def limpar_expirados(agora=None, lote=EXPIRADOS_POR_LOTE):
+    """
+    Remove os processamentos com data_expiracao vencida, em lotes, junto com
+    os arquivos enviados e gerados. Processamentos na fila ou em andamento
+    ficam para a próxima rodada.
+
+    Returns:
+        Quantidade de processamentos removidos
+    """
+    agora = agora or timezone.now()
+    ativos = [ProcessamentoExtrato.STATUS_PENDENTE, ProcessamentoExtrato.STATUS_PROCESSANDO]
+    expirados = ProcessamentoExtrato.objects.filter(data_expiracao__lte=agora).exclude(status__in=ativos)
+
+    removidos = 0
+    ignorados = set()
+    while True:
+        ids = list(expirados.exclude(pk__in=ignorados).values_list('pk', flat=True)[:lote])
+        if not ids:
+            break
+
+        # Cada arquivo sai pelo storage do próprio campo (arquivo_config não é por conteúdo)
+        arquivos = {}
+        for pk, *nomes in ProcessamentoExtrato.objects.filter(pk__in=ids).values_list('pk', *CAMPOS_ARQUIVO):
+            arquivos[pk] = [(ProcessamentoExtrato._meta.get_field(campo).storage, nome)
+                            for campo, nome in zip(CAMPOS_ARQUIVO, nomes) if nome]
+        for pk, nome in ArquivoExtrato.objects.filter(processamento_id__in=ids).values_list('processamento_id', 'arquivo'):
+            if nome:
+                arquivos.setdefault(pk, []).append((ArquivoExtrato._meta.get_field('arquivo').storage, nome))
+
+        # O status é conferido de novo no DELETE: o que voltou para a fila depois
+        # da consulta acima fica, com os arquivos, e sai das próximas rodadas.
+        # Queryset.delete não chama ProcessamentoExtrato.delete; os arquivos saem abaixo
+        ProcessamentoExtrato.objects.filter(pk__in=ids).exclude(status__in=ativos).delete()
+        restantes = set(ProcessamentoExtrato.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        ignorados |= restantes
+
+        _remover_do_storage([arquivo for pk in ids if pk not in restantes for arquivo in arquivos.get(pk, [])])
+        removidos += len(ids) - len(restantes)
+
+    if removidos:
+        logger.info(f"🧹 {removidos} processamento(s) expirado(s) removido(s)")
+    return removidos
+
+
+def _remover_do_storage(arquivos):
+    """
+    Libera os arquivos e apaga as pastas por processamento (nomes antigos)
+    que ficarem vazias.
+
+    Args:
+        arquivos: pares (storage, nome), como montados em limpar_expirados
+    """
+    pastas = set()
+    for armazenamento, nome in arquivos:
+        try:
+            armazenamento.delete(nome)
+            if not nome.startswith(f"{PASTA_BLOBS}/"):
+                pastas.add((armazenamento, os.path.dirname(nome)))
+        except Exception as e:
+            logger.error(f"Erro: {e}")
+
+    for armazenamento, pasta in pastas:
+        try:
+            os.rmdir(armazenamento.path(pasta))
+        except (OSError, NotImplementedError):
+            # Pasta com outros arquivos ou storage sem diretórios locais
+            pass
+
+
+def limpar_expirados_periodicamente():
+    """Chama limpar_expirados no máximo uma vez a cada PROCESSAMENTO_LIMPEZA_INTERVALO segundos"""
+    global _ultima_limpeza
+    with _limpeza_lock:
+        agora = time.monotonic()
+        if _ultima_limpeza is not None and agora - _ultima_limpeza < _configuracao('PROCESSAMENTO_LIMPEZA_INTERVALO', 600):
+            return 0
+        _ultima_limpeza = agora
+
+    try:
+        return limpar_expirados()
+    except Exception as e:
+        logger.error(f"Erro: {e}")
+        return 0
@@ -0,0 +1,83 @@
+import shutil
+import tempfile
+import threading
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from extratos_app.armazenamento import ArmazenamentoConteudo, armazenamento_conteudo
+from extratos_app.models import BlobArmazenado
+
+THREADS = 8
+
+
+class ArmazenamentoConteudoTests(TransactionTestCase):
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, ignore_errors=True)
+        self.armazenamento = ArmazenamentoConteudo(location=self.pasta)
+
+    def _salvar(self):
+        return self.armazenamento.save('extrato.csv', ContentFile(b'Data;Valor\n01/01/2025;10,00\n'))
+
+    def test_arquivo_sai_do_disco_com_a_ultima_referencia(self):
+        nome = self._salvar()
+        self.assertEqual(self._salvar(), nome)
+        self.assertEqual(BlobArmazenado.objects.get(nome=nome).referencias, 2)
+
+        self.armazenamento.delete(nome)
+        self.assertTrue(self.armazenamento.exists(nome))
+        self.assertEqual(BlobArmazenado.objects.get(nome=nome).referencias, 1)
+
+        self.armazenamento.delete(nome)
+        self.assertFalse(self.armazenamento.exists(nome))
+        self.assertFalse(BlobArmazenado.objects.filter(nome=nome).exists())
+
+    def test_liberacoes_simultaneas_apagam_o_arquivo(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # As conexões ao SQLite em memória compartilham o cache e respondem
+            # "table is locked" em vez de esperar a transação da outra thread
+            self.skipTest('requer um banco em arquivo ou PostgreSQL')
+        for _ in range(THREADS):
+            nome = self._salvar()
+        inicio = threading.Barrier(THREADS)
+        erros = []
+
+        def liberar():
+            try:
+                inicio.wait()
+                self.armazenamento.delete(nome)
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=liberar) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        self.assertFalse(BlobArmazenado.objects.filter(nome=nome).exists())
+        self.assertFalse(self.armazenamento.exists(nome))
+
+
+class RegistroStorageTests(TransactionTestCase):
+    def test_configurado_em_storages(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'extratos': {
+                'BACKEND': 'extratos_app.armazenamento.ArmazenamentoConteudo',
+                'OPTIONS': {'location': pasta},
+            },
+        }
+
+        with override_settings(STORAGES=storages):
+            armazenamento = armazenamento_conteudo()
+
+        self.assertIsInstance(armazenamento, ArmazenamentoConteudo)
+        self.assertEqual(armazenamento.location, pasta)
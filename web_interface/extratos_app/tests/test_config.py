@@ -0,0 +1,47 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from extratos_app.models import ProcessamentoExtrato
+from extratos_app.processamento import _arquivos_do_config, _processar_config_arquivo
+
+
+class CaminhosDoConfigTests(SimpleTestCase):
+    def setUp(self):
+        temporario = tempfile.TemporaryDirectory()
+        self.addCleanup(temporario.cleanup)
+        raiz = Path(temporario.name)
+        # config.json na raiz do projeto e um arquivo fora dele
+        self.projeto = raiz / 'projeto'
+        (self.projeto / 'extratos').mkdir(parents=True)
+        (self.projeto / 'config.json').write_text('{}')
+        (self.projeto / 'extratos' / 'bb.csv').write_text('bb')
+        (raiz / 'segredo.csv').write_text('segredo')
+        (self.projeto / 'uploads' / 'configs').mkdir(parents=True)
+
+        configuracao = override_settings(MEDIA_ROOT=str(self.projeto))
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def _processamento(self, arquivos):
+        (self.projeto / 'uploads' / 'configs' / 'enviado.json').write_text(json.dumps({'arquivos': arquivos}))
+        return ProcessamentoExtrato(arquivo_config='uploads/configs/enviado.json')
+
+    def test_aceita_caminhos_dentro_do_projeto(self):
+        processamento = self._processamento({'bb': ['extratos/bb.csv']})
+
+        self.assertEqual(_arquivos_do_config(processamento), [('bb', (self.projeto / 'extratos' / 'bb.csv').resolve())])
+        self.assertEqual(_processar_config_arquivo(processamento)['arquivos'],
+                         {'bb': [str((self.projeto / 'extratos' / 'bb.csv').resolve())]})
+
+    def test_recusa_caminhos_fora_do_projeto(self):
+        for caminho in ('../segredo.csv', 'extratos/../../segredo.csv', str(self.projeto.parent / 'segredo.csv')):
+            with self.subTest(caminho=caminho):
+                processamento = self._processamento({'bb': caminho})
+
+                with self.assertRaises(ValueError):
+                    _arquivos_do_config(processamento)
+                with self.assertLogs('extratos_app.processamento', 'ERROR'):
+                    self.assertIsNone(_processar_config_arquivo(processamento))
@@ -0,0 +1,49 @@
+import hashlib
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from extratos_app.models import ProcessamentoExtrato
+
+CONTEUDO = b'0123456789'
+
+
+class DownloadIntervaloTests(TestCase):
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=pasta, DOWNLOAD_MODO='')
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        processamento = ProcessamentoExtrato.objects.create(
+            nome_usuario='Fulano', usar_c6=True, status=ProcessamentoExtrato.STATUS_CONCLUIDO,
+            hash_resultado=hashlib.sha256(CONTEUDO).hexdigest()
+        )
+        processamento.arquivo_resultado.save('resultado.xlsx', ContentFile(CONTEUDO))
+        self.url = reverse('extratos:download', args=[processamento.id])
+
+    def _baixar(self, intervalo):
+        response = self.client.get(self.url, HTTP_RANGE=intervalo)
+        return response, b''.join(response.streaming_content)
+
+    def test_intervalo_valido(self):
+        response, conteudo = self._baixar('bytes=2-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(conteudo, b'234')
+
+    def test_intervalo_invalido_envia_o_arquivo_inteiro(self):
+        response, conteudo = self._baixar('bytes=5-3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(conteudo, CONTEUDO)
+
+    def test_intervalo_fora_do_arquivo(self):
+        for intervalo in ('bytes=10-', 'bytes=20-30', 'bytes=-0'):
+            with self.subTest(intervalo=intervalo):
+                response = self.client.get(self.url, HTTP_RANGE=intervalo)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */10')
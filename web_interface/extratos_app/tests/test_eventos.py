@@ -0,0 +1,41 @@
+import time
+
+from django.test import TestCase
+from django.urls import reverse
+
+from extratos_app.models import ProcessamentoExtrato, EventoProcessamento
+
+
+class EventosProcessamentoTests(TestCase):
+    def setUp(self):
+        self.processamento = ProcessamentoExtrato.objects.create(nome_usuario='Fulano', usar_c6=True)
+        self.url = reverse('extratos:eventos', args=[self.processamento.id])
+
+    def test_pendente_sem_eventos_responde_sem_esperar(self):
+        inicio = time.monotonic()
+        response = self.client.get(self.url)
+        self.assertLess(time.monotonic() - inicio, 1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response.content.decode(), 'retry: 1000\n\n')
+
+    def test_envia_so_os_eventos_novos(self):
+        primeiro = EventoProcessamento.objects.create(processamento=self.processamento, etapa='Iniciando', progresso=0)
+        segundo = EventoProcessamento.objects.create(processamento=self.processamento, etapa='Lendo extratos', progresso=15)
+
+        conteudo = self.client.get(self.url, HTTP_LAST_EVENT_ID=str(primeiro.id)).content.decode()
+
+        self.assertNotIn(f'id: {primeiro.id}\n', conteudo)
+        self.assertIn(f'id: {segundo.id}\nevent: progresso\n', conteudo)
+        self.assertNotIn('event: fim', conteudo)
+
+    def test_concluido_envia_fim(self):
+        self.processamento.status = ProcessamentoExtrato.STATUS_CONCLUIDO
+        self.processamento.save(update_fields=['status'])
+
+        conteudo = self.client.get(self.url).content.decode()
+
+        self.assertIn('event: fim\n', conteudo)
+        self.assertIn(reverse('extratos:resultado', args=[self.processamento.id]), conteudo)
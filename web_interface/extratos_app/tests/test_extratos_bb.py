@@ -0,0 +1,74 @@
+import contextlib
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from extratos_app.models import ProcessamentoExtrato
+from extratos_app.processamento import preparar_configuracao
+from extratos_app.views import salvar_multiplos_arquivos, validar_multiplos_arquivos
+from bancos import bb
+
+
+def extrato_bb(mes, saldo_anterior):
+    return (
+        'Data,Lançamento,Detalhes,N° documento,Valor,Tipo Lançamento\n'
+        f'01/{mes}/2025,Saldo Anterior,,,"{saldo_anterior}",\n'
+        f'10/{mes}/2025,Pix - Enviado,Fulano,1,"10,00",Saída\n'
+    ).encode('latin1')
+
+
+class OrdenacaoArquivosTests(SimpleTestCase):
+    def test_ordena_pelo_mes_e_ano_do_nome(self):
+        arquivos = ['extratos/bb_032025.csv', 'extratos/bb_1-2025.csv', 'extratos/bb_022024.csv']
+        self.assertEqual(bb._ordenar_arquivos_por_data(arquivos),
+                         ['extratos/bb_022024.csv', 'extratos/bb_1-2025.csv', 'extratos/bb_032025.csv'])
+
+    def test_usa_o_nome_original_no_lugar_do_nome_em_disco(self):
+        arquivos = ['blobs/0a/0b/0a0b.csv', 'blobs/ff/ee/ffee.csv']
+        nomes = {'blobs/0a/0b/0a0b.csv': 'bb_032025.csv', 'blobs/ff/ee/ffee.csv': 'bb_022025.csv'}
+        self.assertEqual(bb._ordenar_arquivos_por_data(arquivos, nomes),
+                         ['blobs/ff/ee/ffee.csv', 'blobs/0a/0b/0a0b.csv'])
+
+
+class UploadBBForaDeOrdemTests(TestCase):
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=pasta)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def test_saldo_anterior_vem_do_extrato_mais_antigo(self):
+        processamento = ProcessamentoExtrato.objects.create(nome_usuario='Fulano', usar_bb=True)
+        # Março enviado antes de fevereiro (e com o hash do conteúdo menor)
+        request = RequestFactory().post('/processar/', {
+            'arquivos_bb_0': SimpleUploadedFile('extrato_bb_032025.csv', extrato_bb('03', '2.000,00')),
+            'arquivos_bb_1': SimpleUploadedFile('extrato_bb_022025.csv', extrato_bb('02', '1.000,00')),
+        })
+        salvar_multiplos_arquivos(request, processamento)
+        for arquivo in request.FILES.values():
+            arquivo.close()
+
+        with contextlib.ExitStack() as arquivos_abertos:
+            config = preparar_configuracao(processamento, arquivos_abertos)
+            resultado = bb.processar(config)
+
+        self.assertEqual(config['saldos_iniciais']['bb'], 1000.0)
+        self.assertEqual(list(resultado['Data'].dt.month), [2, 3])
+
+
+class ValidacaoUploadBBTests(SimpleTestCase):
+    @override_settings(MAX_UPLOAD_SIZE=5 * 1024 * 1024)
+    def test_informa_o_erro_do_recebimento(self):
+        # O handler conta o arquivo inteiro (size) mesmo depois de rejeitá-lo
+        request = RequestFactory().post('/processar/', {
+            'arquivos_bb_0': SimpleUploadedFile('extrato_bb_022025.csv', b'Data,Valor\n' * (1024 * 1024)),
+        })
+        for arquivo in request.FILES.values():
+            self.addCleanup(arquivo.close)
+
+        erros = validar_multiplos_arquivos(request, {'usar_bb': True})
+
+        self.assertEqual(erros, ['Arquivo inválido (extrato_bb_022025.csv): Arquivo muito grande. Máximo: 5MB'])
@@ -0,0 +1,174 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from extratos_app.models import ProcessamentoExtrato
+from extratos_app import tarefas
+from extratos_app.tarefas import (
+    MENSAGEM_ERRO_LIMITE, _criar_pool_processos, encerrar_esgotados, executar_processamento,
+    reivindicar_processamento
+)
+from extratos_app.views import salvar_multiplos_arquivos
+
+WORKERS = 4
+PROCESSAMENTOS = 20
+
+
+class ReivindicacaoConcorrenteTests(TransactionTestCase):
+    """Vários workers disputando a mesma fila: cada processamento sai para um só"""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # As conexões ao SQLite em memória compartilham o cache e respondem
+            # "table is locked" em vez de esperar a transação da outra thread
+            self.skipTest('requer um banco em arquivo ou PostgreSQL')
+        ProcessamentoExtrato.objects.bulk_create(
+            ProcessamentoExtrato(nome_usuario='Fulano', usar_c6=True) for _ in range(PROCESSAMENTOS)
+        )
+
+    def _disputar(self):
+        inicio = threading.Barrier(WORKERS)
+        reivindicados = []
+        erros = []
+
+        def worker(indice):
+            try:
+                inicio.wait()
+                while (processamento := reivindicar_processamento(f'worker-{indice}')) is not None:
+                    reivindicados.append(processamento.pk)
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(indice,)) for indice in range(WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        self.assertEqual(Counter(reivindicados).most_common(1)[0][1], 1)
+        self.assertEqual(set(reivindicados), set(ProcessamentoExtrato.objects.values_list('pk', flat=True)))
+        self.assertFalse(ProcessamentoExtrato.objects.exclude(tentativas=1).exists())
+
+    def test_skip_locked(self):
+        if not connection.features.has_select_for_update_skip_locked:
+            self.skipTest('banco sem SELECT ... FOR UPDATE SKIP LOCKED')
+        self._disputar()
+
+    def test_update_condicional(self):
+        with mock.patch.object(type(connection.features), 'has_select_for_update_skip_locked', False):
+            self._disputar()
+
+
+@override_settings(PROCESSAMENTO_VISIBILIDADE=300, PROCESSAMENTO_MAX_TENTATIVAS=2)
+class HeartbeatVencidoTests(TestCase):
+    def setUp(self):
+        self.processamento = ProcessamentoExtrato.objects.create(nome_usuario='Fulano', usar_c6=True)
+
+    def _abandonar(self):
+        # O worker parou de renovar o heartbeat há mais que PROCESSAMENTO_VISIBILIDADE
+        ProcessamentoExtrato.objects.filter(pk=self.processamento.pk).update(
+            ultimo_heartbeat=timezone.now() - timedelta(seconds=301)
+        )
+
+    def test_heartbeat_em_dia_nao_e_reivindicado(self):
+        self.assertIsNotNone(reivindicar_processamento('worker-1'))
+        self.assertIsNone(reivindicar_processamento('worker-2'))
+
+    def test_abandonado_volta_para_outro_worker(self):
+        reivindicar_processamento('worker-1')
+        self._abandonar()
+
+        processamento = reivindicar_processamento('worker-2')
+
+        self.assertEqual(processamento.pk, self.processamento.pk)
+        self.assertEqual(processamento.worker, 'worker-2')
+        self.assertEqual(processamento.tentativas, 2)
+
+    def test_abandonado_sem_tentativas_termina_com_erro(self):
+        reivindicar_processamento('worker-1')
+        self._abandonar()
+        reivindicar_processamento('worker-2')
+        self._abandonar()
+
+        self.assertIsNone(reivindicar_processamento('worker-3'))
+        self.assertEqual(encerrar_esgotados(), 1)
+        self.processamento.refresh_from_db()
+        self.assertEqual(self.processamento.status, ProcessamentoExtrato.STATUS_ERRO)
+
+
+@override_settings(PROCESSAMENTO_THREADS=1)
+class PoolProcessosTests(SimpleTestCase):
+    @mock.patch.dict(os.environ, {'PYTHONPATH': '/opt/outro'})
+    def test_nao_altera_o_pythonpath_do_processo_web(self):
+        pool = _criar_pool_processos()
+        try:
+            # Os processos do pool importaram o projeto pelo initializer
+            self.assertIsInstance(pool.submit(os.getpid).result(timeout=60), int)
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(os.environ['PYTHONPATH'], '/opt/outro')
+
+
+@override_settings(PROCESSAMENTO_MODO='fila', PROCESSAMENTO_MEMORIA_MAXIMA=128, PROCESSAMENTO_CPU_MAXIMO=1,
+                   PROCESSAMENTO_HEARTBEAT=300)
+class LimitesDeRecursosTests(TestCase):
+    """Processamentos acima do orçamento terminam com erro, mesmo com except Exception no caminho"""
+
+    def setUp(self):
+        if tarefas.resource is None or not os.path.exists('/proc/self/statm'):
+            self.skipTest('requer limites de recursos do Linux')
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=pasta)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        processamento = ProcessamentoExtrato.objects.create(nome_usuario='Fulano', usar_bb=True)
+        request = RequestFactory().post('/processar/', {
+            'arquivos_bb_0': SimpleUploadedFile('extrato_bb_022025.csv', b'Data,Valor\n'),
+        })
+        salvar_multiplos_arquivos(request, processamento)
+        for arquivo in request.FILES.values():
+            arquivo.close()
+        self.processamento = reivindicar_processamento('worker-1', processamento.pk)
+
+    def _executar(self, processador):
+        with mock.patch.dict('bancos.PROCESSADORES', {'bb': processador}):
+            self.assertFalse(executar_processamento(self.processamento, 'worker-1'))
+        self.processamento.refresh_from_db()
+        self.assertEqual(self.processamento.status, ProcessamentoExtrato.STATUS_ERRO)
+        self.assertEqual(self.processamento.mensagem_erro, MENSAGEM_ERRO_LIMITE)
+
+    def test_memoria_acima_do_orcamento(self):
+        def processador(config):
+            bytearray(2 * 1024 * 1024 * 1024)
+            return pd.DataFrame()
+
+        self._executar(processador)
+
+    def test_cpu_acima_do_orcamento(self):
+        def processador(config):
+            limite = time.monotonic() + 30
+            while time.monotonic() < limite:
+                try:
+                    sum(range(100_000))
+                except Exception:
+                    pass
+            return pd.DataFrame()
+
+        self._executar(processador)
@@ -0,0 +1,43 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from extratos_app.models import GraficoSankey, ProcessamentoExtrato
+
+ESPECIFICACAO = {'titulo': 'Geral', 'nos': ['Entradas', 'Saídas'], 'links': [[0, 1, 10.0]]}
+
+
+class GraficoSankeyTests(TestCase):
+    def setUp(self):
+        processamento = ProcessamentoExtrato.objects.create(
+            nome_usuario='Fulano', usar_c6=True, status=ProcessamentoExtrato.STATUS_CONCLUIDO,
+            hash_resultado='ab' * 32
+        )
+        GraficoSankey.objects.create(processamento=processamento, chave='geral', titulo='Geral',
+                                     dados=GraficoSankey.comprimir(ESPECIFICACAO))
+        self.url = reverse('extratos:grafico', args=[processamento.id, 'geral'])
+
+    def test_envia_os_dados_comprimidos_quando_aceita_deflate(self):
+        for aceitas in ('deflate', 'gzip, deflate, br', 'gzip;q=1.0, Deflate;q=0.5', '*'):
+            with self.subTest(aceitas=aceitas):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=aceitas)
+                self.assertEqual(response['Content-Encoding'], 'deflate')
+
+    def test_envia_json_quando_deflate_e_recusado(self):
+        for aceitas in ('', 'gzip', 'deflate;q=0', 'gzip, deflate;q=0.0', 'x-deflate', '*, deflate;q=0'):
+            with self.subTest(aceitas=aceitas):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=aceitas)
+                self.assertNotEqual(response.get('Content-Encoding'), 'deflate')
+                self.assertEqual(json.loads(response.content), ESPECIFICACAO)
+
+    def test_etag_distingue_o_corpo_comprimido(self):
+        comprimido = self.client.get(self.url, HTTP_ACCEPT_ENCODING='deflate')
+        identidade = self.client.get(self.url, HTTP_ACCEPT_ENCODING='identity')
+
+        self.assertNotEqual(comprimido['ETag'], identidade['ETag'])
+        # Cada ETag só revalida a sua própria representação
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT_ENCODING='deflate',
+                                         HTTP_IF_NONE_MATCH=comprimido['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT_ENCODING='identity',
+                                         HTTP_IF_NONE_MATCH=comprimido['ETag']).status_code, 200)
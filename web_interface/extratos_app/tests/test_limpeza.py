@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from extratos_app.models import BlobArmazenado, ProcessamentoExtrato
+from extratos_app.tarefas import limpar_expirados
+
+
+class LimparExpiradosTests(TestCase):
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=pasta)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        # arquivo_config fica num storage separado do armazenamento por conteúdo
+        self.storage_config = FileSystemStorage(location=tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.storage_config.location, ignore_errors=True)
+        campo = mock.patch.object(ProcessamentoExtrato._meta.get_field('arquivo_config'),
+                                  'storage', self.storage_config)
+        campo.start()
+        self.addCleanup(campo.stop)
+
+    def _expirado(self, status):
+        processamento = ProcessamentoExtrato.objects.create(
+            nome_usuario='Fulano', usar_c6=True, status=status,
+            data_expiracao=timezone.now() - timedelta(minutes=1)
+        )
+        processamento.arquivo_c6.save('c6.csv', ContentFile(f'extrato {processamento.id}'.encode()))
+        processamento.arquivo_config.save('config.json', ContentFile(b'{}'))
+        return processamento
+
+    def test_remove_concluido_com_os_arquivos(self):
+        processamento = self._expirado(ProcessamentoExtrato.STATUS_CONCLUIDO)
+        extrato = processamento.arquivo_c6.name
+        config = processamento.arquivo_config.name
+
+        self.assertEqual(limpar_expirados(), 1)
+
+        self.assertFalse(ProcessamentoExtrato.objects.filter(pk=processamento.pk).exists())
+        self.assertFalse(BlobArmazenado.objects.filter(nome=extrato).exists())
+        self.assertFalse(processamento.arquivo_c6.storage.exists(extrato))
+        self.assertFalse(self.storage_config.exists(config))
+
+    def test_mantem_pendentes_e_em_andamento(self):
+        pendente = self._expirado(ProcessamentoExtrato.STATUS_PENDENTE)
+        processando = self._expirado(ProcessamentoExtrato.STATUS_PROCESSANDO)
+
+        self.assertEqual(limpar_expirados(), 0)
+
+        self.assertEqual(ProcessamentoExtrato.objects.filter(pk__in=[pendente.pk, processando.pk]).count(), 2)
+        self.assertTrue(self.storage_config.exists(pendente.arquivo_config.name))
+        self.assertTrue(BlobArmazenado.objects.filter(nome=pendente.arquivo_c6.name).exists())
+
+    def test_nao_apaga_o_que_voltou_para_a_fila(self):
+        processamento = self._expirado(ProcessamentoExtrato.STATUS_ERRO)
+        excluir = ProcessamentoExtrato.objects.filter
+
+        def voltou_para_a_fila(*args, **kwargs):
+            # Um worker devolve o processamento para a fila entre a consulta e o DELETE
+            if kwargs.get('pk__in') and 'status' not in kwargs:
+                ProcessamentoExtrato.objects.filter(pk=processamento.pk).update(
+                    status=ProcessamentoExtrato.STATUS_PENDENTE
+                )
+            return excluir(*args, **kwargs)
+
+        with mock.patch.object(ProcessamentoExtrato.objects, 'filter', side_effect=voltou_para_a_fila):
+            self.assertEqual(limpar_expirados(), 0)
+
+        self.assertTrue(ProcessamentoExtrato.objects.filter(pk=processamento.pk).exists())
+        self.assertTrue(processamento.arquivo_c6.storage.exists(processamento.arquivo_c6.name))
+        self.assertTrue(self.storage_config.exists(processamento.arquivo_config.name))
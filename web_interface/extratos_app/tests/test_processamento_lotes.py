@@ -0,0 +1,33 @@
+import io
+
+from django.test import SimpleTestCase
+
+from extratos_app.processamento import _get_default_categories
+from bancos import bb
+
+CSV_BB = (
+    'Data,Lançamento,Detalhes,N° documento,Valor,Tipo Lançamento\n'
+    '01/01/2025,Saldo Anterior,,,"1.000,00",\n'
+    '02/01/2025,Pix - Enviado,Fulano,1,"10,00",Saída\n'
+    '03/01/2025,Pix - Recebido,Ciclano,2,"20,00",Entrada\n'
+    '04/01/2025,Saldo Anterior,,,"5.000,00",\n'
+    '05/01/2025,Pix - Enviado,Beltrano,3,"30,00",Saída\n'
+)
+
+
+class SaldoAnteriorBBTests(SimpleTestCase):
+    def test_blocos_seguintes_nao_sobrescrevem_o_saldo(self):
+        arquivo = io.BytesIO(CSV_BB.encode('latin1'))
+        arquivo.name = 'bb.csv'
+        config = {
+            'arquivos': {'bb': arquivo},
+            'processamento': {'skip_rows_bb': 0},
+            'categorias': _get_default_categories(),
+            'saldos_iniciais': {'bb': 0.0},
+        }
+
+        # Blocos de 2 linhas: o segundo "Saldo Anterior" cai no segundo bloco
+        blocos = list(bb.processar_lotes(config, tamanho_lote=2))
+
+        self.assertEqual(sum(len(bloco) for bloco in blocos), 3)
+        self.assertEqual(config['saldos_iniciais']['bb'], 1000.0)
@@ -0,0 +1,94 @@
+import threading
+
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from extratos_app.middleware.security_middleware import SecurityMiddleware, _incrementar, _ip_do_cliente
+from extratos_app.models import ContadorRequisicoes
+
+THREADS = 8
+REQUISICOES_POR_THREAD = 25
+
+
+class ContadorConcorrenteTests(TransactionTestCase):
+    def test_incrementos_simultaneos_nao_se_perdem(self):
+        """Com o locmem (padrão), o contador fica no banco e nenhum incremento se perde"""
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # As conexões ao SQLite em memória compartilham o cache e respondem
+            # "table is locked" em vez de esperar a transação da outra thread
+            self.skipTest('requer um banco em arquivo ou PostgreSQL')
+        inicio = threading.Barrier(THREADS)
+        erros = []
+
+        def requisicoes():
+            try:
+                inicio.wait()
+                for _ in range(REQUISICOES_POR_THREAD):
+                    _incrementar('rate_limit:default:10.0.0.1:1', 600)
+            except Exception as e:
+                erros.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=requisicoes) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erros, [])
+        self.assertEqual(
+            ContadorRequisicoes.objects.get(chave='rate_limit:default:10.0.0.1:1').contagem,
+            THREADS * REQUISICOES_POR_THREAD
+        )
+
+
+@override_settings(RATELIMIT_ENABLE=True)
+class LimiteTests(TestCase):
+    def test_bloqueia_depois_do_limite(self):
+        middleware = SecurityMiddleware(lambda request: None)
+        request = RequestFactory().post('/processar/', REMOTE_ADDR='10.0.0.2')
+
+        respostas = [middleware.process_request(request) for _ in range(11)]
+
+        self.assertTrue(all(resposta is None for resposta in respostas[:10]))
+        self.assertEqual(respostas[10].status_code, 403)
+
+    def test_contadores_e_log_nao_guardam_o_ip(self):
+        middleware = SecurityMiddleware(lambda request: None)
+        request = RequestFactory().post('/processar/', REMOTE_ADDR='10.0.0.4')
+
+        for _ in range(10):
+            middleware.process_request(request)
+        with self.assertLogs('extratos_app.middleware.security_middleware', 'WARNING') as logs:
+            self.assertEqual(middleware.process_request(request).status_code, 403)
+
+        self.assertNotIn('10.0.0.4', ' '.join(logs.output))
+        chaves = list(ContadorRequisicoes.objects.values_list('chave', flat=True))
+        self.assertTrue(chaves)
+        self.assertFalse(any('10.0.0.4' in chave for chave in chaves))
+
+
+class IpDoClienteTests(SimpleTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.9',
+                                            HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7')
+
+    @override_settings(RATELIMIT_PROXIES=0)
+    def test_sem_proxies_ignora_x_forwarded_for(self):
+        self.assertEqual(_ip_do_cliente(self.request), '10.0.0.9')
+
+    @override_settings(RATELIMIT_PROXIES=1)
+    def test_usa_o_endereco_acrescentado_pelo_proxy(self):
+        # 1.2.3.4 veio do cliente e pode ser forjado
+        self.assertEqual(_ip_do_cliente(self.request), '203.0.113.7')
+
+
+@override_settings(RATELIMIT_ENABLE=False)
+class RegistroTests(SimpleTestCase):
+    def test_nao_registra_ip_nem_user_agent(self):
+        middleware = SecurityMiddleware(lambda request: None)
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.3', HTTP_USER_AGENT='Navegador')
+
+        with self.assertNoLogs('extratos_app.middleware.security_middleware'):
+            self.assertIsNone(middleware.process_request(request))
@@ -0,0 +1,65 @@
+import pandas as pd
+from django.test import SimpleTestCase
+
+from extratos_app import processamento  # noqa: F401  (coloca o core no sys.path)
+from processador import consolidar_dados
+from utils import calcular_saldos, detectar_transferencias_proprias
+
+CONFIG = {'saldos_iniciais': {'bb': 100.0, 'bradesco': 0.0, 'c6_bank': 0.0, 'itau': 0.0}}
+
+
+class CalcularSaldosTests(SimpleTestCase):
+    def test_nao_altera_o_dataframe_ja_ordenado_recebido(self):
+        datas = pd.to_datetime(['2025-01-01', '2025-01-02', '2025-01-03'])
+        df = pd.DataFrame({
+            'Data': datas,
+            'Data_Contabil': datas,
+            'Banco': 'Banco do Brasil',
+            'Valor': [10.0, -5.0, 20.0],
+            'Categoria_Auto': 'Outros',
+        }, index=[7, 8, 9])
+
+        resultado = calcular_saldos(df, CONFIG)
+
+        self.assertNotIn('Saldo_Real', df.columns)
+        self.assertNotIn('Saldo_no_Banco', df.columns)
+        self.assertEqual(list(df.index), [7, 8, 9])
+        self.assertEqual(list(resultado.index), [0, 1, 2])
+        self.assertEqual(list(resultado['Saldo_Real']), [110.0, 105.0, 125.0])
+
+
+def extrato(banco, data, data_contabil, valor, categoria, descricao):
+    return pd.DataFrame({
+        'Data': pd.to_datetime([data]),
+        'Data_Contabil': pd.to_datetime([data_contabil]),
+        'Banco': banco,
+        'Agencia_Conta': '',
+        'Tipo_Transacao': 'Pix',
+        'Descricao': descricao,
+        'Valor': [valor],
+        'Categoria_Auto': categoria,
+    })
+
+
+class TransferenciasPropriasTests(SimpleTestCase):
+    def test_pareamento_segue_a_ordem_de_data(self):
+        config = {
+            'usuario': {'nome': 'Fulano', 'cpf': '000.000.000-00'},
+            'processamento': {'tolerancia_valor': 0.01, 'janela_transferencias_dias': 3},
+        }
+        # Dois recebimentos candidatos: pela Data o do C6 vem primeiro, pela
+        # Data_Contabil (ordem do consolidado) o do Itaú
+        df = consolidar_dados([
+            extrato('Banco do Brasil', '2025-01-05', '2025-01-05', -100.0, 'PIX Enviado', 'Pix enviado Fulano'),
+            extrato('C6 Bank', '2025-01-04', '2025-01-08', 100.0, 'PIX Recebido', 'Transferencia Pix'),
+            extrato('Itaú', '2025-01-06', '2025-01-06', 100.0, 'PIX Recebido', 'Transferencia Pix'),
+        ])
+
+        detectar_transferencias_proprias(df, config)
+
+        categorias = dict(zip(df['Banco'], df['Categoria_Auto']))
+        self.assertEqual(categorias, {
+            'Banco do Brasil': 'Transferência Própria',
+            'C6 Bank': 'Transferência Própria',
+            'Itaú': 'PIX Recebido',
+        })
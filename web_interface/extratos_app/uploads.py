@@ -0,0 +1,133 @@
+"""
+Recebimento dos arquivos enviados em uma única passada.
+
+UploadVerificadoHandler substitui os handlers padrão do Django
+(FILE_UPLOAD_HANDLERS): cada bloco recebido passa uma vez pelo limite de
+tamanho, pela verificação da assinatura (magic bytes) do tipo declarado na
+extensão, pelo SHA-256 e pela gravação em arquivo temporário no disco. Nenhum
+extrato fica inteiro na memória do processo web, e o FileSystemStorage só
+move o temporário para MEDIA_ROOT ao salvar o model.
+
+O resultado fica no próprio UploadedFile: `sha256` (usado na chave do cache
+de resultados) e `erro_upload` (mensagem levantada por validar_upload).
+"""
+import hashlib
+import logging
+import os
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+logger = logging.getLogger(__name__)
+
+# Arquivos de configuração são pequenos e lidos inteiros pelo formulário
+TAMANHO_MAXIMO_CONFIG = 1024 * 1024  # 1MB
+
+# Bytes iniciais guardados para conferir a assinatura (o cabeçalho do PDF
+# pode aparecer em qualquer ponto do primeiro 1KB)
+TAMANHO_CABECALHO = 1024
+
+# Assinaturas aceitas por extensão; o Itaú às vezes entrega .xlsx com extensão .xls
+ASSINATURAS = {
+    '.pdf': (b'%PDF-',),
+    '.xlsx': (b'PK\x03\x04',),
+    '.xls': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', b'PK\x03\x04'),
+}
+
+# Extensões de texto: basta não haver bytes nulos no cabeçalho
+EXTENSOES_TEXTO = ('.csv', '.json')
+
+
+def _limite_arquivo(extensao):
+    if extensao == '.json':
+        return TAMANHO_MAXIMO_CONFIG
+    return getattr(settings, 'MAX_UPLOAD_SIZE', 25 * 1024 * 1024)
+
+
+def verificar_assinatura(extensao, cabecalho):
+    """
+    Confere se os primeiros bytes do arquivo combinam com a extensão.
+
+    Returns:
+        Mensagem de erro ou '' se o conteúdo é compatível
+    """
+    if extensao in ASSINATURAS:
+        if extensao == '.pdf':
+            compativel = ASSINATURAS['.pdf'][0] in cabecalho
+        else:
+            compativel = cabecalho.startswith(ASSINATURAS[extensao])
+        if not compativel:
+            return f'O conteúdo do arquivo não corresponde a um {extensao[1:].upper()}.'
+    elif extensao in EXTENSOES_TEXTO and b'\x00' in cabecalho:
+        return f'O conteúdo do arquivo não corresponde a um {extensao[1:].upper()} em texto.'
+    return ''
+
+
+class UploadVerificadoHandler(TemporaryFileUploadHandler):
+    """Grava o upload em disco calculando SHA-256, tamanho e assinatura no caminho"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.extensao = os.path.splitext(self.file_name or '')[1].lower()
+        self.limite = _limite_arquivo(self.extensao)
+        self.sha = hashlib.sha256()
+        self.cabecalho = b''
+        self.recebido = 0
+        self.erro = ''
+
+        if self.content_length and self.content_length > self.limite:
+            self._rejeitar(f'Arquivo muito grande. Máximo: {self.limite // (1024 * 1024)}MB')
+
+    def receive_data_chunk(self, raw_data, start):
+        self.recebido += len(raw_data)
+        if self.erro:
+            return None
+
+        if self.recebido > self.limite:
+            self._rejeitar(f'Arquivo muito grande. Máximo: {self.limite // (1024 * 1024)}MB')
+            return None
+
+        if len(self.cabecalho) < TAMANHO_CABECALHO:
+            self.cabecalho += raw_data[:TAMANHO_CABECALHO - len(self.cabecalho)]
+            if len(self.cabecalho) >= TAMANHO_CABECALHO:
+                self._conferir_cabecalho()
+                if self.erro:
+                    return None
+
+        self.sha.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.erro and len(self.cabecalho) < TAMANHO_CABECALHO:
+            self._conferir_cabecalho()
+
+        arquivo = super().file_complete(file_size)
+        arquivo.sha256 = '' if self.erro else self.sha.hexdigest()
+        arquivo.erro_upload = self.erro
+        return arquivo
+
+    def _conferir_cabecalho(self):
+        erro = verificar_assinatura(self.extensao, self.cabecalho)
+        if erro:
+            self._rejeitar(erro)
+
+    def _rejeitar(self, erro):
+        """Descarta o que já foi gravado; o resto do arquivo é só contado"""
+        logger.warning(f"Upload rejeitado ({self.file_name}): {erro}")
+        self.erro = erro
+        self.file.truncate(0)
+        self.file.seek(0)
+
+
+def validar_upload(arquivo):
+    """Levanta o erro registrado pelo UploadVerificadoHandler, se houver"""
+    erro = getattr(arquivo, 'erro_upload', '')
+    if erro:
+        raise forms.ValidationError(erro)
+
+
+def hash_upload(arquivo):
+    """SHA-256 calculado durante o recebimento ('' se o arquivo não passou pelo handler)"""
+    return getattr(arquivo, 'sha256', '')
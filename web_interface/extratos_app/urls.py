@@ -10,5 +10,10 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('processar/', views.processar_extratos_view, name='processar'),
     path('resultado/<uuid:processamento_id>/', views.resultado, name='resultado'),
+    path('status/<uuid:processamento_id>/', views.status_processamento, name='status'),
+    path('eventos/<uuid:processamento_id>/', views.eventos_processamento, name='eventos'),
+    path('transacoes/<uuid:processamento_id>/', views.transacoes, name='transacoes'),
+    path('grafico/<uuid:processamento_id>/<slug:chave>/', views.grafico_sankey, name='grafico'),
     path('download/<uuid:processamento_id>/', views.download_resultado, name='download'),
+    path('metricas/fila/', views.metricas_fila, name='metricas_fila'),
 ]
@@ -101,7 +101,19 @@ def validate_json_content(file):
         file.seek(0)
         content = file.read().decode('utf-8')
         data = json.loads(content)
-        
+        file.seek(0)
+    except json.JSONDecodeError:
+        raise ValidationError('Arquivo JSON inválido')
+    except UnicodeDecodeError:
+        raise ValidationError('Encoding do arquivo JSON inválido')
+    
+    validate_json_data(data)
+
+def validate_json_data(data):
+    """Valida um JSON já carregado (estrutura e conteúdo suspeito)"""
+    import json
+    
+    try:
         # Validar estrutura básica
         if not isinstance(data, dict):
             raise ValidationError('Arquivo JSON deve conter um objeto')
@@ -114,12 +126,6 @@ def validate_json_content(file):
             if pattern.lower() in json_str.lower():
                 raise ValidationError('Conteúdo potencialmente malicioso no arquivo JSON')
         
-        file.seek(0)
-        
-    except json.JSONDecodeError:
-        raise ValidationError('Arquivo JSON inválido')
-    except UnicodeDecodeError:
-        raise ValidationError('Encoding do arquivo JSON inválido')
     except Exception as e:
         logger.error(f"Erro na validação do JSON: {e}")
         raise ValidationError('Erro ao validar arquivo JSON')
@@ -1,104 +1,42 @@
 import os
-import sys
+import re
 import json
-import shutil
-import tempfile
-import traceback
-import importlib.util
-from pathlib import Path
 
-import pandas as pd
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
-from django.http import FileResponse, Http404, JsonResponse
-from django.core.files.base import ContentFile
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import content_disposition_header, quote_etag
+from django.views.decorators.http import condition, etag
 
-from .models import ProcessamentoExtrato, ArquivoExtrato
+from .models import ProcessamentoExtrato, ArquivoExtrato, EventoProcessamento, GraficoSankey
 from .forms import ProcessamentoExtratoForm
+from .middleware.compressao_middleware import aceita_codificacao
+from .processamento import _log_error, _atualizar_bancos_do_config, nome_arquivo_resultado, salvar_tabela_transacoes
+from .tabela import carregar_tabela, consultar_transacoes, ler_planilha_resultado
+from .tarefas import enfileirar_processamento, situacao_fila
+from .uploads import hash_upload
 
 # Constantes
-EXCEL_PREVIEW_ROWS = 100
-TRANSFERENCIAS_WINDOW_DAYS = 3
-TOLERANCIA_VALOR = 0.01
-
-# Import das funções do processador original
-core_dir = Path(__file__).parent.parent.parent / "core"
-analise_dir = Path(__file__).parent.parent.parent / "analise"
-sys.path.insert(0, str(core_dir))
-sys.path.insert(0, str(analise_dir))
-
-try:
-    from processador import processar_extratos
-    from graficos_sankey import analisar_gastos_sankey_proventos_detalhados
-except ImportError:
-    spec = importlib.util.spec_from_file_location("processador", core_dir / "processador.py")
-    processador = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(processador)
-    processar_extratos = processador.processar_extratos
-    
-    # Importar Sankey
-    spec_sankey = importlib.util.spec_from_file_location("graficos_sankey", analise_dir / "graficos_sankey.py")
-    graficos_sankey = importlib.util.module_from_spec(spec_sankey)
-    spec_sankey.loader.exec_module(graficos_sankey)
-    analisar_gastos_sankey_proventos_detalhados = graficos_sankey.analisar_gastos_sankey_proventos_detalhados
-
-
-def _log_error(error_msg, exception=None):
-    """Helper para log de erros"""
-    import logging
-    logger = logging.getLogger(__name__)
-    if exception:
-        logger.error(f"ERRO: {error_msg}", exc_info=True)
-    else:
-        logger.error(f"ERRO: {error_msg}")
-
-
-def _extract_body_content(html_content):
-    """Extrai o conteúdo do body de um HTML"""
-    import re
-    body_match = re.search(r'<body[^>]*>(.*?)</body>', html_content, re.DOTALL)
-    return body_match.group(1) if body_match else None
-
-
-def _get_config_base_dir(config_file_path):
-    """Determina o diretório base para arquivos de configuração"""
-    base_dir = Path(config_file_path).parent.parent.parent
-    
-    # Verificar se estamos no diretório correto (deve ter o arquivo config.json na raiz)
-    if not (base_dir / "config.json").exists():
-        # Se não encontrou, tentar o diretório pai do web_interface
-        base_dir = Path(__file__).parent.parent.parent
-    
-    return base_dir
-
-
-def _get_default_categories():
-    """Retorna as categorias padrão para processamento"""
-    return {
-        "estornos": ["ESTORNO", "EST "],
-        "investimentos": ["OUROCAP", "B3", "ATIVO", "ACOES", "FUNDO", "CDB", "LCI", "TESOURO", "APLICACAO", "RESGATE"],
-        "rendimentos": ["CASHBACK", "REMUNERACAO", "RENDIMENTO", "JUROS", "DIVIDENDO", "JSCP", "SALARIO", "ORDEM BANC", "PROVENTO", "FOLHA"],
-        "pix_transferencia": ["PIX", "TRANSFERENCIA", "TED", "DOC"],
-        "cartao_credito": ["CARTAO CREDITO", "CREDITO CARTAO", "COMPRA CARTAO"],
-        "cartao_debito": ["CARTAO DEBITO", "DEBITO CARTAO", "DEBITO DE CARTAO"],
-        "debito_automatico": ["DEBITO AUTOMATICO"],
-        "tarifas": ["TARIFA", "TAXA", "IOF", "ANUIDADE", "MANUTENCAO"],
-        "saques": ["SAQUE", "RETIRADA"],
-        "depositos": ["DEPOSITO", "CREDITO EM CONTA"]
-    }
+# Server-Sent Events em consulta curta: cada requisição envia os eventos novos
+# e encerra na hora, sem prender uma thread do servidor; o EventSource
+# reconecta sozinho depois de SSE_RETRY_MS, a partir do último evento
+# recebido (Last-Event-ID)
+SSE_RETRY_MS = 1000
 
+# Downloads: blocos lidos por vez ao enviar um intervalo de bytes
+DOWNLOAD_BLOCO = 64 * 1024
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
-def _get_default_processing_config():
-    """Retorna configurações padrão de processamento"""
-    return {
-        "skip_rows_c6": 8,
-        "skip_rows_bradesco": 1,
-        "skip_rows_bb": 0,
-        "skip_rows_itau": 10,
-        "janela_transferencias_dias": TRANSFERENCIAS_WINDOW_DAYS,
-        "tolerancia_valor": TOLERANCIA_VALOR
-    }
+# Colunas lidas por cada página (o restante da linha, como user_agent, o CPF
+# criptografado e os hashes dos uploads, fica no banco)
+CAMPOS_RESULTADO = (
+    'id', 'nome_usuario', 'cpf_usuario', 'data_criacao', 'processado', 'status', 'etapa', 'progresso',
+    'mensagem_erro', 'arquivo_resultado', 'arquivo_tabela'
+)
+CAMPOS_DOWNLOAD = ('id', 'nome_usuario', 'data_criacao', 'arquivo_resultado', 'hash_resultado')
 
 
 def index(request):
@@ -135,16 +73,22 @@ def processar_extratos_view(request):
             if not processamento.arquivo_config:
                 salvar_multiplos_arquivos(request, processamento)
             
-            # Processar os extratos
-            sucesso = processar_extratos_web(processamento)
+            # Hashes calculados durante o upload, reaproveitados na chave do cache
+            for campo in ('arquivo_c6', 'arquivo_c6_cartao', 'arquivo_bradesco', 'arquivo_config'):
+                _registrar_hash_upload(processamento, getattr(processamento, campo), form.cleaned_data.get(campo))
+            processamento.save(update_fields=['hashes_upload'])
+            
+            # Enfileirar o processamento e responder sem esperar
+            enfileirar_processamento(processamento)
             
-            if sucesso:
-                processamento.processado = True
-                processamento.save()
-                return redirect('extratos:resultado', processamento_id=processamento.id)
-            else:
-                messages.error(request, 'Erro ao processar os extratos. Verifique os arquivos e tente novamente.')
-                processamento.delete()
+            if 'application/json' in request.headers.get('Accept', ''):
+                return JsonResponse({
+                    'id': str(processamento.id),
+                    'status': processamento.status,
+                    'url_status': reverse('extratos:status', args=[processamento.id]),
+                    'url_resultado': reverse('extratos:resultado', args=[processamento.id]),
+                }, status=202)
+            return redirect('extratos:resultado', processamento_id=processamento.id)
                 
         except Exception as e:
             messages.error(request, f'Erro inesperado: {str(e)}')
@@ -162,49 +106,6 @@ def processar_extratos_view(request):
     return render(request, 'extratos_app/index.html', {'form': form})
 
 
-def gerar_graficos_sankey(processamento, arquivo_excel, output_dir):
-    """Gerar gráficos Sankey e retornar conteúdo HTML"""
-    try:
-        # Executar geração de gráficos Sankey
-        analisar_gastos_sankey_proventos_detalhados(
-            nome_arquivo_excel=str(arquivo_excel),
-            output_dir=str(output_dir)
-        )
-        
-        # Buscar arquivos HTML gerados
-        html_files = list(output_dir.glob("*.html"))
-        
-        sankey_data = {
-            'geral': None,
-            'bancos': {}
-        }
-        
-        for html_file in html_files:
-            with open(html_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Extrair o conteúdo do body
-                body_content = _extract_body_content(content)
-                if body_content:
-                    # Determinar tipo de arquivo
-                    if 'geral' in html_file.name:
-                        sankey_data['geral'] = body_content
-                    else:
-                        # Para gráficos de bancos específicos
-                        banco_name = html_file.stem.replace('analise_gastos_sankey_', '').replace('_', ' ').title()
-                        sankey_data['bancos'][banco_name] = body_content
-        
-        # Salvar dados Sankey no processamento para uso posterior
-        processamento.sankey_data = json.dumps(sankey_data)
-        processamento.save()
-        
-        return sankey_data
-        
-    except Exception as e:
-        _log_error("Erro ao gerar gráficos Sankey", e)
-        return {'geral': None, 'bancos': {}}
-
-
 def validar_multiplos_arquivos(request, cleaned_data):
     """Validar se múltiplos arquivos foram enviados para bancos que precisam"""
     erros = []
@@ -218,11 +119,13 @@ def validar_multiplos_arquivos(request, cleaned_data):
             # Validar tipos de arquivo BB
             for file_key in bb_files:
                 arquivo = request.FILES[file_key]
+                # Rejeitado no recebimento (tamanho ou conteúdo, ver uploads.py)
+                if getattr(arquivo, 'erro_upload', ''):
+                    erros.append(f"Arquivo inválido ({arquivo.name}): {arquivo.erro_upload}")
+                    continue
                 ext = os.path.splitext(arquivo.name)[1].lower()
                 if ext not in ['.csv']:
                     erros.append(f"Arquivo inválido para o Banco do Brasil ({arquivo.name}). Apenas arquivos CSV são aceitos.")
-                if arquivo.size > 10 * 1024 * 1024:  # 10MB
-                    erros.append(f"Arquivo muito grande ({arquivo.name}). Tamanho máximo: 10MB.")
     
     # Verificar BB Cartão (apenas arquivos_bb_cartao_)
     if cleaned_data.get('usar_bb_cartao'):
@@ -233,11 +136,13 @@ def validar_multiplos_arquivos(request, cleaned_data):
             # Validar tipos de arquivo BB Cartão
             for file_key in bb_cartao_files:
                 arquivo = request.FILES[file_key]
+                # Rejeitado no recebimento (tamanho ou conteúdo, ver uploads.py)
+                if getattr(arquivo, 'erro_upload', ''):
+                    erros.append(f"Arquivo inválido ({arquivo.name}): {arquivo.erro_upload}")
+                    continue
                 ext = os.path.splitext(arquivo.name)[1].lower()
                 if ext not in ['.pdf']:
                     erros.append(f"Arquivo inválido para o BB Cartão ({arquivo.name}). Apenas arquivos PDF são aceitos.")
-                if arquivo.size > 10 * 1024 * 1024:  # 10MB
-                    erros.append(f"Arquivo muito grande ({arquivo.name}). Tamanho máximo: 10MB.")
     
     # Verificar Itaú
     if cleaned_data.get('usar_itau'):
@@ -248,11 +153,13 @@ def validar_multiplos_arquivos(request, cleaned_data):
             # Validar tipos de arquivo Itaú
             for file_key in itau_files:
                 arquivo = request.FILES[file_key]
+                # Rejeitado no recebimento (tamanho ou conteúdo, ver uploads.py)
+                if getattr(arquivo, 'erro_upload', ''):
+                    erros.append(f"Arquivo inválido ({arquivo.name}): {arquivo.erro_upload}")
+                    continue
                 ext = os.path.splitext(arquivo.name)[1].lower()
                 if ext not in ['.xls', '.xlsx']:
                     erros.append(f"Arquivo inválido para o Itaú ({arquivo.name}). Apenas arquivos XLS e XLSX são aceitos.")
-                if arquivo.size > 10 * 1024 * 1024:  # 10MB
-                    erros.append(f"Arquivo muito grande ({arquivo.name}). Tamanho máximo: 10MB.")
     
     return erros
 
@@ -278,438 +185,324 @@ def salvar_multiplos_arquivos(request, processamento):
         
         # Salvar arquivos
         for ordem, (field_name, arquivo) in enumerate(arquivos, 1):
-            ArquivoExtrato.objects.create(
+            arquivo_extrato = ArquivoExtrato.objects.create(
                 processamento=processamento,
                 banco=banco_key,
                 arquivo=arquivo,
-                ordem=ordem
+                ordem=ordem,
+                nome_original=os.path.basename(arquivo.name)[:255]
             )
+            _registrar_hash_upload(processamento, arquivo_extrato.arquivo, arquivo)
 
 
-def _criar_args_processamento(processamento, config):
-    """Criar objeto args para o processador"""
-    class Args:
-        def __init__(self):
-            # Determinar quais bancos usar com base na configuração
-            if processamento.arquivo_config:
-                # Se há arquivo config, usar todos os bancos que têm arquivos
-                self.all = True
-                self.c6 = 'c6_bank' in config.get("arquivos", {})
-                self.c6_cartao = 'c6_cartao' in config.get("arquivos", {})
-                self.bradesco = 'bradesco' in config.get("arquivos", {})
-                self.bb = 'bb' in config.get("arquivos", {})
-                self.bb_cartao = 'bb_cartao' in config.get("arquivos", {})
-                self.itau = 'itau' in config.get("arquivos", {})
-                self.b3 = 'b3' in config.get("arquivos", {})
-            else:
-                # Se é configuração manual, usar bancos selecionados
-                self.all = False
-                self.c6 = processamento.usar_c6
-                self.c6_cartao = processamento.usar_c6_cartao
-                self.bradesco = processamento.usar_bradesco
-                self.bb = processamento.usar_bb
-                self.bb_cartao = processamento.usar_bb_cartao
-                self.itau = processamento.usar_itau
-                self.b3 = False  # B3 não está disponível na interface manual
-            
-            self.output = None  # Usar output do config.json
-    
-    return Args()
+def _registrar_hash_upload(processamento, campo, upload):
+    """Guardar o SHA-256 do upload sob o nome com que foi salvo no storage"""
+    sha256 = hash_upload(upload)
+    if campo and sha256:
+        processamento.hashes_upload[campo.name] = sha256
 
 
-def processar_extratos_web(processamento):
-    """Processar extratos usando o processador do core"""
+def _carregar_graficos_sankey(processamento):
+    """Listar os gráficos Sankey do processamento (sem os dados, buscados por aba)"""
     try:
-        # Criar diretório temporário
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            
-            # Copiar arquivos para diretório temporário
-            copiar_arquivos_para_temp(processamento, temp_path)
-            
-            # Preparar configuração
-            config = preparar_configuracao(processamento, temp_path)
-            
-            if not config:
-                return False
-            
-            # Criar objeto args para o processador
-            args = _criar_args_processamento(processamento, config)
-            
-            # Executar processamento
-            resultado = processar_extratos(args, config)
-            
-            # Buscar arquivo resultado
-            output_dir = temp_path / "output"
-            arquivos_resultado = list(output_dir.glob("*.xlsx"))
-            
-            if arquivos_resultado:
-                arquivo_resultado = arquivos_resultado[0]
-                
-                # Gerar gráficos Sankey e obter dados
-                sankey_data = gerar_graficos_sankey(processamento, arquivo_resultado, output_dir)
-                
-                # Salvar resultado
-                with open(arquivo_resultado, 'rb') as f:
-                    nome_usuario = processamento.nome_usuario or config.get('usuario', {}).get('nome', 'usuario')
-                    nome_arquivo = f"controle_gastos_{nome_usuario}_{processamento.data_criacao.strftime('%Y%m%d_%H%M')}.xlsx"
-                    processamento.arquivo_resultado.save(
-                        nome_arquivo,
-                        ContentFile(f.read())
-                    )
-                
-                # Limpar arquivos de upload após processamento bem-sucedido
-                limpar_arquivos_upload(processamento)
-                
-                return True
-    
+        return list(GraficoSankey.objects.filter(processamento=processamento).only('chave', 'titulo', 'ordem'))
     except Exception as e:
-        _log_error("Erro ao processar extratos", e)
-        return False
+        _log_error("Erro ao carregar gráficos Sankey", e)
     
-    return False
+    return []
 
 
-def _processar_config_arquivo(processamento, temp_path):
-    """Processar configuração a partir de arquivo JSON"""
-    try:
-        with open(processamento.arquivo_config.path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        # Criar diretórios de saída
-        output_dir = temp_path / "output"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Atualizar apenas os caminhos dos arquivos para o diretório temporário
-        arquivos_original = config.get("arquivos", {})
-        arquivos_atualizados = {}
-        
-        for banco_key, arquivos_banco in arquivos_original.items():
-            if banco_key == "output":
-                # Atualizar caminho de saída - usar caminho absoluto
-                arquivos_atualizados[banco_key] = str(output_dir / "controle_gastos.xlsx")
-                continue
-            
-            if isinstance(arquivos_banco, str):
-                # Arquivo único - converter para caminho no temp
-                nome_arquivo = os.path.basename(arquivos_banco)
-                arquivos_atualizados[banco_key] = str(temp_path / "extratos" / nome_arquivo)
-            elif isinstance(arquivos_banco, list):
-                # Lista de arquivos - converter cada um
-                arquivos_temp = []
-                for arquivo_path in arquivos_banco:
-                    nome_arquivo = os.path.basename(arquivo_path)
-                    arquivos_temp.append(str(temp_path / "extratos" / nome_arquivo))
-                arquivos_atualizados[banco_key] = arquivos_temp
-        
-        # Atualizar configuração com novos caminhos
-        config["arquivos"] = arquivos_atualizados
-        
-        return config
-        
-    except Exception as e:
-        _log_error("Erro ao processar arquivo de configuração", e)
+def _etag_resultado(request, processamento_id):
+    """ETag da página e das consultas do resultado: processamento e hash da planilha (só depois de concluído)"""
+    hash_resultado = ProcessamentoExtrato.objects.filter(
+        id=processamento_id, status=ProcessamentoExtrato.STATUS_CONCLUIDO
+    ).values_list('hash_resultado', flat=True).first()
+    if not hash_resultado:
         return None
+    return f"{processamento_id.hex}-{hash_resultado[:16]}"
 
 
-def _criar_config_manual(processamento, temp_path):
-    """Criar configuração manual baseada nos campos do formulário"""
-    config = {
-        "usuario": {
-            "nome": processamento.nome_usuario,
-            "cpf": processamento.cpf_usuario
-        },
-        "arquivos": {
-            "output": str(temp_path / "output" / "controle_gastos.xlsx")
-        },
-        "saldos_iniciais": {
-            # Sempre incluir todos os bancos com valor 0 para evitar KeyError
-            "c6_bank": 0,
-            "bradesco": 0,
-            "bb": 0,
-            "itau": 0
-        },
-        "processamento": _get_default_processing_config(),
-        "categorias": _get_default_categories()
-    }
-    
-    # Criar diretórios
-    os.makedirs(temp_path / "extratos", exist_ok=True)
-    os.makedirs(temp_path / "output", exist_ok=True)
-    
-    # Configurar bancos selecionados
-    _configurar_bancos_selecionados(processamento, config, temp_path)
-    
-    return config
-
-
-def _configurar_bancos_selecionados(processamento, config, temp_path):
-    """Configurar arquivos e saldos dos bancos selecionados"""
-    if processamento.usar_c6:
-        nome_arquivo = "c6_extrato.csv"
-        config["arquivos"]["c6_bank"] = str(temp_path / "extratos" / nome_arquivo)
-        config["saldos_iniciais"]["c6_bank"] = float(processamento.saldo_inicial_c6)
+@etag(_etag_resultado)
+def resultado(request, processamento_id):
+    """Exibir resultado do processamento"""
+    processamento = get_object_or_404(ProcessamentoExtrato.objects.only(*CAMPOS_RESULTADO), id=processamento_id)
     
-    if processamento.usar_c6_cartao:
-        nome_arquivo = "c6_cartao_extrato.csv"
-        config["arquivos"]["c6_cartao"] = str(temp_path / "extratos" / nome_arquivo)
+    # Enquanto não termina, mostrar a página de acompanhamento
+    if processamento.status != ProcessamentoExtrato.STATUS_CONCLUIDO:
+        eventos = list(processamento.eventos.all())
+        return render(request, 'extratos_app/processando.html', {
+            'processamento': processamento,
+            'eventos': eventos,
+            'ultimo_evento_id': eventos[-1].id if eventos else 0
+        })
     
-    if processamento.usar_bradesco:
-        nome_arquivo = "bradesco_extrato.csv"
-        config["arquivos"]["bradesco"] = str(temp_path / "extratos" / nome_arquivo)
-        config["saldos_iniciais"]["bradesco"] = float(processamento.saldo_inicial_bradesco)
+    # Só as abas; os dados de cada gráfico são buscados quando a aba é aberta
+    graficos_sankey = _carregar_graficos_sankey(processamento)
     
-    if processamento.usar_bb:
-        arquivos_bb = []
-        for arquivo in processamento.arquivos.filter(banco='bb'):
-            nome_arquivo = f"bb_extrato_{arquivo.ordem}.csv"
-            arquivos_bb.append(str(temp_path / "extratos" / nome_arquivo))
-        
-        config["arquivos"]["bb"] = arquivos_bb
-        config["saldos_iniciais"]["bb"] = float(processamento.saldo_inicial_bb)
-    
-    if processamento.usar_bb_cartao:
-        arquivos_bb_cartao = []
-        for arquivo in processamento.arquivos.filter(banco='bb_cartao'):
-            nome_arquivo = f"bb_cartao_extrato_{arquivo.ordem}.pdf"
-            caminho_completo = str(temp_path / "extratos" / nome_arquivo)
-            arquivos_bb_cartao.append(caminho_completo)
-        
-        config["arquivos"]["bb_cartao"] = arquivos_bb_cartao
-    
-    if processamento.usar_itau:
-        arquivos_itau = []
-        for arquivo in processamento.arquivos.filter(banco='itau'):
-            # Detectar extensão do arquivo original
-            extensao_original = Path(arquivo.arquivo.name).suffix
-            nome_arquivo = f"itau_extrato_{arquivo.ordem}{extensao_original}"
-            arquivos_itau.append(str(temp_path / "extratos" / nome_arquivo))
-        
-        config["arquivos"]["itau"] = arquivos_itau
-        config["saldos_iniciais"]["itau"] = float(processamento.saldo_inicial_itau)
+    response = render(request, 'extratos_app/resultado.html', {
+        'processamento': processamento,
+        'tem_transacoes': bool(processamento.arquivo_tabela or processamento.arquivo_resultado),
+        'graficos_sankey': graficos_sankey
+    })
+    # Revalidada pelo ETag a cada visita; sem mudanças a resposta é um 304 vazio
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
 
 
-def preparar_configuracao(processamento, temp_path):
-    """Preparar configuração para processamento"""
+def status_processamento(request, processamento_id):
+    """Situação do processamento na fila, consultada pela página de acompanhamento"""
+    processamento = get_object_or_404(
+        ProcessamentoExtrato.objects.only('id', 'status', 'etapa', 'progresso', 'mensagem_erro'),
+        id=processamento_id
+    )
     
-    # Se há arquivo de configuração, usar ele
-    if processamento.arquivo_config:
-        return _processar_config_arquivo(processamento, temp_path)
+    dados = {
+        'id': str(processamento.id),
+        'status': processamento.status,
+        'status_display': processamento.get_status_display(),
+        'etapa': processamento.etapa,
+        'progresso': processamento.progresso,
+        'finalizado': processamento.finalizado,
+    }
+    if processamento.status == ProcessamentoExtrato.STATUS_CONCLUIDO:
+        dados['url_resultado'] = reverse('extratos:resultado', args=[processamento.id])
+    elif processamento.status == ProcessamentoExtrato.STATUS_ERRO:
+        dados['erro'] = processamento.mensagem_erro
     
-    # Configuração manual baseada nos campos do formulário
-    return _criar_config_manual(processamento, temp_path)
+    response = JsonResponse(dados)
+    response['Cache-Control'] = 'no-store'
+    return response
 
 
-def _copiar_arquivos_config(processamento, extratos_dir):
-    """Copiar arquivos baseado em configuração JSON"""
-    try:
-        with open(processamento.arquivo_config.path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        arquivos = config.get("arquivos", {})
-        
-        # O diretório base é determinado usando a função helper
-        base_dir = _get_config_base_dir(processamento.arquivo_config.path)
-        
-        # Copiar arquivos baseado na configuração JSON
-        for banco, arquivo_paths in arquivos.items():
-            if banco == "output":  # Ignorar entrada de output
-                continue
-                
-            if isinstance(arquivo_paths, str):
-                arquivo_paths = [arquivo_paths]
-            
-            for arquivo_path in arquivo_paths:
-                # Arquivo_path é relativo ao diretório raiz do projeto
-                arquivo_completo = base_dir / arquivo_path
-                nome_arquivo = os.path.basename(arquivo_path)
-                
-                if arquivo_completo.exists():
-                    shutil.copy2(arquivo_completo, extratos_dir / nome_arquivo)
-                # Se arquivo não encontrado, continuar silenciosamente
-                        
-    except Exception as e:
-        _log_error("Erro ao copiar arquivos de configuração", e)
-
-
-def _copiar_arquivos_manuais(processamento, extratos_dir):
-    """Copiar arquivos da configuração manual"""
-    # Copiar arquivos únicos
-    if processamento.arquivo_c6:
-        shutil.copy2(processamento.arquivo_c6.path, extratos_dir / "c6_extrato.csv")
-    
-    if processamento.arquivo_c6_cartao:
-        shutil.copy2(processamento.arquivo_c6_cartao.path, extratos_dir / "c6_cartao_extrato.csv")
-    
-    if processamento.arquivo_bradesco:
-        shutil.copy2(processamento.arquivo_bradesco.path, extratos_dir / "bradesco_extrato.csv")
-    
-    # Copiar múltiplos arquivos
-    for arquivo in processamento.arquivos.all():
-        if arquivo.banco == 'bb':
-            nome_destino = f"bb_extrato_{arquivo.ordem}.csv"
-        elif arquivo.banco == 'bb_cartao':
-            nome_destino = f"bb_cartao_extrato_{arquivo.ordem}.pdf"
-        elif arquivo.banco == 'itau':
-            # Usar a extensão original do arquivo (.xls para conta corrente, .xlsx para cartão)
-            extensao_original = Path(arquivo.arquivo.name).suffix
-            nome_destino = f"itau_extrato_{arquivo.ordem}{extensao_original}"
-        
-        shutil.copy2(arquivo.arquivo.path, extratos_dir / nome_destino)
+def metricas_fila(request):
+    """Profundidade da fila e tempos de espera, para monitoramento"""
+    response = JsonResponse(situacao_fila())
+    response['Cache-Control'] = 'no-store'
+    return response
 
 
-def copiar_arquivos_para_temp(processamento, temp_path):
-    """Copiar arquivos para diretório temporário"""
-    extratos_dir = temp_path / "extratos"
+@etag(_etag_resultado)
+def transacoes(request, processamento_id):
+    """Transações do resultado paginadas, ordenadas e filtradas (ver tabela.consultar_transacoes)"""
+    processamento = get_object_or_404(
+        ProcessamentoExtrato.objects.only('id', 'status', 'arquivo_resultado', 'arquivo_tabela'),
+        id=processamento_id,
+        status=ProcessamentoExtrato.STATUS_CONCLUIDO
+    )
     
-    # Criar diretório de extratos se não existir
-    os.makedirs(extratos_dir, exist_ok=True)
+    # Resultados anteriores à tabela em Parquet: gerar a partir da planilha na primeira consulta
+    if not processamento.arquivo_tabela:
+        if not processamento.arquivo_resultado:
+            raise Http404("Transações não disponíveis")
+        try:
+            df = ler_planilha_resultado(processamento.arquivo_resultado.path)
+        except (OSError, ValueError) as e:
+            _log_error("Erro ao ler planilha de resultado", e)
+            raise Http404("Transações não disponíveis")
+        if not salvar_tabela_transacoes(processamento, df):
+            raise Http404("Transações não disponíveis")
     
-    # Se há arquivo de configuração, os arquivos estão especificados no JSON
-    if processamento.arquivo_config:
-        _copiar_arquivos_config(processamento, extratos_dir)
-    else:
-        _copiar_arquivos_manuais(processamento, extratos_dir)
+    try:
+        df = carregar_tabela(processamento.arquivo_tabela.path)
+    except (OSError, ValueError) as e:
+        _log_error("Erro ao carregar tabela de transações", e)
+        raise Http404("Transações não disponíveis")
+    
+    response = JsonResponse(consultar_transacoes(df, request.GET))
+    # O resultado não muda depois de concluído
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
 
 
-def _carregar_dados_excel(arquivo_resultado):
-    """Carregar dados do Excel para exibir na página"""
-    try:
-        df = pd.read_excel(arquivo_resultado.path)
-        # Limitar a X linhas para não sobrecarregar a página
-        return df.head(EXCEL_PREVIEW_ROWS).to_html(classes='table table-striped table-sm', escape=False)
-    except Exception as e:
-        _log_error("Erro ao carregar dados do Excel", e)
+def _etag_grafico(request, processamento_id, chave):
+    """
+    ETag do gráfico: processamento, hash da planilha resultado e chave do
+    gráfico, com o sufixo -deflate quando o corpo vai comprimido (ETags fortes
+    distintos para corpos distintos)
+    """
+    processamento = ProcessamentoExtrato.objects.filter(
+        id=processamento_id, status=ProcessamentoExtrato.STATUS_CONCLUIDO
+    ).only('hash_resultado').first()
+    if processamento is None:
         return None
+    valor = f"{processamento_id.hex}-{processamento.hash_resultado[:16]}-{chave}"
+    if aceita_codificacao(request, 'deflate'):
+        valor += '-deflate'
+    return valor
+
+
+@etag(_etag_grafico)
+def grafico_sankey(request, processamento_id, chave):
+    """Dados de um gráfico Sankey do resultado (ver GraficoSankey)"""
+    grafico = get_object_or_404(
+        GraficoSankey,
+        processamento_id=processamento_id,
+        processamento__status=ProcessamentoExtrato.STATUS_CONCLUIDO,
+        chave=chave
+    )
+    
+    # Os dados já estão comprimidos com zlib, que é o formato "deflate" do HTTP
+    if aceita_codificacao(request, 'deflate'):
+        response = HttpResponse(bytes(grafico.dados), content_type='application/json')
+        response['Content-Encoding'] = 'deflate'
+    else:
+        response = JsonResponse(grafico.especificacao)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    # O resultado não muda depois de concluído
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
 
 
-def _carregar_graficos_sankey(processamento):
-    """Carregar gráficos Sankey dos dados salvos no processamento"""
-    try:
-        if hasattr(processamento, 'sankey_data') and processamento.sankey_data:
-            sankey_data = json.loads(processamento.sankey_data)
-            return sankey_data.get('geral'), sankey_data.get('bancos', {})
-    except Exception as e:
-        _log_error("Erro ao carregar gráficos Sankey", e)
-    
-    return None, {}
+def _formatar_evento_sse(tipo, dados, evento_id=None):
+    linhas = [f"id: {evento_id}"] if evento_id is not None else []
+    linhas += [f"event: {tipo}", f"data: {json.dumps(dados)}"]
+    return '\n'.join(linhas) + '\n\n'
 
 
-def resultado(request, processamento_id):
-    """Exibir resultado do processamento"""
-    processamento = get_object_or_404(ProcessamentoExtrato, id=processamento_id)
+def _eventos_pendentes(processamento_id, ultimo_id):
+    """Eventos novos desde ultimo_id e, se o processamento terminou, o evento de fim"""
+    partes = [f"retry: {SSE_RETRY_MS}\n\n"]
     
-    # Carregar dados do Excel para exibir na página
-    dados_excel = None
-    if processamento.arquivo_resultado:
-        dados_excel = _carregar_dados_excel(processamento.arquivo_resultado)
+    # Ler o status antes dos eventos para não encerrar sem enviar os últimos
+    status, mensagem_erro = ProcessamentoExtrato.objects.filter(
+        pk=processamento_id
+    ).values_list('status', 'mensagem_erro').first() or (ProcessamentoExtrato.STATUS_ERRO, None)
     
-    # Carregar gráficos Sankey dos dados salvos no processamento
-    sankey_geral, sankey_bancos = _carregar_graficos_sankey(processamento)
+    eventos = EventoProcessamento.objects.filter(
+        processamento_id=processamento_id, id__gt=ultimo_id
+    ).values('id', 'etapa', 'mensagem', 'progresso')
+    for evento in eventos:
+        evento_id = evento.pop('id')
+        partes.append(_formatar_evento_sse('progresso', evento, evento_id))
     
-    return render(request, 'extratos_app/resultado.html', {
-        'processamento': processamento,
-        'dados_excel': dados_excel,
-        'sankey_geral': sankey_geral,
-        'sankey_bancos': sankey_bancos
-    })
+    if status == ProcessamentoExtrato.STATUS_CONCLUIDO:
+        partes.append(_formatar_evento_sse('fim', {
+            'status': status,
+            'url_resultado': reverse('extratos:resultado', args=[processamento_id]),
+        }))
+    elif status == ProcessamentoExtrato.STATUS_ERRO:
+        partes.append(_formatar_evento_sse('fim', {'status': status, 'erro': mensagem_erro}))
+    return ''.join(partes)
 
 
-def download_resultado(request, processamento_id):
-    """Download do arquivo resultado"""
-    processamento = get_object_or_404(ProcessamentoExtrato, id=processamento_id)
+def eventos_processamento(request, processamento_id):
+    """
+    Etapas do processamento como Server-Sent Events: responde com os eventos
+    pendentes e encerra; o navegador reconecta depois do retry
+    """
+    processamento = get_object_or_404(ProcessamentoExtrato.objects.only('id'), id=processamento_id)
     
-    if not processamento.arquivo_resultado:
-        raise Http404("Arquivo não encontrado")
+    try:
+        ultimo_id = int(request.headers.get('Last-Event-ID') or request.GET.get('ultimo', 0))
+    except ValueError:
+        ultimo_id = 0
     
-    response = FileResponse(
-        open(processamento.arquivo_resultado.path, 'rb'),
-        as_attachment=True,
-        filename=os.path.basename(processamento.arquivo_resultado.name)
-    )
+    response = HttpResponse(_eventos_pendentes(processamento.id, ultimo_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
     return response
 
 
-def _remover_arquivo_seguro(arquivo_path):
-    """Remove arquivo se existir, ignora erros"""
-    try:
-        if os.path.exists(arquivo_path):
-            os.remove(arquivo_path)
-    except Exception:
-        pass  # Ignorar erros de remoção individual
+def _etag_download(request, processamento_id):
+    """ETag forte da planilha: o SHA-256 do conteúdo gravado"""
+    return ProcessamentoExtrato.objects.filter(id=processamento_id).values_list(
+        'hash_resultado', flat=True
+    ).first() or None
 
 
-def limpar_arquivos_upload(processamento):
-    """Remove os arquivos de upload após processamento bem-sucedido"""
-    try:
-        # Remover arquivo de configuração se existir
-        if processamento.arquivo_config:
-            _remover_arquivo_seguro(processamento.arquivo_config.path)
-        
-        # Remover arquivos únicos de bancos
-        if processamento.arquivo_c6:
-            _remover_arquivo_seguro(processamento.arquivo_c6.path)
-        
-        if processamento.arquivo_bradesco:
-            _remover_arquivo_seguro(processamento.arquivo_bradesco.path)
-        
-        # Remover múltiplos arquivos
-        for arquivo in processamento.arquivos.all():
-            _remover_arquivo_seguro(arquivo.arquivo.path)
-        
-    except Exception as e:
-        # Se houver erro na limpeza, apenas registrar mas não falhar o processamento
-        _log_error("Erro ao limpar arquivos de upload", e)
+def _modificacao_download(request, processamento_id):
+    return ProcessamentoExtrato.objects.filter(id=processamento_id).values_list('data_fim', flat=True).first()
 
 
-def _atualizar_bancos_do_config(processamento):
-    """Atualizar campos de bancos baseado no arquivo de configuração"""
-    if not processamento.arquivo_config:
-        return
-        
-    try:
-        with open(processamento.arquivo_config.path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        # Mapear bancos do JSON para campos do modelo
-        banco_mapping = {
-            'c6_bank': 'usar_c6',
-            'bradesco': 'usar_bradesco', 
-            'bb': 'usar_bb',
-            'bb_cartao': 'usar_bb_cartao',
-            'itau': 'usar_itau'
-        }
-        
-        # Obter lista de bancos configurados no JSON
-        arquivos = config.get('arquivos', {})
-        
-        # Atualizar campos do modelo baseado no que está configurado no JSON
-        for banco_json, campo_modelo in banco_mapping.items():
-            if banco_json in arquivos:
-                setattr(processamento, campo_modelo, True)
-        
-        # Atualizar dados do usuário se não estão definidos
-        usuario = config.get('usuario', {})
-        if usuario.get('nome') and not processamento.nome_usuario:
-            processamento.nome_usuario = usuario['nome']
-        if usuario.get('cpf') and not processamento.cpf_usuario:
-            processamento.cpf_usuario = usuario['cpf']
-            
-        # Atualizar saldos iniciais
-        saldos = config.get('saldos_iniciais', {})
-        saldo_mapping = {
-            'c6_bank': 'saldo_inicial_c6',
-            'bradesco': 'saldo_inicial_bradesco',
-            'bb': 'saldo_inicial_bb', 
-            'itau': 'saldo_inicial_itau'
-        }
-        
-        for banco_json, campo_saldo in saldo_mapping.items():
-            if banco_json in saldos:
-                setattr(processamento, campo_saldo, saldos[banco_json])
+def _intervalo_solicitado(request, tamanho, etag_atual):
+    """
+    Interpreta o cabeçalho Range (um único intervalo de bytes).
+    
+    Returns:
+        (inicio, fim) inclusivo, None para enviar o arquivo inteiro ou
+        False se o intervalo é válido mas não pode ser atendido (416)
+    """
+    cabecalho = request.headers.get('Range', '')
+    # If-Range com outra versão (ou com data): o cliente recebe o arquivo inteiro
+    if not cabecalho or request.headers.get('If-Range', etag_atual) != etag_atual:
+        return None
+    
+    encontrado = re.fullmatch(r'\s*bytes=(\d*)-(\d*)\s*', cabecalho)
+    if not encontrado or encontrado.group(1) == encontrado.group(2) == '':
+        # Vários intervalos ou formato desconhecido: enviar tudo é sempre válido
+        return None
+    
+    inicio, fim = encontrado.groups()
+    if inicio == '':
+        # Sufixo: os últimos N bytes
+        if int(fim) == 0 or tamanho == 0:
+            return False
+        return max(tamanho - int(fim), 0), tamanho - 1
+    
+    inicio = int(inicio)
+    if fim and int(fim) < inicio:
+        # Intervalo inválido (ex.: bytes=5-3): a RFC 9110 manda ignorar o Range
+        return None
+    if inicio >= tamanho:
+        return False
+    return inicio, min(int(fim), tamanho - 1) if fim else tamanho - 1
+
+
+def _ler_intervalo(caminho, inicio, quantidade):
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        while quantidade > 0:
+            bloco = f.read(min(DOWNLOAD_BLOCO, quantidade))
+            if not bloco:
+                break
+            quantidade -= len(bloco)
+            yield bloco
+
+
+@condition(etag_func=_etag_download, last_modified_func=_modificacao_download)
+def download_resultado(request, processamento_id):
+    """
+    Download do arquivo resultado, com ETag (304), Last-Modified e Range.
+    
+    Com DOWNLOAD_MODO 'x-sendfile' ou 'x-accel-redirect' a resposta só indica
+    o arquivo, e o servidor web (Apache/lighttpd ou nginx) envia os bytes.
+    """
+    processamento = get_object_or_404(ProcessamentoExtrato.objects.only(*CAMPOS_DOWNLOAD), id=processamento_id)
+    
+    if not processamento.arquivo_resultado:
+        raise Http404("Arquivo não encontrado")
+    
+    caminho = processamento.arquivo_resultado.path
+    modo = getattr(settings, 'DOWNLOAD_MODO', '')
+    
+    if modo in ('x-sendfile', 'x-accel-redirect'):
+        response = HttpResponse(content_type=CONTENT_TYPE_XLSX)
+        if modo == 'x-sendfile':
+            response['X-Sendfile'] = caminho
+        else:
+            prefixo = getattr(settings, 'DOWNLOAD_ACCEL_PREFIX', '/media-interna/')
+            response['X-Accel-Redirect'] = prefixo.rstrip('/') + '/' + processamento.arquivo_resultado.name
+    else:
+        tamanho = os.path.getsize(caminho)
+        etag_atual = quote_etag(processamento.hash_resultado) if processamento.hash_resultado else None
+        intervalo = _intervalo_solicitado(request, tamanho, etag_atual)
         
-        # Salvar as alterações
-        processamento.save()
+        if intervalo is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{tamanho}'
+            return response
         
-    except Exception as e:
-        _log_error("Erro ao atualizar bancos do arquivo de configuração", e)
+        if intervalo is None:
+            response = FileResponse(open(caminho, 'rb'), content_type=CONTENT_TYPE_XLSX)
+        else:
+            inicio, fim = intervalo
+            response = StreamingHttpResponse(
+                _ler_intervalo(caminho, inicio, fim - inicio + 1), status=206, content_type=CONTENT_TYPE_XLSX
+            )
+            response['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+            response['Content-Length'] = str(fim - inicio + 1)
+        response['Accept-Ranges'] = 'bytes'
+    
+    response['Content-Disposition'] = content_disposition_header(True, nome_arquivo_resultado(processamento))
+    # O resultado não muda depois de concluído; o ETag permite revalidar sem baixar de novo
+    response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return response
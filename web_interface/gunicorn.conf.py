@@ -0,0 +1,38 @@
+"""
+Configuração do gunicorn, lida automaticamente quando ele é iniciado nesta
+pasta:
+
+    gunicorn web_extratos.wsgi
+
+O app é carregado no processo principal (preload_app) e aquecido antes dos
+forks (extratos_app/aquecimento.py): cada worker já nasce com Django, views,
+pipeline e pandas/openpyxl/pyarrow/plotly importados, e a primeira requisição
+não paga essas importações.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def on_starting(server):
+    """
+    No processo principal, depois do preload e antes de abrir a porta: nenhuma
+    conexão fica esperando o aquecimento
+    """
+    from extratos_app.aquecimento import aquecer
+
+    aquecer()
+    # O que já foi carregado vai para a geração permanente: a coleta de lixo dos
+    # workers não percorre (nem copia) essas páginas compartilhadas com o principal
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """No modo 'processo', cada worker sobe o seu pool antes da primeira requisição"""
+    from extratos_app.tarefas import iniciar_pool_processos
+
+    iniciar_pool_processos()
@@ -49,13 +49,17 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Depois do WhiteNoise: os estáticos já saem comprimidos por ele
+    'extratos_app.middleware.compressao_middleware.CompressaoMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'extratos_app.middleware.cleanup_middleware.PeriodicFileCleanupMiddleware',
+    'extratos_app.middleware.security_middleware.SecurityMiddleware',
+    # Antes do CSRF ler o corpo do POST (process_view): envios recusados não são recebidos
+    'extratos_app.middleware.admissao_middleware.AdmissaoMiddleware',
 ]
 
 ROOT_URLCONF = 'web_extratos.urls'
@@ -82,18 +86,53 @@ WSGI_APPLICATION = 'web_extratos.wsgi.application'
 if os.environ.get('DATABASE_URL'):
     # Produção (Render) - PostgreSQL
     import dj_database_url
+    # Cada processo (e cada thread) reaproveita a conexão por DB_CONN_MAX_AGE
+    # segundos em vez de abrir uma por requisição (0 volta a esse comportamento);
+    # com DB_CONN_HEALTH_CHECKS a conexão é testada antes de ser reaproveitada
     DATABASES = {
-        'default': dj_database_url.parse(os.environ.get('DATABASE_URL'))
+        'default': dj_database_url.parse(
+            os.environ.get('DATABASE_URL'),
+            conn_max_age=config('DB_CONN_MAX_AGE', default=600, cast=int),
+            conn_health_checks=config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        )
     }
+    # Pool de conexões nativo do Django, no lugar das conexões persistentes
+    # (psycopg 3: pip install "psycopg[binary,pool]"). Cada processo mantém
+    # entre DB_POOL_MIN e DB_POOL_MAX conexões; no modo 'thread' cada
+    # processamento em andamento ocupa duas (processamento e heartbeat)
+    if config('DB_POOL', default=False, cast=bool):
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': config('DB_POOL_MIN', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX', default=8, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
 else:
     # Desenvolvimento - SQLite
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Banco de testes em arquivo: o SQLite em memória não deixa as
+            # threads dos testes de concorrência esperarem umas pelas outras
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
+# Cache (usado pelo rate limit). O padrão é o locmem do Django; como ele é
+# por processo, os contadores do rate limit ficam em ContadorRequisicoes. Com
+# Redis o cache é compartilhado e os contadores vão para ele:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache e
+# CACHE_LOCATION=redis://127.0.0.1:6379/1. A tabela no banco é opcional:
+# CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache,
+# CACHE_LOCATION=cache_extratos e `manage.py createcachetable`
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -123,6 +162,24 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
 
+# collectstatic grava cada arquivo com o hash no nome, já comprimido (gzip e,
+# com o pacote brotli, .br); o WhiteNoise serve esses nomes com cache de um
+# ano. Com DEBUG=False o `{% static %}` depende do collectstatic (main.py e
+# setup_dev.sh já o executam); com DEBUG=True usa o nome original.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Extratos e resultados, gravados pelo conteúdo (extratos_app/armazenamento.py)
+    'extratos': {
+        'BACKEND': 'extratos_app.armazenamento.ArmazenamentoConteudo',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+WHITENOISE_MANIFEST_STRICT = False
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -151,7 +208,22 @@ X_FRAME_OPTIONS = config('X_FRAME_OPTIONS', default='DENY')
 # Configurações de sessão
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+# Rate limit por IP (extratos_app.middleware.security_middleware)
+RATELIMIT_ENABLE = config('RATELIMIT_ENABLE', default=False, cast=bool)
+# Proxies confiáveis na frente da aplicação (ex.: 1 no Render): o IP do cliente
+# vem do X-Forwarded-For acrescentado por eles; 0 usa REMOTE_ADDR
+RATELIMIT_PROXIES = config('RATELIMIT_PROXIES', default=0, cast=int)
+
+# Entrega das planilhas para download: '' (o Django envia os bytes),
+# 'x-sendfile' (Apache mod_xsendfile/lighttpd) ou 'x-accel-redirect' (nginx,
+# com um `location` internal em DOWNLOAD_ACCEL_PREFIX apontando para MEDIA_ROOT)
+DOWNLOAD_MODO = config('DOWNLOAD_MODO', default='')
+DOWNLOAD_ACCEL_PREFIX = config('DOWNLOAD_ACCEL_PREFIX', default='/media-interna/')
+
 # Configurações de upload
+# Os arquivos vão direto para o disco, validados e com SHA-256 calculado
+# durante o recebimento (ver extratos_app/uploads.py)
+FILE_UPLOAD_HANDLERS = ['extratos_app.uploads.UploadVerificadoHandler']
 FILE_UPLOAD_MAX_MEMORY_SIZE = 25 * 1024 * 1024  # 25MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 25 * 1024 * 1024  # 25MB
 MAX_UPLOAD_SIZE = 25 * 1024 * 1024  # 25MB
@@ -196,6 +268,30 @@ BACKUP_ENABLED = False
 BACKUP_INTERVAL = 86400  # 24 horas
 BACKUP_RETENTION_DAYS = 7
 
+# Fila de processamento: 'thread' (pool no processo web), 'processo' (pool de
+# processos aquecidos, criados por um forkserver), 'fila' (workers
+# `manage.py processar_fila`) ou 'sincrono'. PROCESSAMENTO_THREADS é o
+# tamanho do pool nos modos 'thread' e 'processo'
+PROCESSAMENTO_MODO = config('PROCESSAMENTO_MODO', default='thread')
+PROCESSAMENTO_THREADS = config('PROCESSAMENTO_THREADS', default=2, cast=int)
+PROCESSAMENTO_HEARTBEAT = config('PROCESSAMENTO_HEARTBEAT', default=30, cast=int)  # segundos
+PROCESSAMENTO_VISIBILIDADE = config('PROCESSAMENTO_VISIBILIDADE', default=300, cast=int)  # segundos sem heartbeat
+PROCESSAMENTO_MAX_TENTATIVAS = config('PROCESSAMENTO_MAX_TENTATIVAS', default=3, cast=int)
+PROCESSAMENTO_LIMPEZA_INTERVALO = config('PROCESSAMENTO_LIMPEZA_INTERVALO', default=600, cast=int)  # segundos
+
+# Controle de admissão: com PROCESSAMENTO_FILA_MAXIMA processamentos na fila ou
+# em andamento, novos envios recebem 503 com Retry-After (0 desliga)
+PROCESSAMENTO_FILA_MAXIMA = config('PROCESSAMENTO_FILA_MAXIMA', default=20, cast=int)
+# Orçamento de cada processamento nos modos 'processo' e 'fila', aplicado com
+# limites do sistema (resource) ao processo que o executa (0 desliga). Nos
+# modos 'thread' e 'sincrono' os processamentos rodam sem orçamento
+PROCESSAMENTO_MEMORIA_MAXIMA = config('PROCESSAMENTO_MEMORIA_MAXIMA', default=1024, cast=int)  # MB além do já em uso
+PROCESSAMENTO_CPU_MAXIMO = config('PROCESSAMENTO_CPU_MAXIMO', default=300, cast=int)  # segundos de CPU
+
+# Tempo que um processamento e seus arquivos ficam disponíveis depois de
+# concluídos (ver `manage.py limpar_expirados`)
+RESULTADO_VALIDADE = config('RESULTADO_VALIDADE', default=3600, cast=int)  # segundos
+
 # Configurações de auditoria
 AUDIT_LOG_ENABLED = True
 AUDIT_LOG_FILE = os.path.join(BASE_DIR, 'logs', 'audit.log')